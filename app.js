@@ -244,6 +244,21 @@ let currentFilters = {
 };
 let activeTab = 'overview';
 
+// Precomputed data bundle (`python -m edtech_analytics bundle --out data/`):
+// typed arrays with one row per age x occupation x platform combination,
+// loaded after first paint. Until it arrives (or if it is missing) the
+// embedded dashboardData is shown.
+const BUNDLE_URL = 'data/bundle.bin.gz';
+const BUNDLE_FORMAT = 1;
+const BUNDLE_ALIGN = 8;
+const BUNDLE_DTYPES = {
+  uint8: Uint8Array,
+  uint16: Uint16Array,
+  uint32: Uint32Array,
+  float64: Float64Array
+};
+let dataBundle = null;
+
 // Initialize dashboard
 document.addEventListener('DOMContentLoaded', function() {
   console.log('Dashboard initializing...');
@@ -258,6 +273,7 @@ document.addEventListener('DOMContentLoaded', function() {
   // Initialize charts after a brief delay to ensure DOM is ready
   setTimeout(() => {
     initializeCharts();
+    initializeDataBundle();
   }, 100);
 });
 
@@ -406,29 +422,197 @@ function updateFilterVisualFeedback() {
   });
 }
 
+// Fetch and decode the data bundle: a header JSON followed by little-endian
+// typed arrays, which are viewed in place rather than parsed
+async function loadDataBundle(url = BUNDLE_URL) {
+  const response = await fetch(url);
+  if (!response.ok) {
+    throw new Error(`HTTP ${response.status} for ${url}`);
+  }
+  let buffer = await response.arrayBuffer();
+  const magic = new Uint8Array(buffer, 0, 2);
+  if (magic[0] === 0x1f && magic[1] === 0x8b) {
+    // Still gzipped (not served with Content-Encoding: gzip)
+    const stream = new Blob([buffer]).stream().pipeThrough(new DecompressionStream('gzip'));
+    buffer = await new Response(stream).arrayBuffer();
+  }
+  const decoder = new TextDecoder();
+  if (decoder.decode(new Uint8Array(buffer, 0, 4)) !== 'EDTB') {
+    throw new Error('Not a dashboard data bundle');
+  }
+  const headerLength = new DataView(buffer).getUint32(4, true);
+  const header = JSON.parse(decoder.decode(new Uint8Array(buffer, 8, headerLength)));
+  if (header.format !== BUNDLE_FORMAT) {
+    throw new Error(`Bundle format ${header.format}, expected ${BUNDLE_FORMAT}`);
+  }
+  const start = Math.ceil((8 + headerLength) / BUNDLE_ALIGN) * BUNDLE_ALIGN;
+  const arrays = {};
+  Object.entries(header.arrays).forEach(([name, spec]) => {
+    const ArrayType = BUNDLE_DTYPES[spec.dtype];
+    arrays[name] = {
+      data: new ArrayType(buffer, start + spec.offset, spec.shape[0] * spec.shape[1]),
+      width: spec.shape[1]
+    };
+  });
+  return { ...header, arrays };
+}
+
+// Load the bundle once the browser is idle, then re-apply the current filters to it
+function initializeDataBundle() {
+  const load = () => loadDataBundle()
+    .then(bundle => {
+      dataBundle = bundle;
+      populateFilterOptions(bundle);
+      applyFiltersToData();
+      updateChartsWithFilteredData();
+      console.log('Data bundle loaded');
+    })
+    .catch(error => console.warn('Data bundle unavailable, using embedded data:', error));
+  if ('requestIdleCallback' in window) {
+    requestIdleCallback(load);
+  } else {
+    setTimeout(load, 200);
+  }
+}
+
+// Offer exactly the bundle's labels in the filter dropdowns, keeping the current choice
+function populateFilterOptions(bundle) {
+  const selects = { age: 'ageFilter', occupation: 'occupationFilter', platform: 'platformFilter' };
+  Object.entries(selects).forEach(([dim, id]) => {
+    const select = document.getElementById(id);
+    if (!select) return;
+    const current = select.value;
+    const allOption = select.options[0];
+    select.replaceChildren(allOption, ...bundle.labels[dim].map(label => new Option(label, label)));
+    select.value = bundle.labels[dim].includes(current) ? current : '';
+  });
+}
+
+// Bundle row of a filter combination: mixed-radix index, the "All" slot last on each axis
+// (a synthetic bundle has only the "All" row)
+function bundleRow(bundle, filters) {
+  let row = 0;
+  for (const dim of bundle.dimensions) {
+    const labels = bundle.labels[dim];
+    const index = filters[dim] ? labels.indexOf(filters[dim]) : labels.length;
+    if (index < 0) return -1;
+    if (!bundle.synthetic) row = row * (labels.length + 1) + index;
+  }
+  return row;
+}
+
+function bundleSeries(bundle, name, row) {
+  const { data, width } = bundle.arrays[name];
+  return data.subarray(row * width, (row + 1) * width);
+}
+
+// Filtered series shaped like dashboardData, read from one bundle row (null for an unknown filter value)
+function filteredDataFromBundle(bundle, filters) {
+  const row = bundleRow(bundle, filters);
+  if (row < 0) return null;
+
+  // label -> count of a bundle array's row; by default only labels with a nonzero count
+  const asMap = (col, name = col, keep = (label, count) => count > 0) => {
+    const counts = bundleSeries(bundle, name, row);
+    const out = {};
+    bundle.labels[col].forEach((label, i) => {
+      if (keep(label, counts[i])) out[label] = counts[i];
+    });
+    return out;
+  };
+  const dropCounts = bundleSeries(bundle, 'drop_point', row);
+  const dropPoints = {};
+  bundle.labels.drop_point.forEach((label, i) => { dropPoints[label] = dropCounts[i]; });
+
+  // Funnel: a stage's learners are those whose last reached stage is at or after it
+  const reached = new Array(bundle.funnel_stages.length).fill(0);
+  bundle.drop_point_stage.forEach((stage, i) => { reached[stage] += dropCounts[i]; });
+  const learners = reached.map((_, i) => reached.slice(i).reduce((sum, n) => sum + n, 0));
+  const started = learners[0] || 1;
+  const funnelData = bundle.funnel_stages.map((stage, i) => ({
+    stage,
+    learners: learners[i],
+    percentage: Math.round(1000 * learners[i] / started) / 10
+  }));
+
+  const dropTotal = dropCounts.reduce((sum, n) => sum + n, 0);
+  const completed = bundle.completed.reduce((sum, label) => sum + (dropPoints[label] || 0), 0);
+  // A synthetic bundle (expanded from aggregates) has no joint counts: a selected
+  // dimension only narrows its own marginal and every other series stays unfiltered
+  const selected = bundle.dimensions.filter(dim => filters[dim]);
+  const crossFiltered = !(bundle.synthetic && selected.length);
+  const marginal = dim => {
+    const counts = asMap(dim);
+    if (crossFiltered || !filters[dim]) return counts;
+    return filters[dim] in counts ? { [filters[dim]]: counts[filters[dim]] } : {};
+  };
+  let total = bundleSeries(bundle, 'total', row)[0];
+  if (!crossFiltered) {
+    total = selected.length === 1 ? Object.values(marginal(selected[0])).reduce((sum, n) => sum + n, 0) : null;
+  }
+  const median = bundle.synthetic ? NaN : bundleSeries(bundle, 'median_dropoff_day', row)[0];
+  const ageDistribution = marginal('age');
+  const occupationDistribution = marginal('occupation');
+  const reasonCounts = bundleSeries(bundle, 'reasons', row);
+  const featureCounts = bundleSeries(bundle, 'features', row);
+
+  return {
+    ...bundle.static,
+    cross_filtered: crossFiltered,
+    demographics: {
+      total_respondents: total,
+      age_distribution: ageDistribution,
+      occupation_distribution: occupationDistribution
+    },
+    platform_data: { primary_platforms: marginal('platform') },
+    dropoff_patterns: {
+      drop_points: dropPoints,
+      funnel_data: funnelData,
+      median_dropoff_day: Number.isNaN(median) ? null : median,
+      dropoff_days: Array.from(bundleSeries(bundle, 'dropoff_day', row))
+    },
+    completion: {
+      rate: dropTotal ? Math.round(1000 * completed / dropTotal) / 10 : null,
+      by_age: bundle.synthetic ? null : asMap('age', 'completed_age', label => label in ageDistribution),
+      by_occupation: bundle.synthetic ? null : asMap('occupation', 'completed_occupation', label => label in occupationDistribution)
+    },
+    dropoff_reasons: bundle.labels.reasons
+      .map((reason, i) => ({ reason, count: reasonCounts[i] }))
+      .filter(item => item.count),
+    desired_features: bundle.labels.features
+      .map((feature, i) => ({ feature, mentions: featureCounts[i] }))
+      .filter(item => item.mentions)
+  };
+}
+
 // Enhanced data filtering logic
 function applyFiltersToData() {
-  filteredData = JSON.parse(JSON.stringify(dashboardData)); // Deep copy
-  
-  // Apply platform filter
-  if (currentFilters.platform) {
-    const filteredPlatforms = {};
-    if (dashboardData.platform_data.primary_platforms[currentFilters.platform]) {
-      filteredPlatforms[currentFilters.platform] = dashboardData.platform_data.primary_platforms[currentFilters.platform];
+  const fromBundle = dataBundle && filteredDataFromBundle(dataBundle, currentFilters);
+  if (fromBundle) {
+    filteredData = fromBundle;
+  } else {
+    filteredData = JSON.parse(JSON.stringify(dashboardData)); // Deep copy
+
+    // Apply platform filter (the embedded data has no cross-tabulation, so the other series stay unfiltered)
+    if (currentFilters.platform) {
+      const filteredPlatforms = {};
+      if (dashboardData.platform_data.primary_platforms[currentFilters.platform]) {
+        filteredPlatforms[currentFilters.platform] = dashboardData.platform_data.primary_platforms[currentFilters.platform];
+      }
+      filteredData.platform_data.primary_platforms = filteredPlatforms;
     }
-    filteredData.platform_data.primary_platforms = filteredPlatforms;
   }
   
   // Apply search filter to dropoff reasons
   if (currentFilters.search) {
-    filteredData.dropoff_reasons = dashboardData.dropoff_reasons.filter(item => 
+    filteredData.dropoff_reasons = filteredData.dropoff_reasons.filter(item => 
       item.reason.toLowerCase().includes(currentFilters.search)
     );
   }
   
   // Apply search filter to desired features
   if (currentFilters.search) {
-    filteredData.desired_features = dashboardData.desired_features.filter(item => 
+    filteredData.desired_features = filteredData.desired_features.filter(item => 
       item.feature.toLowerCase().includes(currentFilters.search)
     );
   }
@@ -439,6 +623,29 @@ function applyFiltersToData() {
 // Enhanced chart updates with smooth animations
 function updateChartsWithFilteredData() {
   try {
+    // Update funnel chart
+    if (charts.funnelChart) {
+      charts.funnelChart.data.labels = filteredData.dropoff_patterns.funnel_data.map(item => item.stage);
+      charts.funnelChart.data.datasets[0].data = filteredData.dropoff_patterns.funnel_data.map(item => item.learners);
+      charts.funnelChart.update('active');
+    }
+
+    // Update age completion chart (the bundle carries completers per age group)
+    if (charts.ageCompletionChart && filteredData.completion) {
+      const ages = Object.keys(filteredData.demographics.age_distribution);
+      charts.ageCompletionChart.data.labels = ages;
+      charts.ageCompletionChart.data.datasets[0].data = ages.map(age => filteredData.demographics.age_distribution[age]);
+      charts.ageCompletionChart.data.datasets[1].data = ages.map(age => (filteredData.completion.by_age || {})[age] || 0);
+      charts.ageCompletionChart.update('active');
+    }
+
+    // Update occupation chart
+    if (charts.occupationPreferencesChart) {
+      charts.occupationPreferencesChart.data.labels = Object.keys(filteredData.demographics.occupation_distribution);
+      charts.occupationPreferencesChart.data.datasets[0].data = Object.values(filteredData.demographics.occupation_distribution);
+      charts.occupationPreferencesChart.update('active');
+    }
+
     // Update platform distribution chart
     if (charts.platformDistributionChart) {
       charts.platformDistributionChart.data.labels = Object.keys(filteredData.platform_data.primary_platforms);
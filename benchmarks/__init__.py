@@ -0,0 +1 @@
+"""Benchmarks for the analytics engine: `python -m benchmarks --help`."""
@@ -0,0 +1,121 @@
+"""
+Benchmark the engine's filtering, aggregation, export, ingestion and cohort
+stages on synthetic surveys.
+
+    python -m benchmarks --sizes 1e3,1e4,1e5,1e6
+    python -m benchmarks --sizes 1e5 --save-baseline benchmarks/baseline.json
+    python -m benchmarks --sizes 1e5 --baseline benchmarks/baseline.json --fail-on-regression
+    python -m benchmarks --sizes "" --imports edtech_analytics.engine,streamlit,plotly.express
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+from datetime import datetime
+
+import numpy as np
+
+from edtech_analytics.cohorts import CohortEngine, EVENT_CHUNK_ROWS
+from edtech_analytics.cube import build_aggregation_cube
+from edtech_analytics.engine import get_filtered_data
+from edtech_analytics.exports import export_respondents, generate_csv_bytes, generate_json_bytes
+from edtech_analytics.search import build_search_index
+from edtech_analytics.sheets import InMemorySheetBackend, SheetDataSource, fetch_data_from_gsheet
+
+from .harness import compare, load_baseline, measure, measure_import, result_key, save_baseline
+from .synthetic import synthetic_events, synthetic_sheet_tabs, synthetic_store
+
+# Cold-start imports of the dashboard: the engine, the UI framework, and the
+# dependencies that are now imported only on the path that needs them
+IMPORT_MODULES = "edtech_analytics.engine,streamlit,plotly.express,gspread,pyarrow"
+
+
+def fold_events(events, chunk_rows=EVENT_CHUNK_ROWS):
+    engine = CohortEngine()
+    for start in range(0, len(events), chunk_rows):
+        engine.add_frame(events.iloc[start:start + chunk_rows])
+    return engine
+
+
+def stages(n, seed, max_export_rows, max_ingest_rows):
+    """(stage name, callable) pairs for one survey size; slow row-by-row stages are capped by size."""
+    store = synthetic_store(n, seed)
+    cube = build_aggregation_cube(store)
+    filters = {"age": store.labels["age"][0], "occupation": store.labels["occupation"][0], "search": "lack"}
+    filtered = get_filtered_data({}, filters, store=store)
+    out = [
+        ("filter_scan", lambda: get_filtered_data({}, filters, store=store)),
+        ("cube_build", lambda: build_aggregation_cube(store)),
+        ("filter_cube", lambda: get_filtered_data({}, filters, store=store, cube=cube)),
+        ("search_index_build", lambda: build_search_index(store)),
+        ("export_summary_csv", lambda: generate_csv_bytes(filtered)),
+        ("export_summary_json", lambda: generate_json_bytes(filtered)),
+    ]
+    if n <= max_export_rows:
+        mask = np.ones(store.n, dtype=bool)
+        out.append(("export_respondents_csv_gz", lambda: export_respondents(store, mask, "csv", compress=True).close()))
+    if n <= max_ingest_rows:
+        backend = InMemorySheetBackend(synthetic_sheet_tabs(n, seed))
+        out.append(("ingest_sheet", lambda: fetch_data_from_gsheet("bench", source=SheetDataSource(backend))))
+    events = synthetic_events(n, seed)
+    out.append(("cohort_events", lambda: fold_events(events)))
+    return out
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1e3,1e4,1e5,1e6", help="Comma-separated survey sizes (up to 1e7).")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stages", help="Comma-separated subset of stages to run.")
+    parser.add_argument("--max-export-rows", type=float, default=1e6, help="Skip respondent export above this size.")
+    parser.add_argument("--max-ingest-rows", type=float, default=1e6, help="Skip sheet ingestion above this size.")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the tracemalloc peak-memory run.")
+    parser.add_argument("--imports", default=IMPORT_MODULES, help="Comma-separated modules to time a cold import of (\"\" to skip).")
+    parser.add_argument("--json", help="Write results to this file.")
+    parser.add_argument("--baseline", help="Compare against a baseline written by --save-baseline.")
+    parser.add_argument("--save-baseline", help="Write these results as the new baseline.")
+    parser.add_argument("--threshold", type=float, default=1.25, help="p50 ratio over baseline counted as a regression.")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    sizes = [int(float(s)) for s in args.sizes.split(",") if s.strip()]
+    only = set(args.stages.split(",")) if args.stages else None
+    results = {}
+    print(f"{'stage':<28}{'rows':>10}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'rows/s':>17}{'peak MB':>10}")
+    for n in sizes:
+        for name, fn in stages(n, args.seed, args.max_export_rows, args.max_ingest_rows):
+            if only and name not in only:
+                continue
+            r = measure(fn, n, repeat=args.repeat, track_memory=not args.no_memory)
+            results[result_key(name, n)] = r
+            print(f"{name:<28}{n:>10,}{r['p50_ms']:>11.2f}{r['p95_ms']:>11.2f}{r['p99_ms']:>11.2f}{r['rows_per_s']:>17,.0f}{r.get('peak_mb', float('nan')):>10.1f}")
+    for module in filter(None, (m.strip() for m in args.imports.split(","))):
+        try:
+            r = measure_import(module, repeat=min(args.repeat, 3))
+        except subprocess.CalledProcessError:
+            print(f"{'import ' + module:<38}  not installed")
+            continue
+        results[result_key("import " + module, 0)] = r
+        print(f"{'import ' + module:<38}{r['p50_ms']:>11.2f}{r['p95_ms']:>11.2f}{r['p99_ms']:>11.2f}")
+
+    meta = {"created": datetime.now().isoformat(timespec="seconds"), "python": platform.python_version(), "machine": platform.machine(), "numpy": np.__version__}
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as fh:
+            json.dump({"meta": meta, "results": results}, fh, indent=2, sort_keys=True)
+    if args.save_baseline:
+        save_baseline(args.save_baseline, results, meta)
+
+    regressed = False
+    if args.baseline:
+        print(f"\n{'vs baseline':<40}{'base p50':>11}{'now p50':>11}{'ratio':>8}")
+        for key, base, now, ratio, bad in compare(results, load_baseline(args.baseline), args.threshold):
+            regressed |= bad
+            print(f"{key:<40}{base:>11.2f}{now:>11.2f}{ratio:>8.2f}{'  REGRESSION' if bad else ''}")
+    return 1 if regressed and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Timing harness: repeated runs for latency percentiles and throughput, one
+tracemalloc run for peak memory, cold import times in fresh interpreters, and
+comparison against a saved baseline.
+"""
+
+import gc
+import json
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+
+def measure(fn, rows, repeat=5, warmup=1, track_memory=True):
+    """Run fn() repeatedly; returns latency percentiles (ms), throughput (rows/s) and peak traced memory (MB)."""
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    result = {
+        "rows": rows,
+        "repeat": repeat,
+        "p50_ms": float(np.percentile(timings, 50) * 1000),
+        "p95_ms": float(np.percentile(timings, 95) * 1000),
+        "p99_ms": float(np.percentile(timings, 99) * 1000),
+        "rows_per_s": float(rows / np.median(timings)) if np.median(timings) > 0 else float("inf"),
+    }
+    if track_memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn()
+            result["peak_mb"] = tracemalloc.get_traced_memory()[1] / 1e6
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import {module}; print(time.perf_counter() - t)"
+
+
+def measure_import(module, repeat=3):
+    """Cold import latency of `module`, each run in a fresh interpreter (interpreter startup excluded)."""
+    timings = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET.format(module=module)], capture_output=True, text=True, check=True)
+        timings.append(float(out.stdout.strip().splitlines()[-1]))
+    return {
+        "rows": 0,
+        "repeat": repeat,
+        "p50_ms": float(np.percentile(timings, 50) * 1000),
+        "p95_ms": float(np.percentile(timings, 95) * 1000),
+        "p99_ms": float(np.percentile(timings, 99) * 1000),
+    }
+
+
+def result_key(stage, rows):
+    return f"{stage}@{rows}"
+
+
+def load_baseline(path):
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)["results"]
+
+
+def save_baseline(path, results, meta):
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump({"meta": meta, "results": results}, fh, indent=2, sort_keys=True)
+
+
+def compare(results, baseline, threshold=1.25):
+    """Rows of (key, baseline p50, current p50, ratio, regressed) for keys present in both."""
+    rows = []
+    for key, current in results.items():
+        if key in baseline:
+            ratio = current["p50_ms"] / baseline[key]["p50_ms"] if baseline[key]["p50_ms"] else float("inf")
+            rows.append((key, baseline[key]["p50_ms"], current["p50_ms"], ratio, ratio > threshold))
+    return rows
@@ -0,0 +1,87 @@
+"""
+Synthetic survey generator.
+
+Draws respondents whose answer frequencies follow the embedded DASHBOARD_DATA
+marginals, directly into the columnar RespondentStore (10^7 rows fit in a few
+hundred MB), plus sheet-shaped rows for the ingestion path and learner progress
+events for the cohort engine.
+"""
+
+import numpy as np
+import pandas as pd
+
+from edtech_analytics.data import DASHBOARD_DATA
+from edtech_analytics.store import DROP_POINT_DAYS, DROP_POINT_STAGE, MULTI_SELECT_COLUMNS, RespondentStore
+
+
+def _marginals(data):
+    n = data["demographics"]["total_respondents"]
+    singles = {
+        "age": data["demographics"]["age_distribution"],
+        "occupation": data["demographics"]["occupation_distribution"],
+        "platform": data["platform_data"]["primary_platforms"],
+        "drop_point": data["dropoff_patterns"]["drop_points"],
+    }
+    multis = {
+        "reasons": {r["reason"]: r["count"] / n for r in data["dropoff_reasons"]},
+        "features": {f["feature"]: f["mentions"] / n for f in data["desired_features"]},
+    }
+    return singles, multis
+
+
+def synthetic_store(n, seed=0, data=DASHBOARD_DATA):
+    """RespondentStore of n respondents drawn from the dataset's marginals."""
+    rng = np.random.default_rng(seed)
+    singles, multis = _marginals(data)
+    labels, codes, bits = {}, {}, {}
+    for col, counts in singles.items():
+        labels[col] = list(counts)
+        p = np.array(list(counts.values()), dtype=float)
+        codes[col] = rng.choice(len(p), size=n, p=p / p.sum()).astype(np.int32)
+    for col in MULTI_SELECT_COLUMNS:
+        labels[col] = list(multis[col])
+        mask = np.zeros(n, dtype=np.uint64)
+        for i, p in enumerate(multis[col].values()):
+            mask |= (rng.random(n) < min(p, 1.0)).astype(np.uint64) << np.uint64(i)
+        bits[col] = mask
+    spans = np.array([DROP_POINT_DAYS.get(label, (np.nan, np.nan)) for label in labels["drop_point"]])
+    lo, hi = spans[codes["drop_point"]].T
+    days = np.floor(lo + rng.random(n) * (hi - lo))
+    return RespondentStore(labels, codes, bits, numbers={"dropoff_day": days})
+
+
+def synthetic_sheet_tabs(n, seed=0, data=DASHBOARD_DATA):
+    """Sheet tabs ({title: rows}, header first) with n data rows each, as read from Google Sheets."""
+    rng = np.random.default_rng(seed)
+    singles, multis = _marginals(data)
+    counts = rng.integers(0, 1000, size=n).tolist()
+
+    def tab(header, labels):
+        names = np.array(labels, dtype=object)[np.arange(n) % len(labels)]
+        return [header] + [[f"{name} #{i}", c] for i, (name, c) in enumerate(zip(names.tolist(), counts))]
+
+    return {
+        "dropoff_reasons": tab(["reason", "count"], list(multis["reasons"])),
+        "desired_features": tab(["feature", "mentions"], list(multis["features"])),
+        "platform_summary": tab(["platform", "users"], list(singles["platform"])),
+        "demographics_age": tab(["age_group", "count"], list(singles["age"])),
+        "demographics_occupation": tab(["occupation", "count"], list(singles["occupation"])),
+    }
+
+
+def synthetic_events(n, seed=0, events_per_learner=10, days=180):
+    """DataFrame of n progress events (learner_id, epoch-second timestamp, stage index) in shuffled order.
+
+    Each learner enrolls on a random day and progresses through the funnel
+    stages, stopping at the stage the DASHBOARD_DATA drop points make likely.
+    """
+    rng = np.random.default_rng(seed)
+    learners = max(n // events_per_learner, 1)
+    drop = np.array([DROP_POINT_STAGE[label] for label in DASHBOARD_DATA["dropoff_patterns"]["drop_points"]])
+    p = np.array(list(DASHBOARD_DATA["dropoff_patterns"]["drop_points"].values()), dtype=float)
+    top = rng.choice(drop, size=learners, p=p / p.sum())
+    enroll = 1.7e9 + rng.integers(0, days * 86400, learners)
+    learner = rng.integers(0, learners, n)
+    stage = (rng.random(n) * (top[learner] + 1)).astype(np.int64)
+    timestamp = enroll[learner] + stage * 7 * 86400 + rng.integers(0, 7 * 86400, n)
+    return pd.DataFrame({"learner_id": learner, "timestamp": timestamp.astype(np.int64), "stage": stage})
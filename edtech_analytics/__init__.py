@@ -0,0 +1,56 @@
+"""
+Headless analytics engine behind the EdTech Learning Analytics Dashboard.
+
+Importable without Streamlit, Plotly or gspread; `streamlit_app.py` is a thin
+UI over it, and `python -m edtech_analytics` renders batch reports.
+
+The names below are resolved on first access, so importing one submodule
+(e.g. `edtech_analytics.profiling`) doesn't pull in pandas and the rest.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "AggregationCube": "cube",
+    "COMMUNITY_DATA": "data",
+    "CohortEngine": "cohorts",
+    "CommunityStore": "community",
+    "DASHBOARD_DATA": "data",
+    "DataView": "dataset",
+    "Engine": "engine",
+    "InMemorySheetBackend": "sheets",
+    "RespondentStore": "store",
+    "SearchIndex": "search",
+    "SheetDataSource": "sheets",
+    "Snapshot": "snapshot",
+    "SnapshotStore": "snapshot",
+    "build_aggregation_cube": "cube",
+    "build_cohorts": "cohorts",
+    "build_community_store": "community",
+    "build_respondent_store": "store",
+    "build_search_index": "search",
+    "export_respondents": "exports",
+    "fetch_data_from_gsheet": "sheets",
+    "freeze": "dataset",
+    "funnel_from_drop_points": "store",
+    "generate_csv_bytes": "exports",
+    "generate_json_bytes": "exports",
+    "get_filtered_data": "engine",
+    "load_data": "engine",
+    "search_comments": "search",
+    "write_bundle": "bundle",
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{_EXPORTS[name]}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,159 @@
+"""
+Static data bundle for the browser dashboard (index.html + app.js).
+
+One gzipped binary file, laid out as
+
+    b"EDTB" | uint32 header length | header JSON | padding | arrays
+
+The header carries the dictionary-encoded categories (every count vector is
+indexed by its column's label list), the series that don't depend on the
+filters, and each array's dtype, shape and byte offset from the (8-byte
+aligned) end of the header. Each array is little-endian, in the smallest
+unsigned type that holds its counts, with one row per age x occupation x
+platform combination: along each axis, slots 0..L-1 are the labels and slot L
+is "All". app.js views the arrays in place (no parsing) and a filter change
+reads one row, so a CDN can serve the dashboard without a Python process.
+
+A dataset expanded from aggregates (RespondentStore.synthetic) has no joint
+distribution to slice, so its bundle is flagged "synthetic" and holds only the
+"All" row, without the per-group completers and median drop-off day: app.js
+then narrows just the selected dimensions' own marginals, as the engine does.
+"""
+
+import gzip
+import itertools
+import json
+import os
+import struct
+from datetime import datetime, timezone
+
+import numpy as np
+
+from .engine import FILTER_DIMENSIONS, Engine
+from .metrics import DAY_BIN_WIDTH, HistogramSketch
+from .profiling import span
+from .store import DROP_POINT_STAGE, FUNNEL_STAGES, MULTI_SELECT_COLUMNS, SINGLE_CHOICE_COLUMNS, completed_labels
+
+BUNDLE_FORMAT = 1
+BUNDLE_MAGIC = b"EDTB"
+BUNDLE_FILE = "bundle.bin.gz"
+BUNDLE_ALIGN = 8
+BUNDLE_STATIC_KEYS = ("engagement_factors", "platform_table")  # series shipped as-is, not per filter
+_DTYPES = (np.uint8, np.uint16, np.uint32)  # app.js's BUNDLE_DTYPES: typed arrays it can view without BigInt
+
+
+def compact(values):
+    """Counts as the smallest little-endian unsigned dtype that holds them (fractional values stay float64).
+
+    Raises ValueError for counts beyond uint32, which app.js can't read.
+    """
+    values = np.asarray(values)
+    if values.dtype.kind == "f":
+        return values.astype("<f8")
+    top = int(values.max()) if values.size else 0
+    dtype = next((t for t in _DTYPES if top <= np.iinfo(t).max), None)
+    if dtype is None:
+        raise ValueError(f"Count {top} doesn't fit the bundle's largest dtype (uint32).")
+    return values.astype(np.dtype(dtype).newbyteorder("<"))
+
+
+def bundle_rows(engine):
+    """(filters, counts) for every filter combination, in bundle row order (the "All" slot last on each axis).
+
+    A synthetic dataset yields only the unfiltered row.
+    """
+    if engine.store.synthetic:
+        options = [[""] for _ in FILTER_DIMENSIONS]
+    else:
+        options = [engine.store.labels[dim] + [""] for dim in FILTER_DIMENSIONS]
+    for values in itertools.product(*options):
+        filters = dict(zip(FILTER_DIMENSIONS, values))
+        if engine.cube is not None:
+            counts = engine.cube.lookup(filters)
+        else:
+            counts = engine.store.aggregate(engine.store.mask(filters))
+        yield filters, counts
+
+
+def build_bundle(engine):
+    """(header, {name: array}) of an Engine's dataset."""
+    labels = {col: list(engine.store.labels[col]) for col in SINGLE_CHOICE_COLUMNS + MULTI_SELECT_COLUMNS}
+    synthetic = engine.store.synthetic
+    names = ["total", *SINGLE_CHOICE_COLUMNS, *MULTI_SELECT_COLUMNS, "dropoff_day"]
+    if not synthetic:
+        names += ["completed_age", "completed_occupation", "median_dropoff_day"]
+    columns = {name: [] for name in names}
+    for _, counts in bundle_rows(engine):
+        columns["total"].append([counts["total"]])
+        for col in SINGLE_CHOICE_COLUMNS + MULTI_SELECT_COLUMNS:
+            columns[col].append(counts[col])
+        columns["dropoff_day"].append(counts["dropoff_day"])
+        if synthetic:
+            continue
+        for dim in ("age", "occupation"):
+            columns[f"completed_{dim}"].append(counts["completed"][dim])
+        median = HistogramSketch(counts=counts["dropoff_day"]).quantile(0.5)
+        columns["median_dropoff_day"].append([np.nan if median is None else median])
+    arrays = {name: compact(np.array(rows).reshape(len(rows), -1)) for name, rows in columns.items()}
+    header = {
+        "format": BUNDLE_FORMAT,
+        "generated_at": datetime.now(timezone.utc).isoformat(),
+        "dimensions": list(FILTER_DIMENSIONS),
+        "synthetic": synthetic,
+        "labels": labels,
+        "funnel_stages": FUNNEL_STAGES,
+        # drop point -> index of the last funnel stage reached (0 for unknown labels, as funnel_from_drop_points)
+        "drop_point_stage": [DROP_POINT_STAGE.get(label, 0) for label in labels["drop_point"]],
+        "completed": completed_labels(labels["drop_point"]),
+        "day_bin_width": DAY_BIN_WIDTH,
+        "static": {key: engine.data[key] for key in BUNDLE_STATIC_KEYS if key in engine.data},
+    }
+    return header, arrays
+
+
+def encode_bundle(header, arrays):
+    """Bundle bytes (uncompressed); fills header["arrays"] with each array's dtype, shape and offset."""
+    specs, offset = {}, 0
+    for name, values in arrays.items():
+        offset += -offset % BUNDLE_ALIGN
+        specs[name] = {"dtype": values.dtype.name, "shape": list(values.shape), "offset": offset}
+        offset += values.nbytes
+    header = {**header, "arrays": specs}
+    head = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    out = bytearray(BUNDLE_MAGIC + struct.pack("<I", len(head)) + head)
+    start = len(out) + -len(out) % BUNDLE_ALIGN
+    out += bytes(start - len(out) + offset)
+    for name, values in arrays.items():
+        at = start + specs[name]["offset"]
+        out[at:at + values.nbytes] = np.ascontiguousarray(values).tobytes()
+    return bytes(out)
+
+
+def decode_bundle(payload):
+    """(header, {name: read-only array view}) of bundle bytes (gzipped or not)."""
+    if payload[:2] == b"\x1f\x8b":
+        payload = gzip.decompress(payload)
+    if payload[:4] != BUNDLE_MAGIC:
+        raise ValueError("Not a dashboard data bundle.")
+    (length,) = struct.unpack_from("<I", payload, 4)
+    header = json.loads(payload[8:8 + length])
+    if header.get("format") != BUNDLE_FORMAT:
+        raise ValueError(f"Bundle has format {header.get('format')}, expected {BUNDLE_FORMAT}.")
+    start = 8 + length + -(8 + length) % BUNDLE_ALIGN
+    arrays = {
+        name: np.frombuffer(payload, dtype=np.dtype(spec["dtype"]).newbyteorder("<"), count=int(np.prod(spec["shape"])), offset=start + spec["offset"]).reshape(spec["shape"])
+        for name, spec in header["arrays"].items()
+    }
+    return header, arrays
+
+
+def write_bundle(out_dir, data=None):
+    """Write BUNDLE_FILE for a dataset (the embedded data when None) into out_dir; returns (path, compressed bytes)."""
+    with span("bundle.build"):
+        header, arrays = build_bundle(Engine(data))
+        payload = gzip.compress(encode_bundle(header, arrays), compresslevel=9, mtime=0)
+    os.makedirs(out_dir, exist_ok=True)
+    path = os.path.join(out_dir, BUNDLE_FILE)
+    with open(path, "wb") as fh:
+        fh.write(payload)
+    return path, len(payload)
@@ -0,0 +1,154 @@
+"""
+Batch report CLI.
+
+    python -m edtech_analytics render --out reports/ [--data survey.json] [--workers 8]
+    python -m edtech_analytics cohorts --events events.csv [--events more.parquet] --out reports/
+    python -m edtech_analytics community --db community.db --load posts.jsonl [--seed]
+    python -m edtech_analytics bundle --out data/ [--data survey.json]
+
+`render` writes the summary exports (and optionally the respondent rows) for
+every age x occupation x platform filter combination. Combinations are spread
+over a process pool; each worker loads the dataset once and reuses its engine.
+
+`cohorts` streams learner progress events in chunks into the cohort engine and
+writes the stage funnel and the weekly cohort retention matrix as CSV.
+
+`community` loads scraped posts into the SQLite community store that the
+dashboard's Community Insights tab searches (EDTECH_COMMUNITY_DB).
+
+`bundle` writes the compact per-filter data bundle that the static
+index.html / app.js dashboard loads and filters in the browser.
+"""
+
+import argparse
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from .bundle import write_bundle
+from .cohorts import EVENT_CHUNK_ROWS, CohortEngine, read_events, week_start
+from .community import COMMUNITY_KINDS, build_community_store, read_posts
+from .data import COMMUNITY_DATA
+from .engine import FILTER_DIMENSIONS, Engine, load_data
+from .exports import EXPORT_FORMATS
+
+_ENGINE = None
+
+
+def slug(value):
+    return re.sub(r"[^a-z0-9]+", "-", value.lower()).strip("-") or "all"
+
+
+def combination_name(filters):
+    return "__".join(f"{dim}-{slug(filters.get(dim) or '')}" for dim in FILTER_DIMENSIONS)
+
+
+def _init_worker(data_path):
+    global _ENGINE
+    _ENGINE = Engine.from_json(data_path) if data_path else Engine()
+
+
+def render_combination(filters, out_dir, summary_formats, respondents_fmt=None, compress=False):
+    """Write one filter combination's files into out_dir; returns the paths written."""
+    engine = _ENGINE or Engine()
+    name = combination_name(filters)
+    paths = []
+    for fmt in summary_formats:
+        payload = engine.summary_csv(filters) if fmt == "csv" else engine.summary_json(filters)
+        path = os.path.join(out_dir, f"{name}.{fmt}")
+        with open(path, "wb") as fh:
+            fh.write(payload)
+        paths.append(path)
+    if respondents_fmt:
+        suffix = respondents_fmt + (".gz" if compress and respondents_fmt != "parquet" else "")
+        path = os.path.join(out_dir, f"{name}.respondents.{suffix}")
+        with engine.export_respondents(filters, respondents_fmt, compress=compress) as src, open(path, "wb") as fh:
+            while chunk := src.read(1 << 20):
+                fh.write(chunk)
+        paths.append(path)
+    return paths
+
+
+def render_all(out_dir, data_path=None, summary_formats=("csv", "json"), respondents_fmt=None, compress=False, workers=None):
+    """Render every filter combination in parallel; returns the number of files written."""
+    os.makedirs(out_dir, exist_ok=True)
+    combinations = list(Engine(load_data(data_path), use_cube=False).filter_combinations())
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(data_path,)) as pool:
+        futures = [
+            pool.submit(render_combination, filters, out_dir, summary_formats, respondents_fmt, compress)
+            for filters in combinations
+        ]
+        return sum(len(f.result()) for f in futures)
+
+
+def render_cohorts(out_dir, event_paths, weeks=12, chunk_rows=EVENT_CHUNK_ROWS):
+    """Fold every events file into one CohortEngine and write its funnel and retention CSVs; returns the engine."""
+    os.makedirs(out_dir, exist_ok=True)
+    engine = CohortEngine()
+    for path in event_paths:
+        for frame in read_events(path, chunk_rows):
+            engine.add_frame(frame)
+    pd.DataFrame(engine.funnel()).to_csv(os.path.join(out_dir, "cohort_funnel.csv"), index=False)
+    cohorts, matrix = engine.retention_matrix(weeks)
+    retention = pd.DataFrame(matrix.round(2), columns=[f"week_{k}" for k in range(matrix.shape[1])])
+    retention.insert(0, "cohort_size", engine.retention_matrix(1, percent=False)[1][:, 0].astype(int))
+    retention.insert(0, "cohort", [week_start(w) for w in cohorts])
+    retention.to_csv(os.path.join(out_dir, "cohort_retention.csv"), index=False)
+    return engine
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m edtech_analytics", description="EdTech analytics batch reports.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    render = sub.add_parser("render", help="Render every filter combination to files.")
+    render.add_argument("--out", required=True, help="Output directory.")
+    render.add_argument("--data", help="Dataset JSON shaped like DASHBOARD_DATA (default: embedded data).")
+    render.add_argument("--formats", default="csv,json", help="Summary formats, comma-separated (csv, json).")
+    render.add_argument("--respondents", choices=sorted(EXPORT_FORMATS), help="Also export the filtered respondent rows.")
+    render.add_argument("--gzip", action="store_true", help="gzip respondent CSV / JSON Lines exports.")
+    render.add_argument("--workers", type=int, default=None, help="Process pool size (default: CPU count).")
+    cohorts = sub.add_parser("cohorts", help="Funnel and weekly cohort retention from learner progress events.")
+    cohorts.add_argument("--events", action="append", required=True, help="Events CSV / Parquet (learner_id, timestamp, stage); repeatable.")
+    cohorts.add_argument("--out", required=True, help="Output directory.")
+    cohorts.add_argument("--weeks", type=int, default=12, help="Weeks since enrollment in the retention matrix (max 64).")
+    cohorts.add_argument("--chunk-rows", type=int, default=EVENT_CHUNK_ROWS, help="Events read per chunk.")
+    community = sub.add_parser("community", help="Load community posts into a searchable SQLite file.")
+    community.add_argument("--db", required=True, help="SQLite file (created if missing).")
+    community.add_argument("--load", action="append", default=[], help="Posts JSON (shaped like communityData, or a list) / JSON Lines; repeatable.")
+    community.add_argument("--kind", choices=sorted(COMMUNITY_KINDS), help="Kind of loaded posts that carry none.")
+    community.add_argument("--seed", action="store_true", help="Also add the embedded communityData posts.")
+    bundle = sub.add_parser("bundle", help="Write the data bundle of the static (index.html / app.js) dashboard.")
+    bundle.add_argument("--out", required=True, help="Output directory (app.js fetches data/bundle.bin.gz).")
+    bundle.add_argument("--data", help="Dataset JSON shaped like DASHBOARD_DATA (default: embedded data).")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    if args.command == "cohorts":
+        engine = render_cohorts(args.out, args.events, args.weeks, args.chunk_rows)
+        print(f"Folded {engine.events:,} events from {engine.n_learners:,} learners into {args.out} in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+        if engine.skipped:
+            print(f"Skipped {engine.skipped:,} events with a missing timestamp or an unknown stage", file=sys.stderr)
+        return 0
+    if args.command == "community":
+        store = build_community_store(args.db, None)
+        added = store.add_data(COMMUNITY_DATA) if args.seed else 0  # also into a file that has posts (updates by URL)
+        added += sum(store.add(read_posts(path, args.kind)) for path in args.load)
+        print(f"Loaded {added:,} posts into {args.db} ({len(store):,} in total) in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+        return 0
+    if args.command == "bundle":
+        path, size = write_bundle(args.out, load_data(args.data))
+        print(f"Wrote {path} ({size / 1024:,.1f} KiB) in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+        return 0
+    formats = [f.strip() for f in args.formats.split(",") if f.strip()]
+    unknown = set(formats) - {"csv", "json"}
+    if unknown:
+        parser.error(f"unknown summary format(s): {', '.join(sorted(unknown))}")
+    if args.respondents and not load_data(args.data).get("respondents"):
+        parser.error("--respondents needs a dataset with respondent rows (the data has only aggregates)")
+    written = render_all(args.out, args.data, formats, args.respondents, args.gzip, args.workers)
+    print(f"Wrote {written} files to {args.out} in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return 0
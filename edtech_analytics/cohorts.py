@@ -0,0 +1,235 @@
+"""
+Cohort engine: stage funnel and cohort-by-week retention from learner progress events.
+
+An event is (learner_id, timestamp, stage), stage being a FUNNEL_STAGES label or
+index. Per learner three numbers are kept: the enrollment week (Monday-aligned
+week of the earliest event), the highest stage reached, and a uint64 bitset of
+the weeks since enrollment in which the learner had an event (bit k == active in
+week k; activity after week 63 is not tracked).
+
+A batch is folded in with one sort by learner and reduceat over the batch, so the
+cost is O(batch) whatever the history. An event earlier than a learner's known
+enrollment moves the enrollment back and shifts the learner's bitset left. The
+funnel counts and the retention matrix are kept up to date the same way: the
+touched learners' old contribution is subtracted and their new one added.
+Events without a usable timestamp or with an unknown stage are skipped and
+counted in `skipped`.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .store import FUNNEL_STAGES
+
+COHORT_WEEKS = 64  # bits in the activity bitset
+EVENT_CHUNK_ROWS = 5_000_000
+# canonical event column -> accepted headers, in order of preference
+EVENT_COLUMNS = {
+    "learner_id": ("learner_id", "learner", "user_id", "user"),
+    "timestamp": ("timestamp", "time", "date", "event_time"),
+    "stage": ("stage", "funnel_stage", "event"),
+}
+_NEW = np.iinfo(np.int64).max  # enrollment week of a learner with no events yet
+NO_WEEK = np.iinfo(np.int64).min  # event_weeks() of a missing or unparseable timestamp
+_NS_PER_DAY = 86_400 * 10**9
+
+
+def event_weeks(timestamps):
+    """Monday-aligned week numbers (week 0 starts 1969-12-29) of datetime-like or epoch-second timestamps.
+
+    Missing or unparseable timestamps get NO_WEEK.
+    """
+    values = pd.Series(timestamps)
+    if pd.api.types.is_numeric_dtype(values):
+        values = pd.to_datetime(values, unit="s", utc=True)
+    else:
+        values = pd.to_datetime(values, utc=True, errors="coerce")
+    missing = values.isna().to_numpy()
+    days = values.to_numpy(dtype="datetime64[ns]").astype(np.int64) // _NS_PER_DAY
+    return np.where(missing, NO_WEEK, (days + 3) // 7)  # 1970-01-01 was a Thursday
+
+
+def week_start(week):
+    """ISO date of the Monday starting a week number from event_weeks()."""
+    return str(np.datetime64(int(week) * 7 - 3, "D"))
+
+
+def stage_codes(stages):
+    """FUNNEL_STAGES indexes of stage labels or indexes (-1 when unknown)."""
+    values = pd.Series(stages)
+    if pd.api.types.is_numeric_dtype(values):
+        codes = values.to_numpy(dtype=np.int64)
+        return np.where((codes >= 0) & (codes < len(FUNNEL_STAGES)), codes, -1)
+    return pd.Categorical(values.where(values.isin(FUNNEL_STAGES)), categories=FUNNEL_STAGES).codes.astype(np.int64)
+
+
+def event_frame(frame):
+    """Rename a raw events frame onto the canonical columns (first matching alias wins)."""
+    rename = {}
+    for canon, aliases in EVENT_COLUMNS.items():
+        header = next((a for a in aliases if a in frame.columns), None)
+        if header is None:
+            raise ValueError(f"Events have no {canon} column (tried {', '.join(aliases)}).")
+        rename[header] = canon
+    return frame[list(rename)].rename(columns=rename)
+
+
+def read_events(path, chunk_rows=EVENT_CHUNK_ROWS):
+    """Yield an events CSV or Parquet file as DataFrames of at most `chunk_rows` rows."""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_rows)
+
+
+class CohortEngine:
+    """Incrementally maintained funnel and cohort retention over learner progress events."""
+
+    def __init__(self):
+        self.ids = pd.Index([])
+        self.enroll = np.empty(0, dtype=np.int64)  # enrollment week per learner
+        self.stage = np.empty(0, dtype=np.int64)   # highest stage index per learner (-1: none known)
+        self.active = np.empty(0, dtype=np.uint64)  # week-since-enrollment activity bitset per learner
+        self.stage_counts = np.zeros(len(FUNNEL_STAGES), dtype=np.int64)  # learners by highest stage
+        self.first_week = None  # cohort of retention row 0
+        self.retention = np.zeros((0, COHORT_WEEKS), dtype=np.int64)  # [cohort, week since enrollment] -> active learners
+        self.last_week = None  # latest event week seen
+        self.events = 0
+        self.skipped = 0  # events dropped for a missing timestamp or an unknown stage
+
+    @property
+    def n_learners(self):
+        return len(self.ids)
+
+    def _learner_index(self, ids):
+        idx = self.ids.get_indexer(ids) if len(self.ids) else np.full(len(ids), -1, dtype=np.intp)
+        missing = idx < 0
+        if missing.any():
+            new = pd.Index(pd.unique(ids[missing]))
+            idx[missing] = len(self.ids) + new.get_indexer(ids[missing])
+            self.ids = self.ids.append(new)
+            self.enroll = np.concatenate([self.enroll, np.full(len(new), _NEW, dtype=np.int64)])
+            self.stage = np.concatenate([self.stage, np.full(len(new), -1, dtype=np.int64)])
+            self.active = np.concatenate([self.active, np.zeros(len(new), dtype=np.uint64)])
+        return idx
+
+    def _cover(self, lo, hi):
+        """Grow the retention matrix so cohorts lo..hi have rows."""
+        if self.first_week is None:
+            self.first_week = lo
+            self.retention = np.zeros((hi - lo + 1, COHORT_WEEKS), dtype=np.int64)
+            return
+        before = max(self.first_week - lo, 0)
+        after = max(hi - (self.first_week + len(self.retention) - 1), 0)
+        if before or after:
+            self.retention = np.pad(self.retention, [(before, after), (0, 0)])
+            self.first_week -= before
+
+    def _contribute(self, enroll, active, stage, sign):
+        """Add (sign=1) or remove (sign=-1) these learners' share of the funnel and retention counts."""
+        if not len(enroll):
+            return
+        reached = stage[stage >= 0]
+        self.stage_counts += sign * np.bincount(reached, minlength=len(FUNNEL_STAGES))
+        self._cover(int(enroll.min()), int(enroll.max()))
+        rows = enroll - self.first_week
+        for k in range(COHORT_WEEKS):
+            bit = (active >> np.uint64(k)) & np.uint64(1)
+            if not bit.any():
+                continue
+            self.retention[:, k] += sign * np.bincount(rows, weights=bit, minlength=len(self.retention)).astype(np.int64)
+
+    def add(self, learner_ids, timestamps, stages):
+        """Fold a batch of events in; returns the number of events added (the rest are counted in `skipped`)."""
+        ids = np.asarray(learner_ids)
+        if not len(ids):
+            return 0
+        weeks = event_weeks(timestamps)
+        stage = stage_codes(stages)
+        valid = (weeks != NO_WEEK) & (stage >= 0)
+        if not valid.all():
+            self.skipped += int((~valid).sum())
+            ids, weeks, stage = ids[valid], weeks[valid], stage[valid]
+            if not len(ids):
+                return 0
+        idx = self._learner_index(ids)
+
+        order = np.argsort(idx, kind="stable")
+        idx, weeks, stage = idx[order], weeks[order], stage[order]
+        starts = np.flatnonzero(np.r_[True, idx[1:] != idx[:-1]])
+        touched = idx[starts]
+
+        old_enroll, old_active, old_stage = self.enroll[touched], self.active[touched], self.stage[touched]
+        known = old_enroll != _NEW
+        self._contribute(old_enroll[known], old_active[known], old_stage[known], -1)
+
+        enroll = np.minimum(old_enroll, np.minimum.reduceat(weeks, starts))
+        shift = np.where(known, old_enroll - enroll, 0)
+        active = np.where(shift < COHORT_WEEKS, old_active << np.minimum(shift, COHORT_WEEKS - 1).astype(np.uint64), np.uint64(0))
+        since = weeks - np.repeat(enroll, np.diff(np.r_[starts, len(idx)]))
+        bits = np.where(since < COHORT_WEEKS, np.uint64(1) << np.minimum(since, COHORT_WEEKS - 1).astype(np.uint64), np.uint64(0))
+        active |= np.bitwise_or.reduceat(bits, starts)
+        stage = np.maximum(old_stage, np.maximum.reduceat(stage, starts))
+
+        self.enroll[touched], self.active[touched], self.stage[touched] = enroll, active, stage
+        self._contribute(enroll, active, stage, 1)
+        self.last_week = int(weeks.max()) if self.last_week is None else max(self.last_week, int(weeks.max()))
+        self.events += len(ids)
+        return len(ids)
+
+    def add_frame(self, frame):
+        frame = event_frame(frame)
+        return self.add(frame["learner_id"].to_numpy(), frame["timestamp"], frame["stage"])
+
+    def funnel(self, cohorts=None):
+        """Funnel stages ({"stage", "learners", "percentage"}) of all learners, or of the given cohort weeks."""
+        if cohorts is None:
+            counts = self.stage_counts
+        else:
+            mask = np.isin(self.enroll, np.asarray(list(cohorts), dtype=np.int64)) & (self.stage >= 0)
+            counts = np.bincount(self.stage[mask], minlength=len(FUNNEL_STAGES))
+        learners = counts[::-1].cumsum()[::-1]
+        total = int(learners[0]) or 1
+        return [
+            {"stage": stage, "learners": int(v), "percentage": round(100.0 * float(v) / total, 1)}
+            for stage, v in zip(FUNNEL_STAGES, learners)
+        ]
+
+    def cohort_weeks(self):
+        return [] if self.first_week is None else list(range(self.first_week, self.first_week + len(self.retention)))
+
+    def retention_matrix(self, weeks=12, percent=True, last=None):
+        """(cohort weeks, [cohort, week since enrollment] matrix) of active learners, for non-empty cohorts.
+
+        As a percent of the cohort's size when `percent`; NaN where the week is
+        after the latest event seen. `last` keeps only the most recent cohorts.
+        """
+        weeks = min(weeks, COHORT_WEEKS)
+        cohorts = self.cohort_weeks()
+        matrix = self.retention[:, :weeks].astype(np.float64)
+        observed = np.asarray(cohorts, dtype=np.int64)[:, None] + np.arange(weeks) <= (self.last_week if cohorts else 0)
+        matrix[~observed] = np.nan
+        keep = self.retention[:, 0] > 0
+        if percent:
+            matrix = 100.0 * matrix / np.where(keep, self.retention[:, 0], 1)[:, None]
+        cohorts, matrix = [w for w, k in zip(cohorts, keep) if k], matrix[keep]
+        return (cohorts[-last:], matrix[-last:]) if last else (cohorts, matrix)
+
+
+def build_cohorts(frames):
+    """CohortEngine over an iterable of event DataFrames (e.g. read_events chunks)."""
+    engine = CohortEngine()
+    for frame in frames:
+        engine.add_frame(frame)
+    return engine
+
+
+def cohorts_from_data(data):
+    """CohortEngine over a dataset's `progress_events` (records or columns), or None without events."""
+    events = data.get("progress_events")
+    if not events:
+        return None
+    return build_cohorts([pd.DataFrame(events)])
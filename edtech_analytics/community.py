@@ -0,0 +1,210 @@
+"""
+Community content store: Reddit discussions, blog articles and news in SQLite.
+
+Posts live in one table, with their tags in a side table and their text in an
+FTS5 index (title, summary, source, category, tags). A query returns the match
+count and one page of posts: ranked by bm25 when there is search text (title
+and tag hits weigh most), newest first otherwise, optionally restricted to
+kinds, tags (any of) and a year range. Only the page is read, so tens of
+thousands of scraped posts cost no more to browse than a dozen.
+
+The database is in memory and seeded from COMMUNITY_DATA unless a file is given
+(EDTECH_COMMUNITY_DB); `python -m edtech_analytics community` loads scraped
+posts into a file. Re-adding a post with a known URL updates it.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import threading
+
+from .data import COMMUNITY_DATA
+from .search import tokenize
+
+COMMUNITY_DB = os.environ.get("EDTECH_COMMUNITY_DB")
+COMMUNITY_PAGE_SIZE = 10
+# post kind (communityData key) -> display label
+COMMUNITY_KINDS = {
+    "reddit_discussions": "Reddit discussions",
+    "blog_articles": "Blog articles",
+    "news_articles": "News",
+}
+POST_FIELDS = ("kind", "url", "title", "source", "summary", "category", "date", "year", "engagement", "reading_time")
+FTS_WEIGHTS = (8.0, 2.0, 1.0, 1.0, 4.0)  # bm25 weights of title, summary, source, category, tags
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    url TEXT UNIQUE,
+    title TEXT NOT NULL,
+    source TEXT,
+    summary TEXT,
+    category TEXT,
+    date TEXT,
+    year INTEGER,
+    engagement TEXT,
+    reading_time TEXT
+);
+CREATE INDEX IF NOT EXISTS posts_recent ON posts (year DESC, id DESC);
+CREATE INDEX IF NOT EXISTS posts_kind ON posts (kind, year DESC, id DESC);
+CREATE TABLE IF NOT EXISTS post_tags (
+    tag TEXT NOT NULL,
+    post_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (tag, post_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS post_tags_post ON post_tags (post_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(title, summary, source, category, tags, tokenize='unicode61 remove_diacritics 2');
+"""
+YEAR_RE = re.compile(r"\b(\d{4})\b")
+
+
+def fts_query(query):
+    """FTS5 MATCH expression for free text: every word must match, as a word prefix (None when empty)."""
+    words = tokenize(query)
+    return " AND ".join(f'"{w}"*' for w in words) if words else None
+
+
+def post_row(post, kind=None):
+    """posts-table values of a communityData item (Reddit items name their source `subreddit`)."""
+    date = str(post.get("date") or "")
+    year = YEAR_RE.search(date)
+    values = {
+        "kind": post.get("kind") or kind,
+        "url": post.get("url") or None,
+        "title": post.get("title") or "",
+        "source": post.get("source") or post.get("subreddit") or "",
+        "summary": post.get("summary") or "",
+        "category": post.get("category") or "",
+        "date": date,
+        "year": int(year.group(1)) if year else None,
+        "engagement": post.get("engagement") or "",
+        "reading_time": post.get("reading_time") or "",
+    }
+    if not values["kind"]:
+        raise ValueError(f"Post {values['title']!r} has no kind.")
+    return tuple(values[f] for f in POST_FIELDS)
+
+
+class CommunityStore:
+    """SQLite store of community posts with full-text search; one connection shared across threads under a lock."""
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        if path != ":memory:":
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def __len__(self):
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM posts").fetchone()[0]
+
+    def add(self, posts, kind=None):
+        """Insert or update (by URL) posts; `kind` applies to those without one. Returns the number added."""
+        n = 0
+        with self.lock, self.conn:
+            for post in posts:
+                row = post_row(post, kind)
+                post_id = self.conn.execute(
+                    f"INSERT INTO posts ({', '.join(POST_FIELDS)}) VALUES ({', '.join('?' * len(POST_FIELDS))}) "
+                    f"ON CONFLICT (url) DO UPDATE SET {', '.join(f'{f} = excluded.{f}' for f in POST_FIELDS)} RETURNING id",
+                    row,
+                ).fetchone()[0]
+                tags = list(dict.fromkeys(str(t) for t in post.get("tags") or ()))
+                self.conn.execute("DELETE FROM posts_fts WHERE rowid = ?", (post_id,))
+                self.conn.execute("DELETE FROM post_tags WHERE post_id = ?", (post_id,))
+                self.conn.executemany("INSERT INTO post_tags (tag, post_id, position) VALUES (?, ?, ?)", [(t, post_id, i) for i, t in enumerate(tags)])
+                fields = dict(zip(POST_FIELDS, row))
+                self.conn.execute(
+                    "INSERT INTO posts_fts (rowid, title, summary, source, category, tags) VALUES (?, ?, ?, ?, ?, ?)",
+                    (post_id, fields["title"], fields["summary"], fields["source"], fields["category"], " ".join(tags)),
+                )
+                n += 1
+        return n
+
+    def add_data(self, data):
+        """Add every post of a communityData-shaped dict ({kind: [post, ...]})."""
+        return sum(self.add(posts, kind) for kind, posts in data.items())
+
+    def search(self, query="", kinds=(), tags=(), years=None, page=0, page_size=COMMUNITY_PAGE_SIZE):
+        """(match count, page `page` of the matching posts as dicts with a "tags" list).
+
+        Best match first when `query` has words, newest first otherwise; `tags`
+        keeps posts with any of them, `years` is an inclusive (first, last) range.
+        """
+        match = fts_query(query)
+        where, params = [], []
+        if match:
+            source = "posts_fts JOIN posts ON posts.id = posts_fts.rowid"
+            where.append("posts_fts MATCH ?")
+            params.append(match)
+            order = f"bm25(posts_fts, {', '.join(map(str, FTS_WEIGHTS))}), posts.year DESC, posts.id DESC"
+        else:
+            source = "posts"
+            order = "posts.year DESC, posts.id DESC"
+        if kinds:
+            where.append(f"posts.kind IN ({', '.join('?' * len(kinds))})")
+            params += list(kinds)
+        if tags:
+            where.append(f"posts.id IN (SELECT post_id FROM post_tags WHERE tag IN ({', '.join('?' * len(tags))}))")
+            params += list(tags)
+        if years:
+            where.append("posts.year BETWEEN ? AND ?")
+            params += [int(years[0]), int(years[1])]
+        clause = f" WHERE {' AND '.join(where)}" if where else ""
+        with self.lock:
+            total = self.conn.execute(f"SELECT COUNT(*) FROM {source}{clause}", params).fetchone()[0]
+            rows = self.conn.execute(
+                f"SELECT posts.* FROM {source}{clause} ORDER BY {order} LIMIT ? OFFSET ?",
+                params + [page_size, page * page_size],
+            ).fetchall()
+            ids = [r["id"] for r in rows]
+            tag_rows = self.conn.execute(
+                f"SELECT post_id, tag FROM post_tags WHERE post_id IN ({', '.join('?' * len(ids))}) ORDER BY post_id, position",
+                ids,
+            ).fetchall() if ids else []
+        post_tags = {}
+        for post_id, tag in tag_rows:
+            post_tags.setdefault(post_id, []).append(tag)
+        return total, [{**dict(r), "tags": post_tags.get(r["id"], [])} for r in rows]
+
+    def facets(self, top_tags=50):
+        """Filter options: {"kinds": {kind: posts}, "tags": [(tag, posts)] most used first, "years": (first, last) or None}."""
+        with self.lock:
+            kinds = dict(self.conn.execute("SELECT kind, COUNT(*) FROM posts GROUP BY kind").fetchall())
+            tags = self.conn.execute(
+                "SELECT tag, COUNT(*) AS n FROM post_tags GROUP BY tag ORDER BY n DESC, tag LIMIT ?", (top_tags,)
+            ).fetchall()
+            years = self.conn.execute("SELECT MIN(year), MAX(year) FROM posts").fetchone()
+        return {"kinds": kinds, "tags": [tuple(t) for t in tags], "years": tuple(years) if years[0] is not None else None}
+
+    def close(self):
+        self.conn.close()
+
+
+def build_community_store(path=COMMUNITY_DB, data=COMMUNITY_DATA):
+    """CommunityStore over `path` (in memory when None), seeded with `data` when it has no posts yet."""
+    store = CommunityStore(path or ":memory:")
+    if data and not len(store):
+        store.add_data(data)
+    return store
+
+
+def read_posts(path, kind=None):
+    """Posts of a JSON file (communityData-shaped dict, or a list) or a JSON Lines file.
+
+    Posts of a list or JSON Lines file carry their own "kind", else get `kind`.
+    """
+    with open(path, encoding="utf-8") as fh:
+        if path.endswith(".jsonl"):
+            items = [json.loads(line) for line in fh if line.strip()]
+        else:
+            items = json.load(fh)
+    if isinstance(items, dict):
+        return [{**post, "kind": k} for k, posts in items.items() for post in posts]
+    return [{**post, "kind": post.get("kind") or kind} for post in items]
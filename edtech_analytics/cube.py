@@ -0,0 +1,124 @@
+"""
+Pre-aggregated filter cube: every chart's counts for each age x occupation x
+platform combination, built once per data load so a filter change is a lookup.
+"""
+
+import time
+
+import numpy as np
+
+from .dataset import read_only
+from .metrics import DAY_BIN_WIDTH, DAY_BINS, day_bins
+from .store import MULTI_SELECT_COLUMNS, SINGLE_CHOICE_COLUMNS, completed_labels
+
+
+class AggregationCube:
+    """Every chart's counts precomputed for each age x occupation x platform combination.
+
+    Each measure is a dense tensor indexed [age, occupation, platform, label]. Along a
+    filter axis, slot L (L = number of labels) holds rows with no answer and slot L + 1
+    is the "All" rollup, obtained by summing the axis rather than recounting rows.
+    The tensors are read-only (lookups hand out views of them to every session);
+    add() replaces them instead of updating them in place.
+    """
+
+    DIMENSIONS = ("age", "occupation", "platform")
+
+    def __init__(self, store):
+        start = time.perf_counter()
+        self.synthetic = store.synthetic  # see RespondentStore: counts across dimensions are then a random join
+        self.labels = {dim: list(store.labels[dim]) for dim in self.DIMENSIONS}
+        self.index = {dim: {label: i for i, label in enumerate(labels)} for dim, labels in self.labels.items()}
+        self.measure_labels = {col: list(store.labels[col]) for col in self._measure_columns()}
+        self.completed_index = [self.measure_labels["drop_point"].index(label) for label in completed_labels(self.measure_labels["drop_point"])]
+        self.measures = self._count(store)
+        self.build_seconds = time.perf_counter() - start
+
+    def _measure_columns(self):
+        return [c for c in SINGLE_CHOICE_COLUMNS if c not in self.DIMENSIONS] + list(MULTI_SELECT_COLUMNS)
+
+    def _count(self, store):
+        """Measure tensors (with "All" slots) for the rows of `store`, which must share this cube's labels."""
+        base = tuple(len(self.labels[dim]) + 1 for dim in self.DIMENSIONS)
+        cell = np.zeros(store.n, dtype=np.int64)
+        for dim, size in zip(self.DIMENSIONS, base):
+            codes = store.codes[dim].astype(np.int64)
+            cell = cell * size + np.where(codes < 0, size - 1, codes)
+        n_cells = int(np.prod(base))
+
+        measures = {"rows": np.bincount(cell, minlength=n_cells).reshape(base + (1,))}
+        for col in (c for c in SINGLE_CHOICE_COLUMNS if c not in self.DIMENSIONS):
+            width = len(store.labels[col])
+            codes = store.codes[col].astype(np.int64)
+            keep = codes >= 0
+            measures[col] = np.bincount(cell[keep] * width + codes[keep], minlength=n_cells * width).reshape(base + (width,))
+        for col in MULTI_SELECT_COLUMNS:
+            bits = store.bits[col]
+            per_label = [
+                np.bincount(cell[(bits & (np.uint64(1) << np.uint64(i))) != 0], minlength=n_cells)
+                for i in range(len(store.labels[col]))
+            ]
+            measures[col] = (np.stack(per_label, axis=-1) if per_label else np.zeros((n_cells, 0), dtype=np.int64)).reshape(base + (len(per_label),))
+        days, known = day_bins(store.numbers.get("dropoff_day", np.full(store.n, np.nan)), DAY_BIN_WIDTH, DAY_BINS)
+        measures["dropoff_day"] = np.bincount(cell[known] * DAY_BINS + days, minlength=n_cells * DAY_BINS).reshape(base + (DAY_BINS,))
+
+        # marginalize each filter axis into its trailing "All" slot
+        for axis in range(len(self.DIMENSIONS)):
+            for col, t in measures.items():
+                measures[col] = np.concatenate([t, t.sum(axis=axis, keepdims=True)], axis=axis)
+        return {col: read_only(t) for col, t in measures.items()}
+
+    def compatible(self, store):
+        """True if `store` uses exactly this cube's labels, so its counts can be added."""
+        return all(store.labels[dim] == self.labels[dim] for dim in self.DIMENSIONS) and all(
+            store.labels[col] == labels for col, labels in self.measure_labels.items()
+        )
+
+    def add(self, store):
+        """Fold newly appended respondents into every tensor in O(new rows + cells)."""
+        if not self.compatible(store):
+            raise ValueError("New respondents introduce labels the cube does not have; rebuild it.")
+        added = self._count(store)
+        self.synthetic = self.synthetic or store.synthetic
+        self.measures = {col: read_only(t + added[col]) for col, t in self.measures.items()}
+
+    @property
+    def nbytes(self):
+        return sum(t.nbytes for t in self.measures.values())
+
+    @property
+    def n_cells(self):
+        return int(np.prod(self.measures["rows"].shape[:-1]))
+
+    def lookup(self, filters):
+        """Counts shaped like RespondentStore.aggregate() for a filter combination, or None if a value is unknown."""
+        key = []
+        for dim in self.DIMENSIONS:
+            value = filters.get(dim)
+            if not value:
+                key.append(len(self.labels[dim]) + 1)
+            elif value in self.index[dim]:
+                key.append(self.index[dim][value])
+            else:
+                return None
+        key = tuple(key)
+        counts = {col: t[key] for col, t in self.measures.items() if col != "rows"}
+        counts["total"] = int(self.measures["rows"][key][0])
+        counts["completed"] = {}
+        # a filter dimension's own distribution: all its labels under the other filters
+        for axis, dim in enumerate(self.DIMENSIONS):
+            sliced = list(key)
+            sliced[axis] = slice(0, len(self.labels[dim]))
+            series = self.measures["rows"][tuple(sliced)][..., 0]
+            done = self.measures["drop_point"][tuple(sliced)][..., self.completed_index].sum(axis=-1)
+            if filters.get(dim):
+                keep = np.arange(len(series)) == key[axis]
+                series, done = np.where(keep, series, 0), np.where(keep, done, 0)
+            counts[dim] = series
+            counts["completed"][dim] = done
+        return counts
+
+
+def build_aggregation_cube(store):
+    """Precompute the filter cube for a respondent store."""
+    return AggregationCube(store)
@@ -0,0 +1,216 @@
+"""
+Embedded seed data (matches app.js dashboardData and communityData), extracted so the dashboard
+works immediately without a sheet. Read-only (see dataset.freeze): it is
+shared by every session.
+"""
+
+from .dataset import freeze
+
+# Source data (from app.js). See app.js for full original JS object.
+DASHBOARD_DATA = freeze({
+    "demographics": {
+        "total_respondents": 46,
+        "age_distribution": {"18-24": 35, "25-34": 11},
+        "occupation_distribution": {
+            "Student": 27,
+            "Employed full-time": 15,
+            "Unemployed": 3,
+            "Freelancer": 1
+        }
+    },
+    "platform_data": {
+        "primary_platforms": {
+            "YouTube educational content": 21,
+            "Coursera": 14,
+            "Udemy": 5,
+            "edX": 2,
+            "MasterClass": 1,
+            "Skillshare": 1,
+            "LinkedIn Learning": 1,
+            "Banking courses": 1
+        }
+    },
+    "dropoff_patterns": {
+        "drop_points": {
+            "Within the first week": 14,
+            "After 2-3 weeks": 9,
+            "Midway through the course": 9,
+            "Near the end of the course": 4,
+            "Multiple courses at different points": 5,
+            "Never dropped": 5
+        },
+        "funnel_data": [
+            {"stage": "Started course", "learners": 46, "percentage": 100.0},
+            {"stage": "Completed first week", "learners": 32, "percentage": 69.6},
+            {"stage": "Completed 2-3 weeks", "learners": 23, "percentage": 50.0},
+            {"stage": "Completed midway", "learners": 14, "percentage": 30.4},
+            {"stage": "Near completion", "learners": 10, "percentage": 21.7},
+            {"stage": "Successfully completed", "learners": 5, "percentage": 10.9}
+        ]
+    },
+    "dropoff_reasons": [
+        {"reason": "Lost interest in the subject", "count": 19},
+        {"reason": "Lack of motivation", "count": 17},
+        {"reason": "Lack of time", "count": 15},
+        {"reason": "Course didn't meet my expectations", "count": 14},
+        {"reason": "Boring or unengaging instructor", "count": 12},
+        {"reason": "Lack of interaction with instructors/peers", "count": 12},
+        {"reason": "Poor course quality", "count": 9},
+        {"reason": "Course content was too difficult", "count": 2}
+    ],
+    "desired_features": [
+        {"feature": "Gamification (points, badges, leaderboards)", "mentions": 25},
+        {"feature": "Mentor or study groups", "mentions": 23},
+        {"feature": "Personalized learning paths", "mentions": 22},
+        {"feature": "More interactive content", "mentions": 21},
+        {"feature": "Better progress tracking", "mentions": 21},
+        {"feature": "Certificates of completion", "mentions": 20},
+        {"feature": "Clearer course structure", "mentions": 18},
+        {"feature": "Networking opportunities with peers", "mentions": 12}
+    ],
+    "engagement_factors": {
+        "Lack of engaging content delivery": 2.96,
+        "Real-world application issues": 2.83,
+        "Insufficient feedback": 2.80,
+        "Inconsistent updates": 2.63,
+        "Deadlines/accountability": 2.52,
+        "Poor UI": 2.52,
+        "Content difficulty": 2.13
+    },
+    # lightweight community and industry data for Community & Research tabs (used for listing)
+    "platform_table": [
+        { "platform": "YouTube", "users": 21, "market_share": 45.7, "engagement": "High" },
+        { "platform": "Coursera", "users": 14, "market_share": 30.4, "engagement": "Medium" },
+        { "platform": "Udemy", "users": 5, "market_share": 10.9, "engagement": "Medium" },
+        { "platform": "edX", "users": 2, "market_share": 4.3, "engagement": "Low" },
+        { "platform": "MasterClass", "users": 1, "market_share": 2.2, "engagement": "Low" },
+        { "platform": "Others", "users": 3, "market_share": 6.5, "engagement": "Low" }
+    ]
+})
+
+# Community content (from app.js communityData): Reddit discussions, blog
+# articles and news. Seeds the community store (see community.py).
+COMMUNITY_DATA = freeze({
+    "reddit_discussions": [
+        {
+            "title": "What is the future of MOOCs?",
+            "subreddit": "r/academia",
+            "summary": "Discussion about MOOC effectiveness with users noting completion rates below 10% and the need for classroom environment",
+            "url": "https://www.reddit.com/r/academia/comments/17evl8f/what_is_the_future_of_moocs/",
+            "engagement": "Multiple active comments",
+            "date": "2023",
+            "category": "Future Trends"
+        },
+        {
+            "title": "Have MOOCs lost their cool?",
+            "subreddit": "r/datascience",
+            "summary": "Users discuss that 90% of people don't finish MOOC classes and courses are becoming bloated with unnecessary content",
+            "url": "https://www.reddit.com/r/datascience/comments/1eng1zz/have_moocs_lost_their_cool/",
+            "engagement": "38 upvotes, active discussion",
+            "date": "2024",
+            "category": "User Experience"
+        },
+        {
+            "title": "EdTech is booming, but are we solving real problems?",
+            "subreddit": "r/edtech",
+            "summary": "Critical discussion about whether EdTech focuses on genuine learning improvement or just visual appeal",
+            "url": "https://www.reddit.com/r/edtech/comments/1lu23y5/edtech_is_booming_but_are_we_actually_solving/",
+            "engagement": "64 upvotes, 66 comments",
+            "date": "2024",
+            "category": "Industry Analysis"
+        },
+        {
+            "title": "Anyone currently working in edtech? Layoffs discussion",
+            "subreddit": "r/edtech",
+            "summary": "Current EdTech employees discussing industry layoffs and market challenges",
+            "url": "https://www.reddit.com/r/edtech/comments/1gwkyr9/anyone_currently_working_in_edtech_how_do_you/",
+            "engagement": "Multiple responses",
+            "date": "2024",
+            "category": "Industry Challenges"
+        }
+    ],
+    "blog_articles": [
+        {
+            "title": "MOOC Interrupted: Top 10 Reasons Readers Didn't Complete Courses",
+            "source": "Open Culture",
+            "summary": "Analysis of 50+ responses identifying main reasons for MOOC abandonment including time constraints and content issues",
+            "url": "https://www.openculture.com/2013/04/10_reasons_you_didnt_complete_a_mooc.html",
+            "date": "2013",
+            "reading_time": "8 min",
+            "category": "User Research",
+            "tags": ["Completion Rates", "User Behavior", "MOOC Challenges"]
+        },
+        {
+            "title": "21+ Shocking Online Course Completion Rate Statistics",
+            "source": "BloggingX",
+            "summary": "Comprehensive statistics showing completion rates between 5-15% for free courses and 85-90% for cohort-based courses",
+            "url": "https://bloggingx.com/online-course-completion-statistics/",
+            "date": "2022",
+            "reading_time": "12 min",
+            "category": "Industry Statistics",
+            "tags": ["Statistics", "Completion Rates", "Cohort Learning"]
+        },
+        {
+            "title": "How Ed-tech Companies Can Ace at Student Retention",
+            "source": "MoEngage",
+            "summary": "Strategies for EdTech companies to improve student engagement and retention rates through data-driven approaches",
+            "url": "https://www.moengage.com/blog/ed-tech-companies-student-retention/",
+            "date": "2023",
+            "reading_time": "10 min",
+            "category": "Best Practices",
+            "tags": ["Retention", "Engagement", "Data Analytics"]
+        },
+        {
+            "title": "7 Student Retention Strategies for Online Schools",
+            "source": "NN Partners",
+            "summary": "Comprehensive guide covering early alert systems, academic advising, and community building for online education",
+            "url": "https://nn.partners/student-retention-strategies/",
+            "date": "2025",
+            "reading_time": "15 min",
+            "category": "Strategies",
+            "tags": ["Retention Strategies", "Online Learning", "Student Success"]
+        },
+        {
+            "title": "Customer Onboarding in EdTech: 10 Best Practices",
+            "source": "Userpilot",
+            "summary": "Examples from Duolingo, MasterClass, and Quizlet on effective user onboarding with surveys and gamification",
+            "url": "https://userpilot.com/blog/customer-onboarding-in-edtech/",
+            "date": "2025",
+            "reading_time": "7 min",
+            "category": "User Experience",
+            "tags": ["Onboarding", "UX Design", "Best Practices"]
+        }
+    ],
+    "news_articles": [
+        {
+            "title": "How Duolingo reignited user growth",
+            "source": "Lenny's Newsletter",
+            "summary": "Case study showing 21% increase in retention through gamification and social features",
+            "url": "https://www.lennysnewsletter.com/p/how-duolingo-reignited-user-growth",
+            "date": "2023",
+            "reading_time": "20 min",
+            "category": "Case Study",
+            "tags": ["Duolingo", "Growth", "Gamification", "Product Strategy"]
+        },
+        {
+            "title": "How Colleges Leverage Data to Retain Students",
+            "source": "EdTech Magazine",
+            "summary": "Florida International University achieved 10% increase in four-year graduation rates using analytics",
+            "url": "https://edtechmagazine.com/higher/article/2024/05/how-colleges-leverage-data-retain-students-enrollment-cliff-looms",
+            "date": "2024",
+            "reading_time": "6 min",
+            "category": "Higher Education",
+            "tags": ["Data Analytics", "Student Success", "Retention"]
+        },
+        {
+            "title": "How Data-Driven Strategies Transform EdTech",
+            "source": "WebEngage",
+            "summary": "Aakash Digital saw 31% increase in live class attendance through personalized engagement campaigns",
+            "url": "https://webengage.com/blog/how-edtech-companies-increase-student-engagement-revenue/",
+            "date": "2025",
+            "reading_time": "8 min",
+            "category": "Success Stories",
+            "tags": ["Data-Driven", "Engagement", "Personalization"]
+        }
+    ]
+})
@@ -0,0 +1,77 @@
+"""
+Immutable datasets, shared by every session and rerun.
+
+freeze() turns a dataset dict into FrozenDicts and tuples (numpy arrays are
+marked read-only in place), so one loaded dataset can be handed to every
+session without defensive copies: an attempt to mutate it raises instead of
+changing what every other session sees. A filtered result is a DataView, a
+read-only overlay of the filtered series on the shared dataset; the keys it
+does not override resolve to the dataset itself.
+"""
+
+from collections.abc import Mapping
+
+
+class FrozenDict(dict):
+    """Read-only dict; still a dict to json, pandas and Streamlit's cache hashing."""
+
+    __slots__ = ()
+
+    def _read_only(self, *args, **kwargs):
+        raise TypeError("Datasets are read-only; build a new dict instead (e.g. {**data, key: value}).")
+
+    __setitem__ = __delitem__ = __ior__ = clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return (FrozenDict, (dict(self),))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def read_only(array):
+    """Mark a numpy array read-only in place (views of it stay read-only too); returns it."""
+    array.flags.writeable = False
+    return array
+
+
+def freeze(value):
+    """Deep read-only form of a dataset value: dicts -> FrozenDict, lists -> tuples, arrays read-only."""
+    if isinstance(value, FrozenDict):
+        return value  # only freeze() builds them, so already frozen all the way down
+    if isinstance(value, dict):
+        return FrozenDict((k, freeze(v)) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(v) for v in value)
+    if hasattr(value, "setflags") and value.ndim:  # numpy array (not scalar); numpy isn't imported here
+        return read_only(value)
+    return value
+
+
+class DataView(Mapping):
+    """Read-only overlay of per-filter series on a shared dataset; nothing of the dataset is copied."""
+
+    __slots__ = ("base", "overrides")
+
+    def __init__(self, base, overrides):
+        self.base = base
+        self.overrides = overrides
+
+    def __getitem__(self, key):
+        if key in self.overrides:
+            return self.overrides[key]
+        return self.base[key]
+
+    def __iter__(self):
+        yield from self.base
+        yield from (k for k in self.overrides if k not in self.base)
+
+    def __len__(self):
+        return len(self.base) + sum(1 for k in self.overrides if k not in self.base)
+
+    def to_dict(self):
+        """Plain (shallow) dict, for serializers that need one."""
+        return {**self.base, **self.overrides}
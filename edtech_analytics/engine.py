@@ -0,0 +1,209 @@
+"""
+Headless analytics engine: load -> filter -> aggregate -> export.
+
+Nothing here imports Streamlit, Plotly or gspread, so reports can be computed
+offline (see `python -m edtech_analytics`) or from any other process.
+"""
+
+import itertools
+import json
+
+import pandas as pd
+
+from .cohorts import CohortEngine, cohorts_from_data
+from .cube import build_aggregation_cube
+from .data import DASHBOARD_DATA
+from .dataset import DataView, freeze
+from .exports import export_respondents, generate_csv_bytes, generate_json_bytes
+from .metrics import HistogramSketch, completion_rate
+from .profiling import count, span
+from .search import build_search_index, tokenize
+from .store import RespondentStore, build_respondent_store, completed_labels, funnel_from_drop_points
+
+FILTER_DIMENSIONS = ("age", "occupation", "platform")
+
+
+def dataset_funnel(data, filters):
+    """(the dataset's own funnel_data, whether it reflects the filters), or (None, True) to derive it from drop points.
+
+    Unfiltered, the dataset's funnel is shown as given. A funnel that its own drop
+    points don't reproduce (e.g. a sheet's funnel tab next to the embedded drop
+    points) comes from another source and can't be sliced, so it is kept as is.
+    """
+    patterns = data.get("dropoff_patterns") or {}
+    funnel = patterns.get("funnel_data")
+    if not funnel:
+        return None, True
+    if not any(filters.get(dim) for dim in FILTER_DIMENSIONS):
+        return funnel, True
+    derived = funnel_from_drop_points(patterns.get("drop_points") or {})
+    if [f["learners"] for f in derived] != [f["learners"] for f in funnel]:
+        return funnel, False
+    return None, True
+
+
+def get_filtered_data(data, filters, store=None, cube=None, index=None, fuzzy=False):
+    """Slice the respondent store by the filters and re-aggregate every chart series.
+
+    With a cube, the series are looked up instead of recounted; with a search index,
+    the free-text search is resolved against it instead of scanning the labels.
+    A synthetic store (rows expanded from aggregates) has no real joint
+    distribution: there a selected age / occupation / platform only narrows its own
+    marginal, every other series covers all respondents ("cross_filtered" is False),
+    and the total is only known for a single selected dimension.
+    Returns a read-only DataView: the filtered series over `data`, which is not copied.
+    """
+    if cube is None and store is None:
+        store = build_respondent_store(data)
+    synthetic = (cube if cube is not None else store).synthetic
+    selected = {dim: filters[dim] for dim in FILTER_DIMENSIONS if filters.get(dim)}
+    cross_filtered = not (synthetic and selected)
+    slice_filters = filters if cross_filtered else {}
+    counts = cube.lookup(slice_filters) if cube is not None else None
+    if counts is None:
+        if cube is not None:
+            count("cube.miss")
+        store = store if store is not None else build_respondent_store(data)
+        with span("filter.scan"):
+            counts = store.aggregate(store.mask(slice_filters))
+        labels = store.labels
+    else:
+        count("cube.hit")
+        labels = {**cube.labels, **cube.measure_labels}
+
+    def as_map(col):
+        return {k: int(v) for k, v in zip(labels[col], counts[col]) if v}
+
+    distributions = {dim: as_map(dim) for dim in FILTER_DIMENSIONS}
+    total = counts["total"]
+    if not cross_filtered:
+        distributions.update({dim: {k: v for k, v in distributions[dim].items() if k == value} for dim, value in selected.items()})
+        total = sum(distributions[next(iter(selected))].values()) if len(selected) == 1 else None
+    drop_points = {k: int(v) for k, v in zip(labels["drop_point"], counts["drop_point"])}
+    filtered = {"cross_filtered": cross_filtered}
+    filtered["demographics"] = {
+        "total_respondents": total,
+        "age_distribution": distributions["age"],
+        "occupation_distribution": distributions["occupation"],
+    }
+    filtered["platform_data"] = {"primary_platforms": distributions["platform"]}
+    funnel, funnel_filtered = dataset_funnel(data, slice_filters)
+    if funnel is None:
+        funnel, funnel_filtered = funnel_from_drop_points(drop_points), True
+    # synthesized drop-off days and completers per group are a random join, not data
+    median = None if synthetic else HistogramSketch(counts=counts["dropoff_day"]).quantile(0.5)
+    filtered["dropoff_patterns"] = {
+        "drop_points": drop_points,
+        "funnel_data": funnel,
+        "funnel_filtered": funnel_filtered and cross_filtered,
+        "median_dropoff_day": median,
+        "dropoff_days": [int(v) for v in counts["dropoff_day"]],
+    }
+    filtered["completion"] = {
+        "rate": completion_rate(drop_points, completed_labels(labels["drop_point"])),
+        "by_age": None if synthetic else {k: int(v) for k, v in zip(labels["age"], counts["completed"]["age"]) if k in distributions["age"]},
+        "by_occupation": None if synthetic else {k: int(v) for k, v in zip(labels["occupation"], counts["completed"]["occupation"]) if k in distributions["occupation"]},
+    }
+    reasons = [{"reason": k, "count": int(v)} for k, v in zip(labels["reasons"], counts["reasons"])]
+    features = [{"feature": k, "mentions": int(v)} for k, v in zip(labels["features"], counts["features"])]
+    # Search filter: apply to dropoff_reasons and desired_features
+    search = (filters.get("search") or "").strip().lower()
+    if not tokenize(search):
+        search = ""  # punctuation only (e.g. "?", "*"): no term to search for
+    if search and index is not None:
+        count("search.index")
+        keep_reasons = set(index.search(search, "reasons", fuzzy=fuzzy).tolist())
+        keep_features = set(index.search(search, "features", fuzzy=fuzzy).tolist())
+        reasons = [r for i, r in enumerate(reasons) if i in keep_reasons]
+        features = [f for i, f in enumerate(features) if i in keep_features]
+        search = ""
+    filtered["dropoff_reasons"] = [r for r in reasons if r["count"] and search in r["reason"].lower()]
+    filtered["desired_features"] = [f for f in features if f["mentions"] and search in f["feature"].lower()]
+    return DataView(data, freeze(filtered))
+
+
+def df_from_funnel(funnel_list):
+    return pd.DataFrame(funnel_list)
+
+
+def df_from_dropoff(reasons):
+    return pd.DataFrame(reasons)
+
+
+def df_from_desired(features):
+    return pd.DataFrame(features)
+
+
+def df_from_platforms(platforms_map):
+    df = pd.DataFrame([{"platform": k, "users": v} for k, v in platforms_map.items()])
+    # If you want market_share and engagement, use platform_table in DASHBOARD_DATA
+    return df
+
+
+def load_data(path=None):
+    """Read-only dataset from a JSON file shaped like DASHBOARD_DATA, or the embedded data when no path is given."""
+    if not path:
+        return DASHBOARD_DATA
+    with open(path, encoding="utf-8") as fh:
+        return freeze(json.load(fh))
+
+
+class Engine:
+    """One loaded dataset with its respondent store, filter cube, search index and (with progress events) cohorts."""
+
+    def __init__(self, data=None, use_cube=True):
+        self.data = freeze(data) if data is not None else DASHBOARD_DATA
+        self.store = build_respondent_store(self.data)
+        self.cube = build_aggregation_cube(self.store) if use_cube else None
+        self.index = build_search_index(self.store)
+        self.index_labels = {col: list(v) for col, v in self.store.labels.items()}
+        self.cohorts = cohorts_from_data(self.data)
+
+    @classmethod
+    def from_json(cls, path, **kwargs):
+        return cls(load_data(path), **kwargs)
+
+    def append(self, records):
+        """Add new responses in O(new rows) amortized: the store appends into spare capacity (see
+        RespondentStore.concat) and the cube folds in only the new rows. New labels rebuild the cube, and
+        new comments or labels rebuild the search index, both O(total rows)."""
+        new = RespondentStore.from_records(records, labels=self.store.labels)
+        self.store = self.store.concat(new)
+        if self.cube is not None:
+            if self.cube.compatible(new):
+                self.cube.add(new)
+            else:
+                self.cube = build_aggregation_cube(self.store)
+        if new.text or new.labels != self.index_labels:
+            self.index = build_search_index(self.store)
+            self.index_labels = {col: list(v) for col, v in self.store.labels.items()}
+        return new.n
+
+    def add_events(self, frame):
+        """Fold a DataFrame of progress events (learner_id, timestamp, stage) into the cohorts."""
+        if self.cohorts is None:
+            self.cohorts = CohortEngine()
+        return self.cohorts.add_frame(frame)
+
+    def filter_options(self):
+        return {dim: list(self.store.labels[dim]) for dim in FILTER_DIMENSIONS}
+
+    def filter_combinations(self):
+        """Every age x occupation x platform filter dict, "" standing for All."""
+        options = [[""] + labels for labels in self.filter_options().values()]
+        for values in itertools.product(*options):
+            yield dict(zip(FILTER_DIMENSIONS, values))
+
+    def filtered(self, filters, fuzzy=False):
+        return get_filtered_data(self.data, filters, store=self.store, cube=self.cube, index=self.index, fuzzy=fuzzy)
+
+    def summary_csv(self, filters):
+        return generate_csv_bytes(self.filtered(filters))
+
+    def summary_json(self, filters):
+        return generate_json_bytes(self.filtered(filters))
+
+    def export_respondents(self, filters, fmt="csv", compress=False):
+        if self.store.synthetic:
+            raise ValueError("The dataset has only aggregates; there are no respondent rows to export.")
+        return export_respondents(self.store, self.store.mask(filters), fmt, compress=compress)
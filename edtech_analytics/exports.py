@@ -0,0 +1,152 @@
+"""
+Exports.
+
+Summary exports combine the filtered chart series. Respondent-level exports
+are generated on demand and streamed in row chunks: rows are decoded from the
+store chunk by chunk, serialized, optionally gzipped, and spooled to a temp
+file that moves to disk past EXPORT_SPOOL_BYTES. The dashboard's download
+button hands Streamlit the file's bytes, so it buffers the whole export in
+memory; the CLI (`render --respondents`) copies the spooled file in chunks.
+"""
+
+import csv
+import io
+import json
+import tempfile
+import zlib
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .dataset import DataView
+from .profiling import span
+from .store import MULTI_SELECT_COLUMNS, SINGLE_CHOICE_COLUMNS
+
+def generate_csv_bytes(filtered):
+    """Return CSV bytes for download (combines main tables)."""
+    out = io.StringIO()
+    writer = csv.writer(out, lineterminator="\n")
+    # demographics -> Age Distribution
+    writer.writerow(["Category", "Item", "Value", "Filter_Applied"])
+    for age, count in filtered["demographics"]["age_distribution"].items():
+        writer.writerow(["Age Distribution", age, count, ""])
+    for occ, cnt in filtered["demographics"]["occupation_distribution"].items():
+        writer.writerow(["Occupation", occ, cnt, ""])
+    for platform, cnt in filtered["platform_data"]["primary_platforms"].items():
+        writer.writerow(["Platform Usage", platform, cnt, ""])
+    for r in filtered["dropoff_reasons"]:
+        writer.writerow(["Dropout Reasons", r["reason"], r["count"], ""])
+    for f in filtered["desired_features"]:
+        writer.writerow(["Desired Features", f["feature"], f["mentions"], ""])
+    return out.getvalue().encode("utf-8")
+
+# dataset series that don't depend on the filters but belong in a summary (never the raw respondents or events)
+SUMMARY_STATIC_KEYS = ("engagement_factors", "platform_table")
+
+
+def generate_json_bytes(filtered):
+    """Return JSON bytes of the filtered series and the static summary tables."""
+    series = filtered.overrides if isinstance(filtered, DataView) else filtered
+    export = {
+        "export_timestamp": datetime.utcnow().isoformat() + "Z",
+        "filtered": {**series, **{key: filtered[key] for key in SUMMARY_STATIC_KEYS if key in filtered}},
+        "metadata": {
+            "total_respondents": filtered["demographics"]["total_respondents"],
+            "completion_rate": filtered["completion"]["rate"],
+            "dashboard_version": "Streamlit port"
+        }
+    }
+    return json.dumps(export, indent=2).encode("utf-8")
+
+EXPORT_CHUNK_ROWS = 100_000
+EXPORT_SPOOL_BYTES = 32 * 1024 * 1024
+EXPORT_FORMATS = {
+    "csv": ("CSV", "text/csv"),
+    "jsonl": ("JSON Lines", "application/x-ndjson"),
+    "parquet": ("Parquet", "application/vnd.apache.parquet"),
+}
+
+
+def decode_bits(bits, labels, sep="; "):
+    """Object array of `sep`-joined labels for an array of bitsets (each distinct bitset is decoded once)."""
+    uniques, inverse = np.unique(bits, return_inverse=True)
+    decoded = np.array([sep.join(label for i, label in enumerate(labels) if u >> i & 1) for u in uniques.tolist()], dtype=object)
+    return decoded[inverse] if len(decoded) else np.full(len(bits), "", dtype=object)
+
+
+def iter_respondent_frames(store, mask, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Yield the masked respondents as DataFrames of at most `chunk_rows` decoded rows.
+
+    No matching rows still yields one empty, typed frame, so every format writes its header / schema.
+    """
+    decoders = {col: np.array(store.labels[col] + [""], dtype=object) for col in SINGLE_CHOICE_COLUMNS}
+    rows = np.flatnonzero(mask)
+    for start in range(0, max(len(rows), 1), chunk_rows):
+        idx = rows[start:start + chunk_rows]
+        frame = {col: decoders[col][store.codes[col][idx]] for col in SINGLE_CHOICE_COLUMNS}
+        frame.update({col: decode_bits(store.bits[col][idx], store.labels[col]) for col in MULTI_SELECT_COLUMNS})
+        frame.update({col: values[idx] for col, values in store.text.items()})
+        frame.update({col: values[idx] for col, values in store.numbers.items()})
+        frame = pd.DataFrame(frame)
+        if not len(idx):
+            frame = frame.astype({col: "str" for col in frame.columns if col not in store.numbers})
+        yield frame
+
+
+def iter_csv_chunks(frames):
+    for i, frame in enumerate(frames):
+        yield frame.to_csv(index=False, header=(i == 0)).encode("utf-8")
+
+
+def iter_jsonl_chunks(frames):
+    for frame in frames:
+        if frame.empty:
+            continue  # JSON Lines has no header: an empty export is an empty file
+        yield (frame.to_json(orient="records", lines=True, force_ascii=False).rstrip("\n") + "\n").encode("utf-8")
+
+
+def iter_gzip(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 -> gzip container
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def write_parquet(frames, sink):
+    """Write each frame as a Parquet row group (requires pyarrow); an empty frame still writes the schema."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    for frame in frames:
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        if writer is None:
+            writer = pq.ParquetWriter(sink, table.schema, compression="zstd")
+        writer.write_table(table)
+    if writer is not None:
+        writer.close()
+
+
+def export_respondents(store, mask, fmt="csv", compress=False, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Stream the masked respondents into a rewound spooled temp file in `fmt` (csv, jsonl, parquet)."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{fmt}'.")
+    out = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_BYTES)
+    with span(f"export.respondents.{fmt}"):
+        frames = iter_respondent_frames(store, mask, chunk_rows)
+        if fmt == "parquet":
+            write_parquet(frames, out)  # Parquet compresses its pages itself
+        else:
+            chunks = iter_csv_chunks(frames) if fmt == "csv" else iter_jsonl_chunks(frames)
+            for chunk in iter_gzip(chunks) if compress else chunks:
+                out.write(chunk)
+    out.seek(0)
+    return out
+
+
+def export_file_name(fmt, compress=False):
+    suffix = fmt + (".gz" if compress and fmt != "parquet" else "")
+    return f"edtech-respondents-{datetime.now().strftime('%Y%m%d_%H%M')}.{suffix}"
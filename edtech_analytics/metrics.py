@@ -0,0 +1,118 @@
+"""
+Derived KPIs.
+
+Everything here is computed from running counts, so it can be maintained
+incrementally: the completion rate and funnel come from drop-point counts, and
+drop-off timing from a fixed-width histogram sketch whose quantiles are exact to
+within one bin. Counts and sketches from separate batches simply add up.
+"""
+
+import numpy as np
+
+# Drop-off day histogram: 1-day bins; the last bin collects everything later.
+DAY_BIN_WIDTH = 1.0
+DAY_BINS = 120
+# External benchmark (not derivable from the survey): MOOC median completion rate, %
+INDUSTRY_MEDIAN_COMPLETION = 12.6
+
+
+def day_bins(days, width=DAY_BIN_WIDTH, bins=DAY_BINS):
+    """Bin indexes for the non-NaN entries of `days`, plus the boolean mask of those entries."""
+    days = np.asarray(days, dtype=np.float64)
+    known = ~np.isnan(days)
+    return np.clip((days[known] // width).astype(np.int64), 0, bins - 1), known
+
+
+class HistogramSketch:
+    """Fixed-width streaming histogram: O(bins) memory, mergeable, quantiles within one bin width."""
+
+    def __init__(self, width=DAY_BIN_WIDTH, bins=DAY_BINS, counts=None):
+        self.width = width
+        self.counts = np.zeros(bins, dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+
+    @property
+    def count(self):
+        return int(self.counts.sum())
+
+    def add(self, values):
+        idx, _ = day_bins(values, self.width, len(self.counts))
+        self.counts += np.bincount(idx, minlength=len(self.counts))
+        return self
+
+    def merge(self, other):
+        self.counts += other.counts
+        return self
+
+    def quantile(self, q):
+        """Linearly interpolated q-quantile (None when empty)."""
+        total = self.counts.sum()
+        if not total:
+            return None
+        target = q * total
+        cum = np.cumsum(self.counts)
+        i = int(np.searchsorted(cum, target, side="left"))
+        below = cum[i] - self.counts[i]
+        return float((i + (target - below) / self.counts[i]) * self.width)
+
+
+def completion_rate(drop_counts, completed_labels):
+    """Percent of respondents whose drop point is a completion label (None when there are none)."""
+    total = sum(drop_counts.values())
+    if not total:
+        return None
+    return round(100.0 * sum(drop_counts.get(label, 0) for label in completed_labels) / total, 1)
+
+
+def kpis(filtered):
+    """Headline KPIs of a filtered dataset (see get_filtered_data)."""
+    patterns = filtered["dropoff_patterns"]
+    funnel = [stage["learners"] for stage in patterns["funnel_data"]]
+    started = funnel[0] if funnel else 0
+    return {
+        "total_respondents": filtered["demographics"]["total_respondents"],
+        "completion_rate": filtered["completion"]["rate"],
+        "median_dropoff_day": patterns.get("median_dropoff_day"),
+        "first_week_dropoff": round(100.0 * (started - funnel[1]) / started, 1) if started and len(funnel) > 1 else None,
+        "industry_median_completion": INDUSTRY_MEDIAN_COMPLETION,
+    }
+
+
+# Drop-off heatmaps. Drop-off days count from enrollment, so a week row is
+# day // 7 and its columns are the days of that week; the fractional part of a
+# day is the time of day.
+HEATMAP_WEEKS = 4
+HEATMAP_MAX_WEEKS = (DAY_BINS - 1) // 7  # the last histogram bin is the overflow bin
+HEATMAP_MAX_ROWS = 24
+
+
+def week_day_matrix(day_counts, weeks=HEATMAP_WEEKS):
+    """weeks x 7 drop-off counts from a 1-day histogram (HistogramSketch.counts); later drop-offs are left out."""
+    if not 1 <= weeks <= HEATMAP_MAX_WEEKS:
+        raise ValueError(f"weeks must be between 1 and {HEATMAP_MAX_WEEKS}")
+    counts = np.asarray(day_counts, dtype=np.int64)[:weeks * 7]
+    return np.pad(counts, (0, weeks * 7 - len(counts))).reshape(weeks, 7)
+
+
+def day_hour_matrix(days, weeks=HEATMAP_WEEKS):
+    """(weeks * 7) x 24 drop-off counts from raw drop-off days, one row per day since enrollment."""
+    days = np.asarray(days, dtype=np.float64)
+    days = days[(days >= 0) & (days < weeks * 7)]  # also drops NaN
+    return np.bincount((days * 24).astype(np.int64), minlength=weeks * 7 * 24).reshape(weeks * 7, 24)
+
+
+def bucket_rows(matrix, max_rows=HEATMAP_MAX_ROWS):
+    """Sum runs of consecutive rows so at most `max_rows` remain; returns (matrix, rows per bucket)."""
+    matrix = np.asarray(matrix)
+    step = -(-len(matrix) // max_rows) if len(matrix) > max_rows else 1
+    pad = -len(matrix) % step
+    matrix = np.pad(matrix, [(0, pad)] + [(0, 0)] * (matrix.ndim - 1))
+    return matrix.reshape(-1, step, *matrix.shape[1:]).sum(axis=1), step
+
+
+def bucket_labels(unit, n, step):
+    """Row labels for bucket_rows output: "Week 3" or "Weeks 3-4"."""
+    out = []
+    for start in range(1, n + 1, step):
+        end = min(start + step - 1, n)
+        out.append(f"{unit} {start}" if start == end else f"{unit}s {start}-{end}")
+    return out
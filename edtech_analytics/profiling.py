@@ -0,0 +1,231 @@
+"""
+Lightweight per-rerun instrumentation.
+
+A Profile collects the timed spans, counters (cache hits / misses) and payload
+sizes of one unit of work, such as one Streamlit rerun. Hot-path code calls the
+module-level span() / count() / payload(); they record into the profile active
+in the current context, and spans outside any profile (background threads,
+deferred downloads) go straight to the process-wide STATS. Finished profiles
+feed STATS, which keeps a rolling window of every span's duration for
+p50/p95/p99 across sessions, and are written as one JSON line per profile to
+the "edtech_analytics.profile" logger when EDTECH_PROFILE_LOG is set
+(a file path, or "-" for stderr).
+
+Payload sizes can cost more than the work they describe (sizing a figure
+means serializing it), so callers check measuring_payloads() first; a
+profile measures them when the JSON log is on or when its owner asks
+(measure_payloads, e.g. while the dashboard's Profiling panel is open).
+
+Allocation tracking (tracemalloc, net KiB allocated per span) slows every
+thread of the process, so it only runs with EDTECH_PROFILE_ALLOC=1.
+"""
+
+import contextvars
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import defaultdict, deque
+from contextlib import contextmanager
+
+PROFILE_WINDOW = 500  # samples kept per span for the rolling percentiles
+PROFILE_ALLOC = os.environ.get("EDTECH_PROFILE_ALLOC") == "1"
+
+logger = logging.getLogger("edtech_analytics.profile")
+_current = contextvars.ContextVar("edtech_profile", default=None)
+
+
+class ProfileStats:
+    """Thread-safe rolling span durations and cumulative counters, shared by every profile in the process."""
+
+    def __init__(self, window=PROFILE_WINDOW):
+        self.window = window
+        self.lock = threading.Lock()
+        self.samples = defaultdict(lambda: deque(maxlen=self.window))
+        self.counters = defaultdict(int)
+        self.payloads = {}  # name -> last payload size, bytes
+        self.first = {}     # name -> first sample in this process (cold start: imports, first builds)
+        self.profiles = 0
+
+    def observe(self, name, ms):
+        with self.lock:
+            self.samples[name].append(ms)
+            self.first.setdefault(name, ms)
+
+    def record(self, profile):
+        with self.lock:
+            self.profiles += 1
+            for name, ms, _ in profile.spans:
+                self.samples[name].append(ms)
+                self.first.setdefault(name, ms)
+            for name, n in profile.counters.items():
+                self.counters[name] += n
+            self.payloads.update(profile.payloads)
+
+    def percentiles(self):
+        """{span: {"n", "p50_ms", "p95_ms", "p99_ms"}} over the rolling window."""
+        import numpy as np  # this module stays stdlib-only at import time
+
+        with self.lock:
+            samples = {name: np.fromiter(values, dtype=np.float64) for name, values in self.samples.items() if values}
+        return {
+            name: {"n": len(v), **{f"p{q}_ms": float(np.percentile(v, q)) for q in (50, 95, 99)}}
+            for name, v in sorted(samples.items())
+        }
+
+    def reset(self):
+        with self.lock:
+            self.samples.clear()
+            self.counters.clear()
+            self.payloads.clear()
+            self.first.clear()
+            self.profiles = 0
+
+
+STATS = ProfileStats()
+
+
+class Profile:
+    """Spans, counters and payload sizes of one unit of work (e.g. one rerun).
+
+    Use as a context manager, or call start() / finish() around top-level code;
+    phase(name) closes the previous phase span and opens the next, for
+    sequential script sections that aren't one block.
+    """
+
+    def __init__(self, name="rerun", stats=STATS, track_alloc=PROFILE_ALLOC):
+        self.name = name
+        self.stats = stats
+        self.track_alloc = track_alloc
+        self.spans = []     # (name, ms, net KiB allocated or None), in completion order
+        self.counters = defaultdict(int)
+        self.payloads = {}  # name -> bytes
+        self.measure_payloads = logger.isEnabledFor(logging.INFO)
+        self.started = None
+        self.total_ms = None
+        self._phase = None
+        self._token = None
+
+    def start(self):
+        if self.track_alloc and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self._token = _current.set(self)
+        self.started = time.perf_counter()
+        return self
+
+    def _mark(self):
+        return time.perf_counter(), tracemalloc.get_traced_memory()[0] if self.track_alloc else None
+
+    def _close(self, name, mark):
+        t, mem = self._mark()
+        alloc = (mem - mark[1]) / 1024 if mem is not None and mark[1] is not None else None
+        self.spans.append((name, (t - mark[0]) * 1000, alloc))
+
+    @contextmanager
+    def span(self, name):
+        mark = self._mark()
+        try:
+            yield
+        finally:
+            self._close(name, mark)
+
+    def phase(self, name):
+        if self._phase is not None:
+            self._close(*self._phase)
+        self._phase = (name, self._mark())
+
+    def count(self, name, n=1):
+        self.counters[name] += n
+
+    def payload(self, name, nbytes):
+        self.payloads[name] = int(nbytes)
+
+    def finish(self):
+        """Close the open phase, publish to the stats and the JSON log; returns the record."""
+        if self._phase is not None:
+            self._close(*self._phase)
+            self._phase = None
+        self.total_ms = (time.perf_counter() - self.started) * 1000
+        self.spans.append((self.name, self.total_ms, None))
+        if self._token is not None:
+            _current.reset(self._token)
+            self._token = None
+        self.stats.record(self)
+        record = self.to_dict()
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps(record))
+        return record
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.finish()
+
+    def to_dict(self):
+        return {
+            "ts": time.time(),
+            "profile": self.name,
+            "total_ms": self.total_ms,
+            "spans": [{"name": n, "ms": round(ms, 3), **({"alloc_kib": round(a, 1)} if a is not None else {})} for n, ms, a in self.spans],
+            "counters": dict(self.counters),
+            "payload_bytes": dict(self.payloads),
+        }
+
+
+def current():
+    """The profile active in this context, or None."""
+    return _current.get()
+
+
+@contextmanager
+def span(name):
+    """Time a block into the active profile, or straight into STATS when there is none."""
+    profile = _current.get()
+    if profile is not None:
+        with profile.span(name):
+            yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STATS.observe(name, (time.perf_counter() - start) * 1000)
+
+
+def count(name, n=1):
+    profile = _current.get()
+    if profile is not None:
+        profile.count(name, n)
+    else:
+        with STATS.lock:
+            STATS.counters[name] += n
+
+
+def measuring_payloads():
+    """Whether the active profile records payload sizes (only then are they worth computing)."""
+    profile = _current.get()
+    return profile is not None and profile.measure_payloads
+
+
+def payload(name, nbytes):
+    profile = _current.get()
+    if profile is not None:
+        profile.payload(name, nbytes)
+
+
+def configure_log(target=os.environ.get("EDTECH_PROFILE_LOG")):
+    """Send one JSON line per finished profile to `target` (a file path, or "-" for stderr)."""
+    if not target or logger.handlers:
+        return
+    handler = logging.StreamHandler(sys.stderr) if target == "-" else logging.FileHandler(target, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+configure_log()
@@ -0,0 +1,141 @@
+"""
+Search index.
+
+Built once per data load over the reason/feature labels and respondent
+comments. Terms map to sorted doc-id postings; an n-gram index over the
+vocabulary (not the documents) resolves substring, prefix and fuzzy terms,
+so a query costs O(vocabulary hits + postings), not O(rows).
+"""
+
+import bisect
+import re
+
+import numpy as np
+import pandas as pd
+
+from .store import MULTI_SELECT_COLUMNS, TEXT_COLUMNS
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(str(text).lower())
+
+
+def term_ngrams(term, n=3):
+    """All 1..n-grams of a term (short queries look their gram up directly)."""
+    return {term[i:i + k] for k in range(1, n + 1) for i in range(len(term) - k + 1)}
+
+
+def edit_distance(a, b, limit):
+    """Edit distance counting adjacent swaps as one edit; gives up (returning limit + 1) once every path exceeds `limit`."""
+    before, prev = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+            if before is not None and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cur[j] = min(cur[j], before[j - 2] + 1)
+        if min(cur) > limit:
+            return limit + 1
+        before, prev = prev, cur
+    return prev[-1]
+
+
+class SearchIndex:
+    """Inverted index over named fields of documents (doc id = position in the field's list).
+
+    Query syntax: whitespace-separated terms, all of which must match (AND). A term
+    matches any indexed word containing it; a trailing `*` restricts it to a prefix.
+    With fuzzy=True, words within a small edit distance also match.
+    """
+
+    def __init__(self, fields):
+        self.vocab = []
+        self.term_ids = {}
+        self.postings = {}  # field -> {term id: sorted doc ids}
+        for field, docs in fields.items():
+            tokens = pd.Series(docs, dtype=object).fillna("").astype(str).str.lower().str.findall(TOKEN_RE.pattern).explode().dropna()
+            if tokens.empty:
+                self.postings[field] = {}
+                continue
+            term_codes, uniques = pd.factorize(tokens)
+            ids = np.array([self.term_ids.setdefault(t, len(self.term_ids)) for t in uniques], dtype=np.int64)[term_codes]
+            n_docs = len(docs)
+            keys = np.unique(ids * n_docs + tokens.index.to_numpy(dtype=np.int64))
+            terms, doc_ids = np.divmod(keys, n_docs)
+            bounds = np.flatnonzero(np.diff(terms)) + 1
+            self.postings[field] = dict(zip(terms[np.r_[0, bounds]].tolist(), np.split(doc_ids, bounds)))
+        self.vocab = sorted(self.term_ids)
+        self.grams = {}
+        for term, tid in self.term_ids.items():
+            for gram in term_ngrams(term):
+                self.grams.setdefault(gram, []).append(tid)
+        self.grams = {g: np.array(sorted(t), dtype=np.int64) for g, t in self.grams.items()}
+        self.id_terms = {tid: term for term, tid in self.term_ids.items()}
+
+    def matching_terms(self, query_term, fuzzy=False):
+        """Term ids of indexed words matched by one query term."""
+        if query_term.endswith("*"):
+            prefix = query_term.rstrip("*")
+            start = bisect.bisect_left(self.vocab, prefix)
+            stop = bisect.bisect_left(self.vocab, prefix + "\uffff")
+            return {self.term_ids[t] for t in self.vocab[start:stop]}
+        grams = [query_term[i:i + 3] for i in range(max(len(query_term) - 2, 1))]
+        candidates = None
+        for gram in grams:
+            hit = self.grams.get(gram, np.empty(0, dtype=np.int64))
+            candidates = hit if candidates is None else np.intersect1d(candidates, hit, assume_unique=True)
+        matched = {int(t) for t in candidates if query_term in self.id_terms[int(t)]}
+        if fuzzy and len(query_term) >= 4:
+            limit = 1 if len(query_term) < 8 else 2
+            near = set()
+            for gram in term_ngrams(query_term, 2) - term_ngrams(query_term, 1):
+                near.update(self.grams.get(gram, np.empty(0, dtype=np.int64)).tolist())
+            matched |= {t for t in near if abs(len(self.id_terms[t]) - len(query_term)) <= limit
+                        and edit_distance(query_term, self.id_terms[t], limit) <= limit}
+        return matched
+
+    def search(self, query, field, fuzzy=False):
+        """Sorted doc ids of `field` matching every term of `query` (None for an empty query)."""
+        terms = []
+        for raw in str(query).lower().split():
+            words = tokenize(raw)
+            if words:
+                terms += words[:-1] + [words[-1] + ("*" if raw.endswith("*") else "")]
+        if not terms:
+            return None
+        postings = self.postings.get(field, {})
+        result = None
+        for term in terms:
+            hits = [postings[t] for t in self.matching_terms(term, fuzzy) if t in postings]
+            docs = np.unique(np.concatenate(hits)) if hits else np.empty(0, dtype=np.int64)
+            result = docs if result is None else np.intersect1d(result, docs, assume_unique=True)
+            if not len(result):
+                break
+        return result
+
+
+def build_search_index(store):
+    """Index the reason/feature labels and, when loaded, respondent comments."""
+    fields = {col: store.labels[col] for col in MULTI_SELECT_COLUMNS}
+    fields.update({col: store.text[col] for col in TEXT_COLUMNS if col in store.text})
+    return SearchIndex(fields)
+
+
+def search_comments(store, index, query, filters, fuzzy=False, limit=50):
+    """(match count, up to `limit` comments) for respondents within the filters whose comment matches the query.
+
+    Only the matching rows are checked against the filters, so cost follows the hit count, not the row count.
+    """
+    if "comment" not in store.text:
+        return 0, []
+    rows = index.search(query, "comment", fuzzy=fuzzy)
+    if rows is None:
+        return 0, []
+    for col in ("age", "occupation", "platform"):
+        value = filters.get(col)
+        if value:
+            code = store.labels[col].index(value) if value in store.labels[col] else -2
+            rows = rows[store.codes[col][rows] == code]
+    return len(rows), store.text["comment"][rows[:limit]].tolist()
@@ -0,0 +1,490 @@
+"""
+Google Sheets real-time fetch (optional).
+
+- requires service account credentials JSON or st.secrets
+- reads go through a process-wide SheetDataSource: one pooled client per
+  credential, one worksheet-list call to resolve tab aliases, batch reads
+  (run concurrently on a bounded pool) for every tab whose revision changed,
+  and a TTL before the next check
+- every API request has a timeout and is retried with exponential backoff on
+  transient errors (timeouts, connection errors, HTTP 429 / 5xx)
+- once loaded, refreshes run in the background and the last good tabs keep
+  being served until the new ones are swapped in
+- if it fails, the embedded DASHBOARD_DATA is used
+- gspread / google-auth are imported only when a live client is opened
+"""
+
+import importlib.util
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from .data import DASHBOARD_DATA
+from .dataset import freeze
+from .profiling import count, span
+from .store import drop_points_from_funnel
+
+
+def _installed(module):
+    try:
+        return importlib.util.find_spec(module) is not None
+    except ModuleNotFoundError:  # parent package missing
+        return False
+
+
+def gs_available():
+    """Whether gspread and google-auth are installed (checked without importing them)."""
+    return _installed("gspread") and _installed("google.oauth2.service_account")
+
+
+# logical tab -> accepted worksheet titles, in order of preference
+SHEET_TABS = {
+    "funnel": ("funnel", "Funnel"),
+    "dropoff_reasons": ("dropoff_reasons", "DropoffReasons", "dropoff"),
+    "desired_features": ("desired_features", "DesiredFeatures", "features"),
+    "platform_summary": ("platform_summary", "platforms"),
+    "demographics_age": ("demographics_age", "age_distribution"),
+    "demographics_occupation": ("demographics_occupation", "occupations"),
+}
+# logical tab -> canonical column -> accepted headers, in order of preference.
+# The first canonical column is the row label; it falls back to the sheet's first column.
+TAB_COLUMNS = {
+    "funnel": {"stage": ("stage", "Stage"), "learners": ("learners", "Learners", "value"), "percentage": ("percentage", "Percentage")},
+    "dropoff_reasons": {"reason": ("reason", "Reason", "dropoff_reason"), "count": ("count", "Count", "value")},
+    "desired_features": {"feature": ("feature", "Feature"), "mentions": ("mentions", "Mentions", "value")},
+    "platform_summary": {"platform": ("platform", "Platform"), "users": ("users", "Users", "value")},
+    "demographics_age": {"age_group": ("age_group", "age"), "count": ("count", "Count")},
+    "demographics_occupation": {"occupation": ("occupation", "Occupation"), "count": ("count", "Count")},
+}
+# numeric columns that are floats (others are integer counts); blank numeric cells count as 0
+FLOAT_COLUMNS = {"percentage"}
+SHEET_TTL_SECONDS = 300
+SHEET_TIMEOUT_SECONDS = 20  # per HTTP request
+SHEET_RETRIES = 3           # extra attempts after a transient failure
+SHEET_BACKOFF_SECONDS = 1.0  # doubled after every retry
+SHEET_FETCH_WORKERS = 4     # concurrent batch reads per refresh
+SHEET_BATCH_TABS = 2        # worksheets per batch read
+_SOURCE_IDS = itertools.count(1)
+RETRY_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+def parse_sheet_id(sheet_id_or_url):
+    """Accept either a full docs.google.com URL or a bare sheet ID."""
+    return sheet_id_or_url.split("/")[5] if "docs.google.com" in sheet_id_or_url else sheet_id_or_url
+
+
+def rows_to_frame(rows):
+    """First row is the header; returns the data rows as an object DataFrame indexed by sheet row number."""
+    if not rows:
+        return pd.DataFrame()
+    header = [str(h).strip() for h in rows[0]]
+    frame = pd.DataFrame(rows[1:], dtype=object)
+    frame = frame.reindex(columns=range(len(header)))  # ragged rows: pad short, drop cells past the header
+    frame.columns = header
+    frame.index = pd.RangeIndex(2, len(frame) + 2, name="row")
+    return frame
+
+
+def _blank(values):
+    return values.isna() | values.astype(str).str.strip().eq("")
+
+
+def normalize_tab(frame, columns, tab=""):
+    """Map a raw tab frame onto its canonical columns with vectorized coercion.
+
+    Aliases are resolved once from the header; per row, the first non-blank alias
+    wins. Blank rows are skipped. Rows with a blank label, a non-numeric value
+    or a count that isn't an integer are dropped and reported as
+    {"tab", "row", "reason", "values"}.
+    Returns (clean frame, rejections).
+    """
+    label, *numeric = columns
+    raw = {}
+    for canon, aliases in columns.items():
+        headers = [a for a in aliases if a in frame.columns]
+        if canon == label and len(frame.columns) and frame.columns[0] not in headers:
+            headers.append(frame.columns[0])
+        values = pd.Series(np.nan, index=frame.index, dtype=object)
+        for header in reversed(headers):  # earlier aliases overwrite later ones
+            col = frame[header]
+            values = values.where(_blank(col), col)
+        raw[canon] = values
+
+    out = pd.DataFrame(index=frame.index)
+    out[label] = raw[label].fillna("").astype(str).str.strip()
+    empty = out[label].eq("")
+    problems = pd.Series("", index=frame.index, dtype=object).mask(empty, f"missing {label}; ")
+    for canon in numeric:
+        values = pd.to_numeric(raw[canon], errors="coerce")
+        empty &= raw[canon].isna()
+        problems = problems.mask(values.isna() & raw[canon].notna(), problems + f"non-numeric {canon}; ")
+        if canon not in FLOAT_COLUMNS:  # counts: "1.5" would be truncated, 1e30 would overflow int64
+            problems = problems.mask(values.notna() & (values.mod(1).ne(0) | values.abs().ge(2**63)), problems + f"non-integer {canon}; ")
+        out[canon] = values if canon in FLOAT_COLUMNS else values.fillna(0)
+    rejected = problems.ne("") & ~empty
+    bad = frame[rejected]
+    rejections = [
+        {"tab": tab, "row": int(row), "reason": reason.rstrip("; "), "values": {k: v for k, v in values.items() if pd.notna(v)}}
+        for row, reason, values in zip(bad.index, problems[rejected], bad.to_dict(orient="records"))
+    ]
+    clean = out[problems.eq("")].reset_index(drop=True)
+    for canon in numeric:
+        if canon not in FLOAT_COLUMNS:
+            clean[canon] = clean[canon].astype(np.int64)
+    return clean, rejections
+
+
+def frame_records(frame):
+    """List of dicts with native Python values (much faster than to_dict for wide string columns)."""
+    names = list(frame.columns)
+    return [dict(zip(names, row)) for row in zip(*(frame[c].tolist() for c in names))]
+
+
+def resolve_tabs(titles, tabs=SHEET_TABS):
+    """Map each logical tab to the first alias present in `titles` (tabs with no match are left out)."""
+    present = set(titles)
+    return {key: next(a for a in aliases if a in present) for key, aliases in tabs.items() if present.intersection(aliases)}
+
+
+def is_transient(exc):
+    """True for errors worth retrying: timeouts, connection errors (requests' are OSErrors) and HTTP 429 / 5xx."""
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    return status in RETRY_STATUS or (status is None and isinstance(exc, (OSError, TimeoutError)))
+
+
+def with_retry(call, retries=SHEET_RETRIES, backoff=SHEET_BACKOFF_SECONDS, sleep=time.sleep):
+    """call() retried on transient errors, waiting backoff, 2*backoff, ... between attempts."""
+    for attempt in range(retries + 1):
+        try:
+            return call()
+        except Exception as exc:
+            if attempt == retries or not is_transient(exc):
+                raise
+            count("sheets.retry")
+            sleep(backoff * 2 ** attempt)
+
+
+def open_gspread_client(creds_json=None, timeout=SHEET_TIMEOUT_SECONDS):
+    """Authorize a gspread client from service account info, or from local/env credentials."""
+    if not gs_available():
+        raise RuntimeError("gspread/google oauth libs are not available in this environment.")
+    import gspread
+    from google.oauth2.service_account import Credentials
+
+    if creds_json:
+        scopes = [
+            "https://www.googleapis.com/auth/spreadsheets.readonly",
+            "https://www.googleapis.com/auth/drive.metadata.readonly",
+        ]
+        client = gspread.authorize(Credentials.from_service_account_info(creds_json, scopes=scopes))
+    else:
+        # will read from environment (e.g. streamlit secrets or GOOGLE_APPLICATION_CREDENTIALS)
+        client = gspread.service_account()  # uses env var or local credentials
+    client.set_timeout(timeout)
+    return client
+
+
+class GspreadBackend:
+    """Sheet backend over a live spreadsheet.
+
+    Google only exposes a modification time for the whole file (via Drive), so a
+    tab's revision is that time plus the tab's grid size; if Drive metadata is not
+    readable with the given scopes the revision is None and the tab is always re-read.
+    The two metadata requests run concurrently, and so do the batch reads of up to
+    `batch_tabs` worksheets each; the pool is shared by every refresh of this sheet.
+    """
+
+    def __init__(self, client, sheet_id, workers=SHEET_FETCH_WORKERS, batch_tabs=SHEET_BATCH_TABS):
+        self.spreadsheet = with_retry(lambda: client.open_by_key(sheet_id))
+        self.batch_tabs = batch_tabs
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="sheet-fetch")
+
+    def _modified(self):
+        try:
+            return with_retry(self.spreadsheet.get_lastUpdateTime)
+        except Exception:
+            return None
+
+    def list_tabs(self):
+        modified = self.pool.submit(self._modified)
+        meta = with_retry(self.spreadsheet.fetch_sheet_metadata)
+        modified = modified.result()
+        tabs = {}
+        for sheet in meta.get("sheets", []):
+            props = sheet["properties"]
+            grid = props.get("gridProperties", {})
+            tabs[props["title"]] = None if modified is None else (modified, grid.get("rowCount"), grid.get("columnCount"))
+        return tabs
+
+    def read_tabs(self, titles):
+        if not titles:
+            return {}
+        batches = [titles[i:i + self.batch_tabs] for i in range(0, len(titles), self.batch_tabs)]
+        out = {}
+        for part in self.pool.map(self._read_batch, batches):
+            out.update(part)
+        return out
+
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def _read_batch(self, titles):
+        ranges = ["'{}'".format(t.replace("'", "''")) for t in titles]
+        resp = with_retry(lambda: self.spreadsheet.values_batch_get(ranges, params={"valueRenderOption": "UNFORMATTED_VALUE"}))
+        return {t: vr.get("values", []) for t, vr in zip(titles, resp.get("valueRanges", []))}
+
+
+class InMemorySheetBackend:
+    """Fake sheet backend: {title: rows}. Each `set_tab` bumps that tab's revision; `calls` counts API-equivalent requests."""
+
+    def __init__(self, tabs=None):
+        self.tabs = {}
+        self.revisions = {}
+        self.calls = {"list_tabs": 0, "read_tabs": 0}
+        for title, rows in (tabs or {}).items():
+            self.set_tab(title, rows)
+
+    def set_tab(self, title, rows):
+        self.tabs[title] = [list(r) for r in rows]
+        self.revisions[title] = self.revisions.get(title, 0) + 1
+
+    def list_tabs(self):
+        self.calls["list_tabs"] += 1
+        return dict(self.revisions)
+
+    def read_tabs(self, titles):
+        self.calls["read_tabs"] += 1
+        return {t: [list(r) for r in self.tabs[t]] for t in titles}
+
+    def close(self):
+        pass
+
+
+class SheetDataSource:
+    """TTL-bounded cache of a spreadsheet's normalized tabs, keyed by logical tab name.
+
+    The first `get()` loads synchronously. After that, `get()` serves the cached
+    frames and, once the TTL expires, starts one background refresh (stale while
+    revalidate): it re-lists the tabs, batch-reads only those whose revision
+    changed, normalizes each once (see normalize_tab, rejected rows kept in
+    `rejections`) and swaps the new tabs in atomically. `start()` also refreshes
+    on a schedule, so one job keeps a shared source warm for every reader.
+    A failed refresh leaves the last good tabs in place and is kept in `error`.
+    `invalidate()` forces the check on the next `get()`; `clear()` also evicts
+    every cached tab. `close()` releases the source's threads for good.
+    """
+
+    def __init__(self, backend, ttl=SHEET_TTL_SECONDS, tabs=SHEET_TABS, columns=TAB_COLUMNS, clock=time.monotonic):
+        self.id = next(_SOURCE_IDS)  # unique per source in the process; (id, version) names one dataset
+        self.backend = backend
+        self.ttl = ttl
+        self.tabs = tabs
+        self.columns = columns
+        self.clock = clock
+        self.lock = threading.Lock()          # guards the cached state below
+        self.refresh_lock = threading.Lock()  # one refresh at a time
+        self.records = {}     # logical tab -> normalized DataFrame
+        self.rejections = {}  # logical tab -> list of rejected rows
+        self.revisions = {}   # logical tab -> (title, revision) the records were read at
+        self.loaded_at = None
+        self.refreshed_at = None
+        self.version = 0      # bumped whenever any cached tab changes
+        self.generation = 0   # bumped by clear(); a refresh started before it is discarded
+        self.mapped = None    # (version, dataset) memo for fetch_data_from_gsheet
+        self.error = None     # exception of the last failed refresh (None after a success)
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sheet-refresh")
+        self.pending = None   # Future of the background refresh in flight
+        self.stopped = threading.Event()
+        self.scheduler = None
+
+    @property
+    def ready(self):
+        return self.loaded_at is not None
+
+    @property
+    def refreshing(self):
+        pending = self.pending
+        return pending is not None and not pending.done()
+
+    def expired(self):
+        return self.loaded_at is None or self.clock() - self.loaded_at >= self.ttl
+
+    def get(self):
+        if not self.ready:
+            self.pending.result() if self.refreshing else self.refresh()
+        elif self.expired():
+            self.refresh_async()
+        with self.lock:
+            return dict(self.records)
+
+    def refresh(self):
+        """Re-check revisions now and re-read changed tabs; returns the list of logical tabs re-read."""
+        with self.refresh_lock:
+            try:
+                stale = self._refresh()
+            except Exception as exc:
+                self.error = exc
+                raise
+            self.error = None
+            return stale
+
+    def refresh_async(self):
+        """Start a background refresh unless one is already running; returns its Future."""
+        with self.lock:
+            if not self.refreshing:
+                self.pending = self.executor.submit(self.refresh)
+            return self.pending
+
+    def start(self, interval=None):
+        """Refresh now and then every `interval` seconds (default: the TTL) on a daemon thread."""
+        if self.scheduler is None:
+            self.scheduler = threading.Thread(target=self._schedule, args=(interval or self.ttl,), daemon=True, name="sheet-schedule")
+            self.scheduler.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+
+    def close(self):
+        """Stop the schedule and shut down the refresh and fetch threads (a refresh in flight finishes, then is dropped)."""
+        self.stop()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.backend.close()
+
+    def _schedule(self, interval):
+        while not self.stopped.is_set():
+            try:
+                self.refresh_async().result()
+            except Exception:
+                pass  # kept in self.error; the next tick retries
+            self.stopped.wait(interval)
+
+    def invalidate(self):
+        with self.lock:
+            self.loaded_at = None
+
+    def clear(self):
+        with self.lock:
+            self.records, self.rejections, self.revisions, self.loaded_at = {}, {}, {}, None
+            self.version += 1
+            self.generation += 1
+
+    def _refresh(self):
+        # All API calls and parsing happen outside self.lock, so readers keep
+        # getting the previous tabs until the finished set is swapped in.
+        with self.lock:
+            generation = self.generation
+            records, rejections, revisions = dict(self.records), dict(self.rejections), dict(self.revisions)
+        with span("sheets.list_tabs"):
+            listed = self.backend.list_tabs()
+        resolved = resolve_tabs(listed, self.tabs)
+        stale = [
+            key for key, title in resolved.items()
+            if listed[title] is None or revisions.get(key) != (title, listed[title])
+        ]
+        with span("sheets.read_tabs"):
+            rows = self.backend.read_tabs([resolved[k] for k in stale]) if stale else {}
+        count("sheets.tabs_read", len(stale))
+        count("sheets.tabs_unchanged", len(resolved) - len(stale))
+        with span("sheets.normalize"):
+            for key in stale:
+                frame = rows_to_frame(rows.get(resolved[key], []))
+                records[key], rejections[key] = normalize_tab(frame, self.columns[key], resolved[key])
+                revisions[key] = (resolved[key], listed[resolved[key]])
+        dropped = set(records) - set(resolved)
+        for key in dropped:
+            del records[key], rejections[key], revisions[key]
+        with self.lock:
+            if generation != self.generation:
+                return []  # cleared meanwhile
+            self.records, self.rejections, self.revisions = records, rejections, revisions
+            if stale or dropped:
+                self.version += 1
+            self.loaded_at = self.clock()
+            self.refreshed_at = datetime.now()
+        return stale
+
+    def rejection_report(self):
+        """Every rejected row across the cached tabs."""
+        with self.lock:
+            return [r for rows in self.rejections.values() for r in rows]
+
+
+def fetch_data_from_gsheet(sheet_id_or_url, creds_json=None, source=None, snapshots=None):
+    """
+    Attempt to fetch data from Google Sheets.
+    - sheet_id_or_url: the full URL or sheet ID.
+    - creds_json: dictionary object of service account JSON credentials OR None to use environment/st.secrets.
+    - source: a SheetDataSource to read through (one is created, uncached, when omitted).
+    - snapshots: a SnapshotStore; every newly mapped version is saved to it (best-effort).
+    Returns: read-only dict shaped like DASHBOARD_DATA (memoized per sheet version) or raises an error.
+    NOTE: This is a best-effort mapping. You should structure your Google Sheet with tabs:
+      - funnel (columns: stage, learners, percentage)
+      - dropoff_reasons (columns: reason, count)
+      - desired_features (columns: feature, mentions)
+      - platform_summary (columns: platform, users)
+      - demographics_age (columns: age_group, count)
+      - demographics_occupation (columns: occupation, count)
+    """
+    if source is None:
+        source = SheetDataSource(GspreadBackend(open_gspread_client(creds_json), parse_sheet_id(sheet_id_or_url)))
+    sheets = source.get()
+    memo = source.mapped
+    if memo is not None and memo[0] == source.version:
+        count("sheets.mapped.hit")
+        return memo[1]
+    count("sheets.mapped.miss")
+
+    target = {}  # series read from the sheet; the rest falls back to DASHBOARD_DATA
+    demographics = {}
+
+    funnel = sheets.get("funnel")
+    dropoff_reasons = sheets.get("dropoff_reasons")
+    desired_features = sheets.get("desired_features")
+    platform_summary = sheets.get("platform_summary")
+    demographics_age = sheets.get("demographics_age")
+    demographics_occupation = sheets.get("demographics_occupation")
+
+    def as_map(frame):
+        label, value = frame.columns[:2]
+        return dict(zip(frame[label].tolist(), frame[value].tolist()))
+
+    # Replace only when present (so partial sheets are OK); columns are already canonical
+    if funnel is not None and len(funnel):
+        funnel = funnel.copy()
+        if funnel["percentage"].isna().any():
+            funnel["percentage"] = funnel["percentage"].fillna((100.0 * funnel["learners"] / max(int(funnel["learners"].iloc[0]), 1)).round(1))
+        funnel_data = frame_records(funnel)
+        # drop points (and so completion) follow the sheet's funnel, not the embedded survey
+        target["dropoff_patterns"] = {"funnel_data": funnel_data, "drop_points": drop_points_from_funnel(funnel_data)}
+    if dropoff_reasons is not None and len(dropoff_reasons):
+        target["dropoff_reasons"] = frame_records(dropoff_reasons)
+    if desired_features is not None and len(desired_features):
+        target["desired_features"] = frame_records(desired_features)
+    if platform_summary is not None and len(platform_summary):
+        target["platform_data"] = {"primary_platforms": as_map(platform_summary)}
+    if demographics_age is not None and len(demographics_age):
+        demographics["age_distribution"] = as_map(demographics_age)
+    if demographics_occupation is not None and len(demographics_occupation):
+        demographics["occupation_distribution"] = as_map(demographics_occupation)
+    # respondents = the largest single-choice marginal the sheet has, funnel included (the embedded total describes other data)
+    totals = [sum(m.values()) for m in (demographics.get("age_distribution"), demographics.get("occupation_distribution"), target.get("platform_data", {}).get("primary_platforms"), target.get("dropoff_patterns", {}).get("drop_points")) if m]
+    if totals:
+        demographics["total_respondents"] = int(max(totals))
+    if demographics:
+        target["demographics"] = {**DASHBOARD_DATA["demographics"], **demographics}
+    target = freeze({**DASHBOARD_DATA, **target})
+
+    source.mapped = (source.version, target)
+    if snapshots is not None:
+        try:
+            with span("snapshot.save"):
+                snapshots.save(target, source=parse_sheet_id(sheet_id_or_url), version=source.version)
+        except OSError:
+            pass  # a read-only or full disk must not fail the live fetch
+    return target
@@ -0,0 +1,150 @@
+"""
+On-disk snapshots of ingested datasets.
+
+Each successful ingestion is written as one directory: a manifest.json (the
+dataset's chart series, the store's labels and provenance) next to one .npy file
+per respondent-store column. Loading memory-maps the column files, so a restarted
+process serves the last ingested data at once, without a Sheets round trip or
+rebuilding the store. A snapshot is written to a temp directory and renamed into
+place, so readers never see a partial one; old snapshots are pruned.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+
+import numpy as np
+
+from .dataset import freeze
+from .store import RespondentStore, build_respondent_store
+
+SNAPSHOT_FORMAT = 1  # bump when the layout changes; older snapshots are then ignored
+SNAPSHOT_DIR = os.environ.get("EDTECH_SNAPSHOT_DIR", ".snapshots")
+SNAPSHOT_KEEP = 5
+MANIFEST = "manifest.json"
+
+
+def _native(value):
+    """json.dump fallback for numpy scalars."""
+    if hasattr(value, "item"):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+class Snapshot:
+    """One saved dataset: its directory and manifest."""
+
+    def __init__(self, path, manifest):
+        self.path = path
+        self.manifest = manifest
+
+    @classmethod
+    def open(cls, path):
+        with open(os.path.join(path, MANIFEST), encoding="utf-8") as fh:
+            manifest = json.load(fh)
+        if manifest.get("format") != SNAPSHOT_FORMAT:
+            raise ValueError(f"Snapshot {path} has format {manifest.get('format')}, expected {SNAPSHOT_FORMAT}.")
+        return cls(path, manifest)
+
+    @property
+    def source(self):
+        return self.manifest["source"]
+
+    @property
+    def created_at(self):
+        return datetime.fromisoformat(self.manifest["created_at"])
+
+    def age_seconds(self, now=None):
+        return ((now or datetime.now(timezone.utc)) - self.created_at).total_seconds()
+
+    def load(self):
+        """(read-only dataset, store); the store's columns are read-only memory maps of the snapshot files."""
+        m = self.manifest
+
+        def column(kind, col):
+            return np.load(os.path.join(self.path, f"{kind}.{col}.npy"), mmap_mode="r")
+
+        text = {}
+        for col in m["columns"]["text"]:
+            with open(os.path.join(self.path, f"text.{col}.json"), encoding="utf-8") as fh:
+                text[col] = np.array(json.load(fh), dtype=object)
+        store = RespondentStore(
+            m["labels"],
+            {col: column("codes", col) for col in m["columns"]["codes"]},
+            {col: column("bits", col) for col in m["columns"]["bits"]},
+            text,
+            {col: column("numbers", col) for col in m["columns"]["numbers"]},
+            synthetic=m.get("synthetic", not m["dataset"].get("respondents")),
+        )
+        return freeze(m["dataset"]), store
+
+
+class SnapshotStore:
+    """Directory of snapshots, newest last by name; `keep` most recent are retained."""
+
+    def __init__(self, root=SNAPSHOT_DIR, keep=SNAPSHOT_KEEP):
+        self.root = root
+        self.keep = keep
+
+    def save(self, data, store=None, source="", version=0):
+        """Write `data` (and its respondent store, built when not given) as a new snapshot."""
+        store = store if store is not None else build_respondent_store(data)
+        os.makedirs(self.root, exist_ok=True)
+        created = datetime.now(timezone.utc)
+        tmp = tempfile.mkdtemp(prefix=".tmp-", dir=self.root)
+        try:
+            columns = {"codes": list(store.codes), "bits": list(store.bits), "numbers": list(store.numbers), "text": list(store.text)}
+            for kind in ("codes", "bits", "numbers"):
+                for col, values in getattr(store, kind).items():
+                    np.save(os.path.join(tmp, f"{kind}.{col}.npy"), np.ascontiguousarray(values))
+            for col, values in store.text.items():
+                with open(os.path.join(tmp, f"text.{col}.json"), "w", encoding="utf-8") as fh:
+                    json.dump(values.tolist(), fh, default=_native)
+            manifest = {
+                "format": SNAPSHOT_FORMAT,
+                "created_at": created.isoformat(),
+                "source": source,
+                "version": version,
+                "rows": store.n,
+                "synthetic": store.synthetic,
+                "labels": store.labels,
+                "columns": columns,
+                # respondent rows live in the column files
+                "dataset": {k: v for k, v in data.items() if k != "respondents"},
+            }
+            with open(os.path.join(tmp, MANIFEST), "w", encoding="utf-8") as fh:
+                json.dump(manifest, fh, default=_native)
+            path = os.path.join(self.root, f"{created:%Y%m%dT%H%M%S%f}-{os.getpid()}")
+            os.rename(tmp, path)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        self.prune()
+        return Snapshot(path, manifest)
+
+    def list(self, source=None):
+        """Readable snapshots, newest first; only those of `source` when given."""
+        try:
+            names = sorted((n for n in os.listdir(self.root) if not n.startswith(".")), reverse=True)
+        except FileNotFoundError:
+            return []
+        out = []
+        for name in names:
+            try:
+                snap = Snapshot.open(os.path.join(self.root, name))
+            except (OSError, ValueError, KeyError):
+                continue  # partial, foreign or older-format directory
+            if source is None or snap.source == source:
+                out.append(snap)
+        return out
+
+    def latest(self, source=None):
+        snaps = self.list(source)
+        return snaps[0] if snaps else None
+
+    def prune(self):
+        """Delete all but the `keep` newest snapshots (open memory maps stay valid until closed)."""
+        for snap in self.list()[self.keep:]:
+            shutil.rmtree(snap.path, ignore_errors=True)
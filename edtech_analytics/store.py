@@ -0,0 +1,310 @@
+"""
+Respondent-level store.
+
+One row per survey response, stored column-wise: single-choice answers are
+integer codes into a label list, multi-select answers are uint64 bitsets
+(bit i set == label i selected). Every chart is a bincount over a row mask.
+Column arrays are read-only once in a store: one store is shared by every
+session, and appending builds a new store (see concat). The new store's
+columns extend growable buffers, so an append costs O(new rows) amortized;
+the older store's columns are a prefix of them and never change.
+"""
+
+import numpy as np
+import pandas as pd
+
+from .dataset import read_only
+from .metrics import DAY_BIN_WIDTH, DAY_BINS, day_bins
+
+FUNNEL_STAGES = [
+    "Started course",
+    "Completed first week",
+    "Completed 2-3 weeks",
+    "Completed midway",
+    "Near completion",
+    "Successfully completed",
+]
+# drop point -> index of the last funnel stage the learner reached
+DROP_POINT_STAGE = {
+    "Within the first week": 0,
+    "After 2-3 weeks": 1,
+    "Midway through the course": 2,
+    "Near the end of the course": 3,
+    "Multiple courses at different points": 4,
+    "Never dropped": 5,
+}
+# drop point -> [start, end) of days since enrollment, for synthesizing drop-off days from aggregates
+DROP_POINT_DAYS = {
+    "Within the first week": (0, 7),
+    "After 2-3 weeks": (7, 21),
+    "Midway through the course": (21, 42),
+    "Near the end of the course": (42, 56),
+    "Multiple courses at different points": (0, 56),
+}
+COMPLETED_STAGE = len(FUNNEL_STAGES) - 1
+SINGLE_CHOICE_COLUMNS = ("age", "occupation", "platform", "drop_point")
+MULTI_SELECT_COLUMNS = ("reasons", "features")
+TEXT_COLUMNS = ("comment",)
+NUMERIC_COLUMNS = ("dropoff_day",)
+APPEND_MIN_CAPACITY = 1024  # rows allocated by the first append; capacity then doubles
+
+
+def completed_labels(drop_point_labels):
+    """Drop-point labels that mean the learner finished the course."""
+    return [label for label in drop_point_labels if DROP_POINT_STAGE.get(label) == COMPLETED_STAGE]
+
+
+class RespondentStore:
+    """Columnar store of survey responses.
+
+    labels[col] -> list of category labels
+    codes[col]  -> int32 array of label indexes (single-choice columns)
+    bits[col]   -> uint64 array of label bitsets (multi-select columns, max 64 labels)
+    text[col]   -> object array of free-text answers (only present when loaded)
+    numbers[col] -> float array of numeric answers, NaN when unknown (dropoff_day: days since enrollment)
+    synthetic   -> True when rows were expanded from aggregates (see from_aggregates): only the
+                   marginals are real, not the joint distribution or the drop-off days
+
+    The column arrays are made read-only.
+    """
+
+    def __init__(self, labels, codes, bits, text=None, numbers=None, synthetic=False):
+        self.labels = labels
+        self.codes = codes
+        self.bits = bits
+        self.text = text or {}
+        self.numbers = numbers or {}
+        self.synthetic = synthetic
+        self._buffers = None  # _AppendBuffers these columns are a prefix of (see concat)
+        for columns in (self.codes, self.bits, self.text, self.numbers):
+            for values in columns.values():
+                read_only(values)
+        self.n = len(next(iter(codes.values()))) if codes else 0
+
+    @classmethod
+    def from_records(cls, records, labels=None):
+        """Build from a list of dicts: age, occupation, platform, drop_point, reasons (list), features (list), comment, dropoff_day."""
+        labels = {k: list(v) for k, v in (labels or {}).items()}
+        for col in SINGLE_CHOICE_COLUMNS + MULTI_SELECT_COLUMNS:
+            labels.setdefault(col, [])
+        df = pd.DataFrame.from_records(records, columns=list(SINGLE_CHOICE_COLUMNS + MULTI_SELECT_COLUMNS + TEXT_COLUMNS + NUMERIC_COLUMNS))
+        codes = {}
+        for col in SINGLE_CHOICE_COLUMNS:
+            values = df[col].fillna("").astype(str)
+            known = set(labels[col])
+            labels[col] += [v for v in pd.unique(values) if v and v not in known]
+            codes[col] = pd.Categorical(values.where(values != ""), categories=labels[col]).codes.astype(np.int32)
+        bits = {}
+        for col in MULTI_SELECT_COLUMNS:
+            exploded = df[col].explode().dropna().astype(str)
+            known = set(labels[col])
+            labels[col] += [v for v in pd.unique(exploded) if v not in known]
+            if len(labels[col]) > 64:
+                raise ValueError(f"Column '{col}' has more than 64 distinct answers.")
+            mask = np.zeros(len(df), dtype=np.uint64)
+            label_codes = pd.Categorical(exploded, categories=labels[col]).codes.astype(np.uint64)
+            np.bitwise_or.at(mask, exploded.index.to_numpy(), np.left_shift(np.uint64(1), label_codes))
+            bits[col] = mask
+        text = {}
+        for col in TEXT_COLUMNS:
+            values = df[col].fillna("").astype(str)
+            if values.str.len().any():
+                text[col] = values.to_numpy(dtype=object)
+        numbers = {col: pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=np.float64) for col in NUMERIC_COLUMNS}
+        return cls(labels, codes, bits, text, numbers)
+
+    @classmethod
+    def from_aggregates(cls, data, seed=0):
+        """Expand the aggregated DASHBOARD_DATA shape into synthetic respondents.
+
+        The marginal counts of every chart are reproduced exactly; the joint
+        distribution is a seeded shuffle since the aggregates don't carry it.
+        """
+        rng = np.random.default_rng(seed)
+        singles = {
+            "age": data["demographics"]["age_distribution"],
+            "occupation": data["demographics"]["occupation_distribution"],
+            "platform": data["platform_data"]["primary_platforms"],
+            "drop_point": data["dropoff_patterns"]["drop_points"],
+        }
+        multis = {
+            "reasons": {r["reason"]: r["count"] for r in data["dropoff_reasons"]},
+            "features": {f["feature"]: f["mentions"] for f in data["desired_features"]},
+        }
+        # enough rows for every marginal, so none is clipped (a stale total_respondents only adds unanswered rows)
+        n = max(
+            [int(data["demographics"].get("total_respondents") or 0)]
+            + [int(sum(m.values())) for m in singles.values()]
+            + [int(c) for m in multis.values() for c in m.values()]
+        )
+        labels, codes, bits = {}, {}, {}
+        for col, counts in singles.items():
+            labels[col] = list(counts.keys())
+            col_codes = np.repeat(np.arange(len(counts), dtype=np.int32), [int(v) for v in counts.values()])
+            col_codes = np.concatenate([col_codes, np.full(n - len(col_codes), -1, dtype=np.int32)])
+            codes[col] = rng.permutation(col_codes)
+        for col, counts in multis.items():
+            labels[col] = list(counts.keys())
+            mask = np.zeros(n, dtype=np.uint64)
+            for i, c in enumerate(counts.values()):
+                rows = rng.choice(n, size=int(c), replace=False)
+                mask[rows] |= np.uint64(1) << np.uint64(i)
+            bits[col] = mask
+        # drop-off day (fractional: time of day): uniform within the drop point's day range; NaN for completers / unknown
+        spans = np.array([DROP_POINT_DAYS.get(label, (np.nan, np.nan)) for label in labels["drop_point"]] + [(np.nan, np.nan)])
+        lo, hi = spans[codes["drop_point"]].T  # code -1 picks the trailing NaN span
+        days = lo + rng.random(n) * (hi - lo)
+        return cls(labels, codes, bits, numbers={"dropoff_day": days}, synthetic=True)
+
+    def mask(self, filters):
+        """Boolean row mask for the age / occupation / platform filters ("" means all)."""
+        m = np.ones(self.n, dtype=bool)
+        for col in ("age", "occupation", "platform"):
+            value = filters.get(col)
+            if value:
+                code = self.labels[col].index(value) if value in self.labels[col] else -2
+                m &= self.codes[col] == code
+        return m
+
+    def count(self, col, mask):
+        """Per-label counts of a single-choice column over the masked rows."""
+        c = self.codes[col][mask]
+        return np.bincount(c[c >= 0], minlength=len(self.labels[col]))
+
+    def count_bits(self, col, mask):
+        """Per-label counts of a multi-select column over the masked rows."""
+        b = self.bits[col][mask]
+        return np.array(
+            [np.count_nonzero(b & (np.uint64(1) << np.uint64(i))) for i in range(len(self.labels[col]))],
+            dtype=np.int64,
+        )
+
+    def completed(self):
+        """Boolean mask of respondents who finished the course."""
+        done = [self.labels["drop_point"].index(label) for label in completed_labels(self.labels["drop_point"])]
+        return np.isin(self.codes["drop_point"], done)
+
+    def day_histogram(self, mask, col="dropoff_day"):
+        """Counts of the masked rows' drop-off days in DAY_BIN_WIDTH bins (the HistogramSketch layout)."""
+        values = self.numbers.get(col)
+        if values is None:
+            return np.zeros(DAY_BINS, dtype=np.int64)
+        idx, _ = day_bins(values[mask], DAY_BIN_WIDTH, DAY_BINS)
+        return np.bincount(idx, minlength=DAY_BINS)
+
+    def aggregate(self, mask):
+        """Every chart's per-label counts over the masked rows: {column: counts, "total": n}.
+
+        Also "completed" ({filter column: completers per label}) and "dropoff_day" (day histogram).
+        """
+        counts = {col: self.count(col, mask) for col in SINGLE_CHOICE_COLUMNS}
+        counts.update({col: self.count_bits(col, mask) for col in MULTI_SELECT_COLUMNS})
+        counts["total"] = int(mask.sum())
+        done = mask & self.completed()
+        counts["completed"] = {col: self.count(col, done) for col in ("age", "occupation", "platform")}
+        counts["dropoff_day"] = self.day_histogram(mask)
+        return counts
+
+    def concat(self, other):
+        """New store with `other`'s rows appended; other's codes are remapped onto this store's labels (extended as needed).
+
+        The rows are written into spare capacity past this store's columns when it is the latest store
+        over its buffers, so the cost is O(other.n) amortized; otherwise (the first append, a second
+        append to the same store, a new text or numeric column) every column is copied into new buffers.
+        """
+        labels = {col: list(v) for col, v in self.labels.items()}
+        parts = {}  # (kind, col) -> (this store's column or None, other's rows, fill for missing rows)
+        for col in SINGLE_CHOICE_COLUMNS:
+            labels[col] += [v for v in other.labels[col] if v not in labels[col]]
+            remap = np.array([labels[col].index(v) for v in other.labels[col]] + [-1], dtype=np.int32)
+            parts["codes", col] = (self.codes[col], remap[other.codes[col]], -1)
+        for col in MULTI_SELECT_COLUMNS:
+            labels[col] += [v for v in other.labels[col] if v not in labels[col]]
+            if len(labels[col]) > 64:
+                raise ValueError(f"Column '{col}' has more than 64 distinct answers.")
+            theirs = np.zeros(other.n, dtype=np.uint64)
+            for i, v in enumerate(other.labels[col]):
+                has = (other.bits[col] >> np.uint64(i)) & np.uint64(1)
+                theirs |= has << np.uint64(labels[col].index(v))
+            parts["bits", col] = (self.bits[col], theirs, 0)
+        for col in set(self.text) | set(other.text):
+            parts["text", col] = (self.text.get(col), other.text.get(col, np.full(other.n, "", dtype=object)), "")
+        for col in set(self.numbers) | set(other.numbers):
+            parts["numbers", col] = (self.numbers.get(col), other.numbers.get(col, np.full(other.n, np.nan)), np.nan)
+
+        buffers = self._buffers
+        if buffers is None or buffers.n != self.n or set(buffers.arrays) != set(parts) or self.n + other.n > buffers.capacity:
+            buffers = _AppendBuffers(parts, self.n, max(2 * (self.n + other.n), APPEND_MIN_CAPACITY))
+        columns = buffers.append(parts, self.n)
+        store = RespondentStore(
+            labels,
+            {col: columns["codes", col] for col in SINGLE_CHOICE_COLUMNS},
+            {col: columns["bits", col] for col in MULTI_SELECT_COLUMNS},
+            {col: v for (kind, col), v in columns.items() if kind == "text"},
+            {col: v for (kind, col), v in columns.items() if kind == "numbers"},
+            synthetic=self.synthetic or other.synthetic,
+        )
+        store._buffers = buffers
+        return store
+
+
+class _AppendBuffers:
+    """Writable, over-allocated column arrays shared by a chain of appended stores; rows [0, n) are in use."""
+
+    def __init__(self, parts, n, capacity):
+        self.capacity = capacity
+        self.arrays = {}
+        for key, (mine, theirs, fill) in parts.items():
+            array = np.empty(capacity, dtype=(mine if mine is not None else theirs).dtype)
+            array[:n] = mine if mine is not None else fill
+            self.arrays[key] = array
+        self.n = n
+
+    def append(self, parts, n):
+        """Write each part's new rows after row n; returns read-only views of the first n + new rows."""
+        end = n + len(next(iter(parts.values()))[1])
+        for key, (_, theirs, _) in parts.items():
+            self.arrays[key][n:end] = theirs
+        self.n = end
+        return {key: array[:end] for key, array in self.arrays.items()}
+
+
+def build_respondent_store(data):
+    """Return the respondent store for a dataset: raw `respondents` rows if present, else expanded aggregates."""
+    if data.get("respondents"):
+        return RespondentStore.from_records(data["respondents"])
+    return RespondentStore.from_aggregates(data)
+
+
+def drop_points_from_funnel(funnel):
+    """Drop-point counts that reproduce a funnel: the inverse of funnel_from_drop_points.
+
+    Stages named as in FUNNEL_STAGES keep their place; other funnels map stage by
+    position, their last stage being completion. Learners lost between two
+    stages dropped at the earlier one (a stage larger than the one before counts
+    as no loss).
+    """
+    names = [stage["stage"] for stage in funnel]
+    learners = [int(stage["learners"]) for stage in funnel]
+    if all(name in FUNNEL_STAGES for name in names):
+        stages = [FUNNEL_STAGES.index(name) for name in names]
+    else:
+        stages = [min(i, COMPLETED_STAGE - 1) for i in range(len(names) - 1)] + [COMPLETED_STAGE]
+    stage_label = {stage: label for label, stage in DROP_POINT_STAGE.items()}
+    drops = dict.fromkeys(DROP_POINT_STAGE, 0)
+    for stage, n, after in zip(stages, learners, learners[1:] + [0]):
+        drops[stage_label[stage]] += max(n - after, 0)
+    return drops
+
+
+def funnel_from_drop_points(drop_counts):
+    """Funnel stages from drop-point counts: a stage's learners are those whose last reached stage is >= it."""
+    reached = np.zeros(len(FUNNEL_STAGES), dtype=np.int64)
+    for label, cnt in drop_counts.items():
+        reached[DROP_POINT_STAGE.get(label, 0)] += cnt
+    learners = reached[::-1].cumsum()[::-1]
+    total = learners[0] or 1
+    return [
+        {"stage": stage, "learners": int(v), "percentage": round(100.0 * float(v) / total, 1)}
+        for stage, v in zip(FUNNEL_STAGES, learners)
+    ]
@@ -3,288 +3,265 @@ streamlit_app.py
 Streamlit port of the EdTech Learning Analytics Dashboard.
 
 Features replicated from the provided HTML/CSS/JS:
-- Tabs: Overview, User Behavior, Platform Insights, Industry Research, Community Insights
-- Filters: age, occupation, platform, free-text search (applies to reasons & features)
+- Tabs: Overview, User Behavior, Platform Insights, Industry Research, Community Insights (only the active one renders)
+- Filters: age, occupation, platform, free-text search (indexed; applies to reasons, features & respondent comments)
+- Optional precomputed filter cube: every filter combination aggregated once per data load
 - Charts: funnel, horizontal bars for dropout reasons & desired features, doughnut for platform
 - Table: platform performance
-- Heatmap-like representation for drop-off timeline (grid)
-- Export: CSV and JSON for filtered datasets (download buttons)
-- Optional real-time Google Sheets connection (overrides embedded data)
-
-Instructions for Google Sheets auth and running are included at the bottom of this file's docstring.
+- Drop-off timeline heatmap (week x day since enrollment, or day x hour) computed from respondent drop-off days
+- Cohort retention matrix and per-cohort funnel when the dataset carries learner progress events
+- Export: CSV and JSON for filtered datasets, plus streamed respondent-level CSV / JSON Lines / Parquet (generated on click)
+- Optional real-time Google Sheets connection (overrides embedded data; cached per process with a TTL)
+- One read-only dataset per process: its store, cube, index and cohorts are built once per data version and shared by every session; filters are masks / views over it
+- On-disk snapshot of each ingestion: new processes and sessions start from it, and it stands in when Sheets is unreachable
+- Community Insights: Reddit discussions, blog articles and news in a SQLite full-text store, searched with tag / year filters one page at a time
+- Per-rerun profiling: timed sections, cache hits / misses and chart payload sizes, with rolling percentiles in an opt-in sidebar panel
+
+The data model, filtering, search, exports and Sheets ingestion live in the
+headless `edtech_analytics` package; this script only lays out the UI.
 """
 
+# The profiler is stdlib-only, so the rerun clock starts before the heavy
+# imports; on a cold worker the "imports" span is their real cost.
+from edtech_analytics.profiling import STATS, Profile, count, measuring_payloads, payload, span
+profile = Profile("rerun").start()
+profile.phase("imports")
+
 import streamlit as st
 import pandas as pd
 import json
+from collections import OrderedDict
 from datetime import datetime
-import io
-import plotly.express as px
-import plotly.graph_objects as go
-
-# Optional google sheets libs
-try:
-    import gspread
-    from google.oauth2.service_account import Credentials
-    GS_AVAILABLE = True
-except Exception:
-    GS_AVAILABLE = False
+import hashlib
+import importlib.util
+import threading
+import time
+# Plotly is imported by the figure builders, on the first chart actually drawn;
+# gspread / google-auth only once live Sheets data is enabled.
+
+# All data handling lives in the headless engine package; this script is the UI.
+from edtech_analytics.cohorts import cohorts_from_data, week_start
+from edtech_analytics.community import COMMUNITY_KINDS, COMMUNITY_PAGE_SIZE, build_community_store
+from edtech_analytics.cube import build_aggregation_cube
+from edtech_analytics.engine import df_from_desired, df_from_dropoff, df_from_funnel, get_filtered_data
+from edtech_analytics.data import DASHBOARD_DATA
+from edtech_analytics.metrics import HEATMAP_MAX_WEEKS, HEATMAP_WEEKS, bucket_labels, bucket_rows, day_hour_matrix, kpis, week_day_matrix
+from edtech_analytics.exports import EXPORT_FORMATS, export_file_name, export_respondents, generate_csv_bytes, generate_json_bytes
+from edtech_analytics.search import build_search_index, search_comments
+from edtech_analytics.snapshot import Snapshot, SnapshotStore
+from edtech_analytics.store import build_respondent_store
+
+# Optional Parquet export (pyarrow is only imported when an export runs)
+PARQUET_AVAILABLE = importlib.util.find_spec("pyarrow") is not None
+SHEET_SOURCE_ENTRIES = 8  # connected sheets kept open (each holds its tabs and a refresh thread)
+# Datasets (and their stores, cubes, indexes) kept per cached loader. The caches are shared by
+# every session, so size them for every dataset that can be served at once: each open sheet's
+# current and previous version (sessions swap at their next rerun), the embedded data and a snapshot.
+DATASET_CACHE_ENTRIES = 2 * SHEET_SOURCE_ENTRIES + 2
 
 # -----------------------------
-# 1) Embedded seed data (matches your app.js dashboardData)
-#    (extracted from app.js so the app works immediately without a sheet)
+# 1) Figure construction
+#     Builders take plain series (lists/dicts) so a figure can be keyed by a
+#     content hash of its inputs plus the theme and reused across reruns and
+#     sessions from an LRU cache.
 # -----------------------------
-# Source data (from app.js). See app.js for full original JS object. :contentReference[oaicite:0]{index=0}
-DASHBOARD_DATA = {
-    "demographics": {
-        "total_respondents": 46,
-        "age_distribution": {"18-24": 35, "25-34": 11},
-        "occupation_distribution": {
-            "Student": 27,
-            "Employed full-time": 15,
-            "Unemployed": 3,
-            "Freelancer": 1
-        }
-    },
-    "platform_data": {
-        "primary_platforms": {
-            "YouTube educational content": 21,
-            "Coursera": 14,
-            "Udemy": 5,
-            "edX": 2,
-            "MasterClass": 1,
-            "Skillshare": 1,
-            "LinkedIn Learning": 1,
-            "Banking courses": 1
-        }
-    },
-    "dropoff_patterns": {
-        "drop_points": {
-            "Within the first week": 14,
-            "After 2-3 weeks": 9,
-            "Midway through the course": 9,
-            "Near the end of the course": 4,
-            "Multiple courses at different points": 5,
-            "Never dropped": 5
-        },
-        "funnel_data": [
-            {"stage": "Started course", "learners": 46, "percentage": 100.0},
-            {"stage": "Completed first week", "learners": 32, "percentage": 69.6},
-            {"stage": "Completed 2-3 weeks", "learners": 23, "percentage": 50.0},
-            {"stage": "Completed midway", "learners": 14, "percentage": 30.4},
-            {"stage": "Near completion", "learners": 10, "percentage": 21.7},
-            {"stage": "Successfully completed", "learners": 5, "percentage": 10.9}
-        ]
-    },
-    "dropoff_reasons": [
-        {"reason": "Lost interest in the subject", "count": 19},
-        {"reason": "Lack of motivation", "count": 17},
-        {"reason": "Lack of time", "count": 15},
-        {"reason": "Course didn't meet my expectations", "count": 14},
-        {"reason": "Boring or unengaging instructor", "count": 12},
-        {"reason": "Lack of interaction with instructors/peers", "count": 12},
-        {"reason": "Poor course quality", "count": 9},
-        {"reason": "Course content was too difficult", "count": 2}
-    ],
-    "desired_features": [
-        {"feature": "Gamification (points, badges, leaderboards)", "mentions": 25},
-        {"feature": "Mentor or study groups", "mentions": 23},
-        {"feature": "Personalized learning paths", "mentions": 22},
-        {"feature": "More interactive content", "mentions": 21},
-        {"feature": "Better progress tracking", "mentions": 21},
-        {"feature": "Certificates of completion", "mentions": 20},
-        {"feature": "Clearer course structure", "mentions": 18},
-        {"feature": "Networking opportunities with peers", "mentions": 12}
-    ],
-    "engagement_factors": {
-        "Lack of engaging content delivery": 2.96,
-        "Real-world application issues": 2.83,
-        "Insufficient feedback": 2.80,
-        "Inconsistent updates": 2.63,
-        "Deadlines/accountability": 2.52,
-        "Poor UI": 2.52,
-        "Content difficulty": 2.13
-    },
-    # lightweight community and industry data for Community & Research tabs (used for listing)
-    "platform_table": [
-        { "platform": "YouTube", "users": 21, "market_share": 45.7, "engagement": "High" },
-        { "platform": "Coursera", "users": 14, "market_share": 30.4, "engagement": "Medium" },
-        { "platform": "Udemy", "users": 5, "market_share": 10.9, "engagement": "Medium" },
-        { "platform": "edX", "users": 2, "market_share": 4.3, "engagement": "Low" },
-        { "platform": "MasterClass", "users": 1, "market_share": 2.2, "engagement": "Low" },
-        { "platform": "Others", "users": 3, "market_share": 6.5, "engagement": "Low" }
-    ],
-    "heatmap": [
-        [14,12,8,6,5,3,2],
-        [9,8,6,4,3,2,1],
-        [6,5,4,3,2,1,1],
-        [3,2,2,1,1,1,0]
-    ]
-}
+PLOT_THEME = "plotly_dark"
+FIGURE_CACHE_SIZE = 256
+
+
+def figure_key(kind, inputs, theme):
+    payload = json.dumps([kind, inputs, theme], sort_keys=True, default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+class FigureCache:
+    """Thread-safe LRU of built figures keyed by figure_key()."""
+
+    def __init__(self, maxsize=FIGURE_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, kind, inputs, builder, theme=PLOT_THEME):
+        """Cached figure; records a hit / miss in the active profile, and the figure's JSON payload size when it measures them."""
+        key = figure_key(kind, inputs, theme)
+        with self.lock:
+            entry = self.items.get(key)
+            if entry is not None:
+                self.items.move_to_end(key)
+                self.hits += 1
+        if entry is not None:
+            count("figure_cache.hit")
+        else:
+            with span(f"figure.build.{kind}"):
+                entry = [builder(inputs, theme), None]  # [figure, JSON size once measured]
+            with self.lock:
+                self.items[key] = entry
+                self.misses += 1
+                while len(self.items) > self.maxsize:
+                    self.items.popitem(last=False)
+            count("figure_cache.miss")
+        if measuring_payloads():
+            if entry[1] is None:
+                entry[1] = len(entry[0].to_json())  # what st.plotly_chart ships to the browser; serialized once per figure
+            payload(f"figure.{kind}", entry[1])
+        return entry[0]
+
+
+def funnel_figure(funnel, theme):
+    import plotly.express as px
+    fig = px.bar(df_from_funnel(funnel), x="stage", y="learners", text="learners", labels={"stage":"Stage","learners":"Learners"})
+    fig.update_layout(height=400, template=theme)
+    return fig
+
+
+def reasons_figure(reasons, theme):
+    import plotly.express as px
+    fig = px.bar(df_from_dropoff(reasons).sort_values("count"), x="count", y="reason", orientation="h", labels={"count":"Mentions","reason":"Reason"})
+    fig.update_layout(height=400, template=theme)
+    return fig
+
+
+def platform_figure(platform_map, theme):
+    import plotly.express as px
+    df_platform = pd.DataFrame({"platform": list(platform_map.keys()), "users": list(platform_map.values())})
+    fig = px.pie(df_platform, names="platform", values="users", hole=0.45)
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    fig.update_layout(height=400, template=theme)
+    return fig
+
+
+def age_completion_figure(age_completion, theme):
+    import plotly.graph_objects as go
+    age_map, completed = age_completion  # completed is None when unknown: totals only
+    ages_df = pd.DataFrame([{"age_group": k, "total": v, "completed": (completed or {}).get(k, 0)} for k, v in age_map.items()])
+    bars = [go.Bar(name='Total Learners', x=ages_df['age_group'], y=ages_df['total'])]
+    if completed is not None:
+        bars.append(go.Bar(name='Completed', x=ages_df['age_group'], y=ages_df['completed']))
+    fig = go.Figure(data=bars)
+    fig.update_layout(barmode='group', height=400, template=theme)
+    return fig
+
+
+def occupation_figure(occupation_map, theme):
+    import plotly.express as px
+    occ_df = pd.DataFrame(list(occupation_map.items()), columns=["occupation","count"])
+    fig = px.bar(occ_df, x="occupation", y="count", labels={"count":"Number of Learners"})
+    fig.update_layout(height=400, template=theme)
+    return fig
+
+
+def engagement_figure(factors, theme):
+    import plotly.express as px
+    ef_df = pd.DataFrame({"factor": list(factors.keys()), "impact": list(factors.values())})
+    # Polar chart similar to radar
+    fig = px.line_polar(ef_df, r="impact", theta="factor", line_close=True)
+    fig.update_layout(height=400, template=theme)
+    return fig
+
+
+def features_figure(features, theme):
+    import plotly.express as px
+    fig = px.bar(df_from_desired(features).sort_values("mentions"), x="mentions", y="feature", orientation="h", labels={"mentions":"Mentions","feature":"Feature"})
+    fig.update_layout(height=400, template=theme)
+    return fig
+
+
+def benchmarks_figure(benchmarks, theme):
+    import plotly.express as px
+    fig = px.bar(pd.DataFrame(benchmarks), x="category", y="value")
+    fig.update_layout(height=380, template=theme)
+    return fig
+
+
+def heatmap_figure(heat, theme):
+    import plotly.graph_objects as go
+    # A native heatmap ships only the count matrix, however many weeks it covers
+    fig = go.Figure(go.Heatmap(z=heat["z"], x=heat["x"], y=heat["y"], colorscale="Reds", hovertemplate="%{y}, %{x}: %{z}<extra></extra>"))
+    fig.update_yaxes(autorange="reversed")
+    fig.update_layout(height=max(260, 22 * len(heat["y"]) + 120), template=theme)
+    return fig
 
-# -----------------------------
-# 2) Utility functions
-# -----------------------------
-def get_filtered_data(data, filters):
-    """Apply filters to the embedded data structure and return filtered copies."""
-    filtered = dict(data)  # shallow copy (but we'll create new lists)
-    # Platform filter
-    if filters.get("platform"):
-        key = filters["platform"]
-        pp = data["platform_data"]["primary_platforms"]
-        filtered["platform_data"] = {"primary_platforms": {k: v for k, v in pp.items() if k == key}}
-    # Search filter: apply to dropoff_reasons and desired_features
-    search = (filters.get("search") or "").strip().lower()
-    if search:
-        filtered["dropoff_reasons"] = [r for r in data["dropoff_reasons"] if search in r["reason"].lower()]
-        filtered["desired_features"] = [f for f in data["desired_features"] if search in f["feature"].lower()]
-    else:
-        filtered["dropoff_reasons"] = list(data["dropoff_reasons"])
-        filtered["desired_features"] = list(data["desired_features"])
-    return filtered
-
-def df_from_funnel(funnel_list):
-    return pd.DataFrame(funnel_list)
-
-def df_from_dropoff(reasons):
-    return pd.DataFrame(reasons)
-
-def df_from_desired(features):
-    return pd.DataFrame(features)
-
-def df_from_platforms(platforms_map):
-    df = pd.DataFrame([{"platform": k, "users": v} for k, v in platforms_map.items()])
-    # If you want market_share and engagement, use platform_table in DASHBOARD_DATA
-    return df
-
-def generate_csv_bytes(filtered):
-    """Return CSV bytes for download (combines main tables)."""
-    out = io.StringIO()
-    # demographics -> Age Distribution
-    out.write("Category,Item,Value,Filter_Applied\n")
-    for age, count in DASHBOARD_DATA["demographics"]["age_distribution"].items():
-        out.write(f"Age Distribution,{age},{count},\n")
-    for occ, cnt in DASHBOARD_DATA["demographics"]["occupation_distribution"].items():
-        out.write(f"Occupation,{occ},{cnt},\n")
-    for platform, cnt in filtered["platform_data"]["primary_platforms"].items():
-        out.write(f"Platform Usage,{platform},{cnt},\n")
-    for r in filtered["dropoff_reasons"]:
-        out.write(f"Dropout Reasons,{r['reason']},{r['count']},\n")
-    for f in filtered["desired_features"]:
-        out.write(f"Desired Features,{f['feature']},{f['mentions']},\n")
-    return out.getvalue().encode("utf-8")
-
-def generate_json_bytes(filtered):
-    export = {
-        "export_timestamp": datetime.utcnow().isoformat() + "Z",
-        "filtered": filtered,
-        "original": DASHBOARD_DATA,
-        "metadata": {
-            "total_respondents": DASHBOARD_DATA["demographics"]["total_respondents"],
-            "completion_rate": 10.9,
-            "dashboard_version": "Streamlit port"
-        }
-    }
-    return json.dumps(export, indent=2).encode("utf-8")
 
 # -----------------------------
-# 3) Google Sheets real-time fetch (optional)
-#    - requires service account credentials JSON or st.secrets
-#    - this function will attempt to read a sheet and map values to the same shape
-#    - if it fails, the embedded DASHBOARD_DATA is used
+# 2) Streamlit UI: layout & interaction
+#     Each rerun is profiled section by section (see the Profiling panel).
 # -----------------------------
-def fetch_data_from_gsheet(sheet_id_or_url, creds_json=None):
-    """
-    Attempt to fetch data from Google Sheets.
-    - sheet_id_or_url: the full URL or sheet ID.
-    - creds_json: dictionary object of service account JSON credentials OR None to use environment/st.secrets.
-    Returns: Python dict shaped like DASHBOARD_DATA or raises an error.
-    NOTE: This is a best-effort mapping. You should structure your Google Sheet with tabs:
-      - funnel (columns: stage, learners, percentage)
-      - dropoff_reasons (columns: reason, count)
-      - desired_features (columns: feature, mentions)
-      - platform_summary (columns: platform, users)
-      - demographics_age (columns: age_group, count)
-      - demographics_occupation (columns: occupation, count)
-    """
-    if not GS_AVAILABLE:
-        raise RuntimeError("gspread/google oauth libs are not available in this environment.")
-
-    # Accept either URL or ID:
-    sheet_id = sheet_id_or_url.split("/")[5] if "docs.google.com" in sheet_id_or_url else sheet_id_or_url
-
-    scopes = ["https://www.googleapis.com/auth/spreadsheets.readonly"]
-    if creds_json:
-        credentials = Credentials.from_service_account_info(creds_json, scopes=scopes)
-        gc = gspread.authorize(credentials)
-    else:
-        # will read from environment (e.g. streamlit secrets or GOOGLE_APPLICATION_CREDENTIALS)
-        gc = gspread.service_account()  # uses env var or local credentials
-    sh = gc.open_by_key(sheet_id)
+def profiled(name, fn, *args):
+    """fn(*args) timed as span `name` (deferred download callables run outside the rerun's profile)."""
+    with span(name):
+        return fn(*args)
 
-    target = dict(DASHBOARD_DATA)  # fallback shape; we'll replace lists
 
-    # Helper to read a worksheet into list of dicts (first row header)
-    def sheet_to_records(name):
-        try:
-            ws = sh.worksheet(name)
-            df = pd.DataFrame(ws.get_all_records())
-            return df.to_dict(orient="records")
-        except Exception:
-            return None
-
-    # Try to read canonical worksheets
-    funnel = sheet_to_records("funnel") or sheet_to_records("Funnel")
-    dropoff_reasons = sheet_to_records("dropoff_reasons") or sheet_to_records("DropoffReasons") or sheet_to_records("dropoff")
-    desired_features = sheet_to_records("desired_features") or sheet_to_records("DesiredFeatures") or sheet_to_records("features")
-    platform_summary = sheet_to_records("platform_summary") or sheet_to_records("platforms")
-    demographics_age = sheet_to_records("demographics_age") or sheet_to_records("age_distribution")
-    demographics_occupation = sheet_to_records("demographics_occupation") or sheet_to_records("occupations")
-
-    # Replace only when present (so partial sheets are OK)
-    if funnel:
-        target["dropoff_patterns"] = { "funnel_data": funnel, "drop_points": target["dropoff_patterns"]["drop_points"] }
-    if dropoff_reasons:
-        # ensure keys are reason & count
-        validated = []
-        for r in dropoff_reasons:
-            # tolerant mapping
-            reason = r.get("reason") or r.get("Reason") or r.get("dropoff_reason") or list(r.values())[0]
-            count = int(r.get("count") or r.get("Count") or r.get("value") or 0)
-            validated.append({"reason": reason, "count": count})
-        target["dropoff_reasons"] = validated
-    if desired_features:
-        validated = []
-        for f in desired_features:
-            feat = f.get("feature") or f.get("Feature") or list(f.values())[0]
-            mentions = int(f.get("mentions") or f.get("Mentions") or f.get("value") or 0)
-            validated.append({"feature": feat, "mentions": mentions})
-        target["desired_features"] = validated
-    if platform_summary:
-        pm = {row.get("platform") or row.get("Platform") or list(row.values())[0]: int(row.get("users") or row.get("Users") or row.get("value") or 0) for row in platform_summary}
-        target["platform_data"] = {"primary_platforms": pm}
-    if demographics_age:
-        target["demographics"]["age_distribution"] = {r.get("age_group") or r.get("age") or list(r.values())[0]: int(r.get("count") or r.get("Count") or 0) for r in demographics_age}
-    if demographics_occupation:
-        target["demographics"]["occupation_distribution"] = {r.get("occupation") or r.get("Occupation") or list(r.values())[0]: int(r.get("count") or r.get("Count") or 0) for r in demographics_occupation}
-
-    return target
+def respondent_export_bytes(store, mask, fmt, compress):
+    """Respondent export as bytes for st.download_button, which only takes bytes-like data and holds the
+    whole file in memory anyway; exports too large for that belong to `python -m edtech_analytics render --respondents`."""
+    with export_respondents(store, mask, fmt, compress=compress) as src:
+        return src.read()
 
-# -----------------------------
-# 4) Streamlit UI: layout & interaction
-# -----------------------------
+
+profile.phase("sources")
+# sizing chart payloads serializes every new figure, so only while the Profiling panel is open (or the JSON log is on)
+profile.measure_payloads = profile.measure_payloads or st.session_state.get("profiling_panel", False)
 st.set_page_config(page_title="EdTech Learning Analytics", layout="wide", initial_sidebar_state="auto")
 st.title("EdTech Learning Analytics Dashboard")
 
 # Sidebar: optional Google Sheets connection + filters
 st.sidebar.header("Data source & Filters")
 
+
+@st.cache_resource(show_spinner=False)
+def get_gspread_client(creds_key):
+    """One authorized client per credential, shared by every session."""
+    return open_gspread_client(json.loads(creds_key) if creds_key else None)
+
+
+@st.cache_resource(show_spinner=False, max_entries=SHEET_SOURCE_ENTRIES, on_release=lambda source: source.close())
+def get_sheet_source(sheet_id, creds_key):
+    """One cached data source per (sheet, credential), shared by every session and refreshed in the background.
+
+    Clearing or evicting the entry closes the source, so its refresh and fetch threads don't outlive it."""
+    return SheetDataSource(GspreadBackend(get_gspread_client(creds_key), sheet_id)).start()
+
+
+@st.fragment(run_every=2)
+def watch_refresh(source):
+    """Rerun the app once the sheet refresh in flight has finished, so its data is swapped in."""
+    if not source.refreshing:
+        st.rerun()
+
+
+@st.cache_resource(show_spinner=False)
+def get_snapshot_store():
+    return SnapshotStore()
+
+
+@st.cache_resource(show_spinner=False, max_entries=DATASET_CACHE_ENTRIES)
+def load_snapshot(path):
+    """Memory-mapped (dataset, store) of one snapshot, shared by every session."""
+    return Snapshot.open(path).load()
+
+
+def format_age(seconds):
+    for unit, size in (("d", 86400), ("h", 3600), ("min", 60), ("s", 1)):
+        if seconds >= size:
+            return f"{seconds // size:.0f} {unit} ago"
+    return "just now"
+
+
+snapshots = get_snapshot_store()
+snapshot = None  # the snapshot the data comes from, if any
+
 use_sheet = st.sidebar.checkbox("Connect Google Sheet for live data", value=False)
 sheet_input = None
 creds_json_input = None
 gsheet_data = None
 
 if use_sheet:
+    from edtech_analytics.sheets import GspreadBackend, SheetDataSource, fetch_data_from_gsheet, open_gspread_client, parse_sheet_id
+
     st.sidebar.write("Provide the Google Sheet ID or full URL, and method of authentication.")
     sheet_input = st.sidebar.text_input("Sheet ID or URL", help="Example: https://docs.google.com/spreadsheets/d/<<SHEET_ID>>/edit")
     auth_method = st.sidebar.radio("Auth method", options=["Service account JSON (paste)", "Use local credentials (gspread.service_account)"], index=1)
@@ -299,65 +276,225 @@ if use_sheet:
     else:
         creds_json_input = None  # will let gspread use default
 
+    creds_key = json.dumps(creds_json_input, sort_keys=True) if creds_json_input else ""
     if st.sidebar.button("Fetch from Google Sheet"):
         if not sheet_input:
             st.sidebar.error("Enter Sheet ID or URL first.")
         else:
             try:
-                with st.spinner("Fetching from Google Sheets..."):
-                    gsheet_data = fetch_data_from_gsheet(sheet_input, creds_json=creds_json_input)
-                st.sidebar.success("Fetched sheet data successfully.")
+                # The sheet is read in the background; current data stays up meanwhile
+                get_sheet_source(parse_sheet_id(sheet_input), creds_key).refresh_async()
+                st.session_state["gsheet_connection"] = (parse_sheet_id(sheet_input), creds_key)
             except Exception as e:
                 st.sidebar.error(f"Failed to fetch sheet: {e}")
+                snapshot = snapshots.latest(parse_sheet_id(sheet_input))
+                if snapshot is not None:
+                    st.sidebar.warning("Showing the last snapshot of this sheet instead.")
+
+    # Once connected, every rerun reads through the shared cached source. It is
+    # refreshed in the background (every TTL), so reruns serve the last good
+    # tabs and never wait on the Google API after the first load.
+    connection = st.session_state.get("gsheet_connection")
+    if connection:
+        source = None
+        try:
+            source = get_sheet_source(*connection)
+            if not source.ready:
+                source.refresh_async()  # no-op while one is in flight
+                snapshot = snapshots.latest(connection[0])
+                fallback = "showing its last snapshot meanwhile." if snapshot else "showing the embedded data meanwhile."
+                if source.error is not None:
+                    st.sidebar.warning(f"Google Sheets unreachable ({source.error}); retrying in the background, {fallback}")
+                else:
+                    st.sidebar.info(f"Loading the sheet in the background; {fallback}")
+            else:
+                fetch_data_from_gsheet(connection[0], source=source, snapshots=snapshots)
+                sheet_version, gsheet_data = source.mapped  # read as a pair: the version keys everything built from this data
+                st.sidebar.caption(f"Sheet data as of {source.refreshed_at:%H:%M:%S} (refreshed in the background every {source.ttl}s)")
+                if source.error is not None:
+                    st.sidebar.warning(f"Latest sheet refresh failed ({source.error}); showing the last good data.")
+            if source.refreshing:
+                with st.sidebar:
+                    watch_refresh(source)
+            rejected = source.rejection_report()
+            if rejected:
+                with st.sidebar.expander(f"⚠️ {len(rejected)} sheet rows skipped"):
+                    report = pd.DataFrame(rejected)
+                    report["values"] = report["values"].map(lambda v: json.dumps(v, default=str))
+                    st.dataframe(report, height=200)
+        except Exception as e:
+            snapshot = snapshots.latest(connection[0])
+            if snapshot is not None:
+                st.sidebar.warning(f"Google Sheets unreachable ({e}); showing the last snapshot of this sheet.")
+            else:
+                st.sidebar.error(f"Failed to fetch sheet: {e}")
+        if st.sidebar.button("Clear cached sheet data"):
+            get_sheet_source.clear(*connection)  # closes the source (on_release)
+            st.session_state.pop("gsheet_connection", None)
+            st.rerun()
+
+# Data selection: live sheet data if fetched; else the latest snapshot (of the
+# connected sheet when it is unreachable, of any sheet for a fresh session);
+# else the embedded data
+if not gsheet_data and snapshot is None and not st.session_state.get("gsheet_connection"):
+    snapshot = snapshots.latest()
+snapshot_path = snapshot.path if snapshot is not None and not gsheet_data else None
+# The dataset is read-only and shared; data_key names its version
+if gsheet_data:
+    data, data_key = gsheet_data, f"sheet:{connection[0]}:{source.id}:{sheet_version}"  # a recreated source restarts at version 0
+elif snapshot_path:
+    data, data_key = load_snapshot(snapshot_path)[0], f"snapshot:{snapshot_path}"
+    st.sidebar.caption(f"Data: snapshot of sheet {snapshot.source or '(unnamed)'} saved {snapshot.created_at:%Y-%m-%d %H:%M} UTC ({format_age(snapshot.age_seconds())})")
+else:
+    data, data_key = DASHBOARD_DATA, "embedded"
+
+
+# Everything derived from the dataset is built once per data_key and shared by
+# every session. The dataset itself is passed unhashed (leading underscore), so
+# a rerun doesn't walk it to compute the cache key. Only the most recently used
+# datasets are kept (DATASET_CACHE_ENTRIES), so sheet refreshes don't accumulate memory.
+@st.cache_resource(show_spinner=False, max_entries=DATASET_CACHE_ENTRIES)
+def load_respondent_store(data_key, _data, snapshot_path=None):
+    if snapshot_path:
+        return load_snapshot(snapshot_path)[1]
+    return build_respondent_store(_data)
+
+
+@st.cache_resource(show_spinner=False, max_entries=DATASET_CACHE_ENTRIES)
+def load_aggregation_cube(data_key, _data, snapshot_path=None):
+    return build_aggregation_cube(load_respondent_store(data_key, _data, snapshot_path))
+
+
+@st.cache_resource(show_spinner=False, max_entries=DATASET_CACHE_ENTRIES)
+def load_search_index(data_key, _data, snapshot_path=None):
+    return build_search_index(load_respondent_store(data_key, _data, snapshot_path))
+
+
+@st.cache_resource(show_spinner=False, max_entries=DATASET_CACHE_ENTRIES)
+def load_cohorts(data_key, _data):
+    return cohorts_from_data(_data)
+
+
+@st.cache_resource(show_spinner=False, max_entries=DATASET_CACHE_ENTRIES)
+def load_platform_table(data_key, _data):
+    return pd.DataFrame(list(_data["platform_table"]))
+
+
+@st.cache_resource(show_spinner=False)
+def get_figure_cache():
+    """Process-wide figure LRU shared by every session."""
+    return FigureCache()
+
+
+@st.cache_resource(show_spinner=False)
+def get_community_store():
+    """Community posts (SQLite full-text store) shared by every session; a file when EDTECH_COMMUNITY_DB is set."""
+    return build_community_store()
 
-# Data selection: if gsheets returned data, use it; else use the embedded data
-data = gsheet_data if gsheet_data else DASHBOARD_DATA
+
+profile.phase("load")
+store = load_respondent_store(data_key, data, snapshot_path)
+figure_cache = get_figure_cache()
+search_index = load_search_index(data_key, data, snapshot_path)
+fuzzy_search = st.sidebar.checkbox("Fuzzy search (tolerate typos)", value=False)
+use_cube = st.sidebar.checkbox("Precompute filter cube", value=True, help="Build every filter combination once per data load; filter changes become lookups.")
+cube = load_aggregation_cube(data_key, data, snapshot_path) if use_cube else None
 
 # Filters (top row like the original UI)
+profile.phase("filter")
 colf1, colf2, colf3, colf4, colf5 = st.columns([2,2,2,3,2])
 with colf1:
-    age_filter = st.selectbox("Age group", options=[""] + list(data["demographics"]["age_distribution"].keys()), index=0)
+    age_filter = st.selectbox("Age group", options=[""] + store.labels["age"], index=0)
 with colf2:
-    occupation_filter = st.selectbox("Occupation", options=[""] + list(data["demographics"]["occupation_distribution"].keys()), index=0)
+    occupation_filter = st.selectbox("Occupation", options=[""] + store.labels["occupation"], index=0)
 with colf3:
-    platform_keys = list(data["platform_data"]["primary_platforms"].keys())
-    platform_filter = st.selectbox("Platform", options=[""] + platform_keys, index=0)
+    platform_filter = st.selectbox("Platform", options=[""] + store.labels["platform"], index=0)
 with colf4:
-    search_filter = st.text_input("Search (dropout reasons / features)")
+    search_filter = st.text_input("Search (dropout reasons / features / comments)", help="All words must match; end a word with * for prefix-only matching.")
 with colf5:
     # Export buttons
-    filtered_for_export = get_filtered_data(data, {"platform": platform_filter, "search": search_filter})
-    csv_bytes = generate_csv_bytes(filtered_for_export)
-    json_bytes = generate_json_bytes(filtered_for_export)
-    st.download_button("Export CSV", data=csv_bytes, file_name=f"edtech-analytics-{datetime.now().strftime('%Y%m%d_%H%M')}.csv", mime="text/csv")
-    st.download_button("Export JSON", data=json_bytes, file_name=f"edtech-analytics-{datetime.now().strftime('%Y%m%d_%H%M')}.json", mime="application/json")
-
-# Build filtered data
-filters = {"age": age_filter, "occupation": occupation_filter, "platform": platform_filter, "search": search_filter}
-filtered = get_filtered_data(data, filters)
+    filters = {"age": age_filter, "occupation": occupation_filter, "platform": platform_filter, "search": search_filter}
+    agg_start = time.perf_counter()
+    filtered = get_filtered_data(data, filters, store=store, cube=cube, index=search_index, fuzzy=fuzzy_search)
+    agg_ms = (time.perf_counter() - agg_start) * 1000
+    # Exports are generated only when a download button is clicked
+    profile.phase("sidebar")
+    st.download_button("Export CSV", data=lambda: profiled("export.summary_csv", generate_csv_bytes, filtered), file_name=f"edtech-analytics-{datetime.now().strftime('%Y%m%d_%H%M')}.csv", mime="text/csv", on_click="ignore")
+    st.download_button("Export JSON", data=lambda: profiled("export.summary_json", generate_json_bytes, filtered), file_name=f"edtech-analytics-{datetime.now().strftime('%Y%m%d_%H%M')}.json", mime="application/json", on_click="ignore")
+
+with st.sidebar.expander("Export respondents"):
+    if store.synthetic:
+        # rows expanded from aggregates would export an invented joint distribution
+        st.info("This data source only has per-question totals, so there are no individual responses to export.")
+    else:
+        formats = [f for f in EXPORT_FORMATS if f != "parquet" or PARQUET_AVAILABLE]
+        export_fmt = st.radio("Format", formats, format_func=lambda f: EXPORT_FORMATS[f][0], horizontal=True)
+        export_gzip = st.checkbox("gzip", value=False, disabled=export_fmt == "parquet")
+        st.download_button(
+            "Export filtered respondents",
+            data=lambda: respondent_export_bytes(store, store.mask(filters), export_fmt, export_gzip),
+            file_name=export_file_name(export_fmt, export_gzip),
+            mime="application/gzip" if export_gzip and export_fmt != "parquet" else EXPORT_FORMATS[export_fmt][1],
+            on_click="ignore",
+        )
+
+with st.sidebar.expander("Diagnostics"):
+    st.write(f"Respondents loaded: {store.n:,}")
+    st.write(f"Filter aggregation this rerun: {agg_ms:.2f} ms ({'cube lookup' if cube is not None else 'store scan'})")
+    st.write(f"Figure cache: {len(figure_cache.items)}/{figure_cache.maxsize} entries, {figure_cache.hits} hits, {figure_cache.misses} misses")
+    if cube is not None:
+        st.write(f"Cube: {cube.n_cells:,} cells, {cube.nbytes / 1024:,.1f} KiB, built in {cube.build_seconds * 1000:.1f} ms")
+
+if search_filter.strip() and store.text:
+    n_comments, comments = search_comments(store, search_index, search_filter, filters, fuzzy=fuzzy_search)
+    with st.expander(f"Matching respondent comments ({n_comments:,})"):
+        for comment in comments:
+            st.write(f"- {comment}")
 
 # KPIs in a row (replicating KPI cards)
+profile.phase("kpis")
+kpi = kpis(filtered)
 k1, k2, k3, k4 = st.columns(4)
-k1.metric("Total Learners", data["demographics"]["total_respondents"])
-k2.metric("Completion Rate", "10.9%")
-k3.metric("Avg Drop-off Time", "7 days")
-k4.metric("Industry Median", "12.6%")
-
-# Tabs to mirror the original navigation
-tabs = st.tabs(["Overview","User Behavior","Platform Insights","Industry Research","Community Insights"])
+k1.metric("Total Learners", "–" if kpi["total_respondents"] is None else kpi["total_respondents"])
+k2.metric("Completion Rate", "–" if kpi["completion_rate"] is None else f"{kpi['completion_rate']}%")
+# aggregate-only data has no drop-off days (the store's are synthesized from the drop points)
+if store.synthetic or kpi["median_dropoff_day"] is None:
+    k3.metric("Median Drop-off Time", "–", help="Needs respondent-level drop-off days." if store.synthetic else None)
+else:
+    k3.metric("Median Drop-off Time", f"{kpi['median_dropoff_day']:.0f} days")
+k4.metric("Industry Median", f"{kpi['industry_median_completion']}%")
+if not filtered["cross_filtered"]:
+    st.info(
+        "These figures come from per-question totals, not individual responses, so a filter only narrows "
+        "its own chart; every other chart and KPI covers all respondents."
+    )
+
+# Tabs to mirror the original navigation. Only the active tab is rendered, so a
+# rerun builds (or fetches from the figure cache) just the figures on screen.
+TABS = ["Overview","User Behavior","Platform Insights","Industry Research","Community Insights"]
+active_tab = st.radio("Section", TABS, horizontal=True, label_visibility="collapsed", key="active_tab")
+profile.phase(f"tab.{active_tab}")
 
 # ---- Overview tab ----
-with tabs[0]:
+if active_tab == "Overview":
     st.header("Key Insights & Recommendations")
     c1, c2 = st.columns(2)
     with c1:
         st.subheader("📈 Critical Findings")
-        st.markdown("""
-        - Critical first-week retention challenge: **30.4%** drop within first week.
-        - YouTube dominance (~**45.7%**) indicates preference for video-centric learning.
-        - Gamification is top-requested feature (25 mentions).
-        - Completion crisis (10.9%) aligns with industry medians.
-        """)
+        findings = []
+        if kpi["first_week_dropoff"] is not None:
+            findings.append(f"- Critical first-week retention challenge: **{kpi['first_week_dropoff']}%** drop within first week.")
+        platforms = filtered["platform_data"]["primary_platforms"]
+        if platforms:
+            top_platform = max(platforms, key=platforms.get)
+            share = 100.0 * platforms[top_platform] / sum(platforms.values())
+            findings.append(f"- {top_platform} dominance (~**{share:.1f}%**) indicates preference for video-centric learning.")
+        if filtered["desired_features"]:
+            top_feature = max(filtered["desired_features"], key=lambda f: f["mentions"])
+            findings.append(f"- {top_feature['feature']} is top-requested feature ({top_feature['mentions']} mentions).")
+        if kpi["completion_rate"] is not None:
+            findings.append(f"- Completion crisis ({kpi['completion_rate']}%) vs industry median of {kpi['industry_median_completion']}%.")
+        st.markdown("\n".join(findings))
     with c2:
         st.subheader("🎯 Strategic Recommendations")
         st.markdown("""
@@ -372,17 +509,15 @@ with tabs[0]:
     ch1, ch2 = st.columns([2,2])
     with ch1:
         st.subheader("Learning Funnel Analysis")
-        df_funnel = df_from_funnel(filtered["dropoff_patterns"]["funnel_data"])
-        fig = px.bar(df_funnel, x="stage", y="learners", text="learners", labels={"stage":"Stage","learners":"Learners"})
-        fig.update_layout(height=400, template="plotly_dark")
+        fig = figure_cache.get("funnel", filtered["dropoff_patterns"]["funnel_data"], funnel_figure)
         st.plotly_chart(fig, use_container_width=True)
+        if filtered["cross_filtered"] and not filtered["dropoff_patterns"]["funnel_filtered"]:
+            st.caption("The data source's funnel has no per-respondent breakdown, so it shows every respondent regardless of the filters.")
 
     with ch2:
         st.subheader("Top Dropout Reasons")
-        df_drop = df_from_dropoff(filtered["dropoff_reasons"])
-        if not df_drop.empty:
-            fig2 = px.bar(df_drop.sort_values("count"), x="count", y="reason", orientation="h", labels={"count":"Mentions","reason":"Reason"})
-            fig2.update_layout(height=400, template="plotly_dark")
+        if filtered["dropoff_reasons"]:
+            fig2 = figure_cache.get("reasons", filtered["dropoff_reasons"], reasons_figure)
             st.plotly_chart(fig2, use_container_width=True)
         else:
             st.info("No dropout reasons match the current filters.")
@@ -392,28 +527,21 @@ with tabs[0]:
         st.subheader("Platform Usage Distribution")
         platform_map = filtered["platform_data"]["primary_platforms"]
         if platform_map:
-            df_platform = pd.DataFrame({"platform": list(platform_map.keys()), "users": list(platform_map.values())})
-            fig3 = px.pie(df_platform, names="platform", values="users", hole=0.45)
-            fig3.update_traces(textposition='inside', textinfo='percent+label')
-            fig3.update_layout(height=400, template="plotly_dark")
+            fig3 = figure_cache.get("platforms", platform_map, platform_figure)
             st.plotly_chart(fig3, use_container_width=True)
         else:
             st.info("No platform data for current filters.")
 
     with ch4:
         st.subheader("Completion Rates by Age Group")
-        age_map = data["demographics"]["age_distribution"]
-        # emulate 'completed' numbers (same logic as original: completed ~= ~10-11% of group)
-        ages_df = pd.DataFrame([{"age_group": k, "total": v, "completed": round(v * 0.11)} for k, v in age_map.items()])
-        fig4 = go.Figure(data=[
-            go.Bar(name='Total Learners', x=ages_df['age_group'], y=ages_df['total']),
-            go.Bar(name='Completed', x=ages_df['age_group'], y=ages_df['completed'])
-        ])
-        fig4.update_layout(barmode='group', height=400, template="plotly_dark")
+        by_age = filtered["completion"]["by_age"]  # None for aggregate-only data
+        fig4 = figure_cache.get("age_completion", [filtered["demographics"]["age_distribution"], by_age], age_completion_figure)
         st.plotly_chart(fig4, use_container_width=True)
+        if by_age is None:
+            st.caption("Completions per age group need respondent-level data; the aggregates only give each total.")
 
 # ---- User Behavior tab ----
-with tabs[1]:
+if active_tab == "User Behavior":
     st.header("User Behavior Insights & Recommendations")
     st.markdown("""
     **Behavioral Patterns**
@@ -423,44 +551,70 @@ with tabs[1]:
     - Mobile-first expectations: prioritize mobile experience.
     """)
     # Heatmap representation (grid)
-    st.subheader("Drop-off Timeline Heatmap (Week x Day)")
-    heat = data.get("heatmap", [])
-    if heat:
-        heat_df = pd.DataFrame(heat, index=[f"Week {i+1}" for i in range(len(heat))], columns=["Mon","Tue","Wed","Thu","Fri","Sat","Sun"])
-        st.dataframe(heat_df.style.background_gradient(axis=None, cmap='Reds'), height=260)
+    st.subheader("Drop-off Timeline Heatmap")
+    if store.synthetic:
+        # days synthesized from the aggregated drop points are invented, not a timeline
+        st.info("The drop-off timeline needs respondent-level drop-off days (a dataset with `respondents` rows).")
+    else:
+        hc1, hc2 = st.columns([3, 2])
+        heat_weeks = hc1.slider("Weeks since enrollment", 1, HEATMAP_MAX_WEEKS, HEATMAP_WEEKS)
+        heat_by_hour = hc2.radio("Columns", ["Day since enrollment", "Hour of day"], horizontal=True) == "Hour of day"
+        if heat_by_hour:
+            # needs the raw drop-off times, so this one scans the store
+            matrix, step = bucket_rows(day_hour_matrix(store.numbers["dropoff_day"][store.mask(filters)], heat_weeks))
+            heat = {"z": matrix.tolist(), "x": [f"{h:02d}:00" for h in range(24)], "y": bucket_labels("Day", heat_weeks * 7, step)}
+        else:
+            matrix, step = bucket_rows(week_day_matrix(filtered["dropoff_patterns"]["dropoff_days"], heat_weeks))
+            heat = {"z": matrix.tolist(), "x": [f"Day {d}" for d in range(1, 8)], "y": bucket_labels("Week", heat_weeks, step)}
+        if matrix.any():
+            st.plotly_chart(figure_cache.get("heatmap", heat, heatmap_figure), use_container_width=True)
+        else:
+            st.info("No drop-offs recorded in this window for the current filters.")
+    cohorts = load_cohorts(data_key, data)
+    if cohorts is not None:
+        st.subheader("Weekly Cohort Retention (% of cohort active)")
+        rc1, rc2 = st.columns(2)
+        retention_weeks = rc1.slider("Weeks since enrollment", 2, 26, 12, key="retention_weeks")
+        retention_cohorts = rc2.slider("Latest cohorts", 4, 52, 26, key="retention_cohorts")
+        cohort_list, matrix = cohorts.retention_matrix(retention_weeks, last=retention_cohorts)
+        heat = {
+            "z": [[None if v != v else round(v, 1) for v in row] for row in matrix.tolist()],  # NaN: not observed yet
+            "x": [f"Week {k}" for k in range(retention_weeks)],
+            "y": [week_start(w) for w in cohort_list],
+        }
+        st.plotly_chart(figure_cache.get("retention", heat, heatmap_figure), use_container_width=True)
+        if cohorts.skipped:
+            st.caption(f"{cohorts.skipped:,} progress events were skipped for a missing timestamp or an unknown stage.")
+        cohort = st.selectbox("Funnel for enrollment cohort", [None] + cohort_list, format_func=lambda w: "All cohorts" if w is None else f"Week of {week_start(w)}")
+        cohort_funnel = cohorts.funnel() if cohort is None else cohorts.funnel([cohort])
+        st.plotly_chart(figure_cache.get("funnel", cohort_funnel, funnel_figure), use_container_width=True)
+
     st.subheader("Learning Preferences by Occupation")
-    occ_df = pd.DataFrame(list(data["demographics"]["occupation_distribution"].items()), columns=["occupation","count"])
-    fig_occ = px.bar(occ_df, x="occupation", y="count", labels={"count":"Number of Learners"})
-    fig_occ.update_layout(height=400, template="plotly_dark")
+    fig_occ = figure_cache.get("occupations", filtered["demographics"]["occupation_distribution"], occupation_figure)
     st.plotly_chart(fig_occ, use_container_width=True)
 
     st.subheader("Engagement Factor Impact")
     ef = data.get("engagement_factors", {})
     if ef:
-        ef_df = pd.DataFrame({"factor": list(ef.keys()), "impact": list(ef.values())})
-        # Polar chart similar to radar
-        fig_rad = px.line_polar(ef_df, r="impact", theta="factor", line_close=True)
-        fig_rad.update_layout(height=400, template="plotly_dark")
+        fig_rad = figure_cache.get("engagement", ef, engagement_figure)
         st.plotly_chart(fig_rad, use_container_width=True)
 
 # ---- Platform Insights tab ----
-with tabs[2]:
+if active_tab == "Platform Insights":
     st.header("Platform Insights")
     st.subheader("Most Desired Features")
-    df_features = df_from_desired(filtered["desired_features"])
-    if not df_features.empty:
-        fig_fea = px.bar(df_features.sort_values("mentions"), x="mentions", y="feature", orientation="h", labels={"mentions":"Mentions","feature":"Feature"})
-        fig_fea.update_layout(height=400, template="plotly_dark")
+    if filtered["desired_features"]:
+        fig_fea = figure_cache.get("features", filtered["desired_features"], features_figure)
         st.plotly_chart(fig_fea, use_container_width=True)
     else:
         st.info("No desired features match current filters.")
 
     st.subheader("Platform Performance Metrics")
-    df_table = pd.DataFrame(data["platform_table"])
+    df_table = load_platform_table(data_key, data)
     st.dataframe(df_table, height=240)
 
 # ---- Industry Research tab ----
-with tabs[3]:
+if active_tab == "Industry Research":
     st.header("Industry Research & Benchmarks")
     st.markdown("""
     Key industry stats (from embedded data):
@@ -471,23 +625,76 @@ with tabs[3]:
     """)
     # placeholder small charts for benchmarks using funnel-like bars
     st.subheader("MOOC Completion Rate Benchmarks")
-    benchmark_df = pd.DataFrame({
+    benchmarks = {
         "category":["MOOC median","Cohort-based","Microlearning improvement"],
         "value":[12.6, 92.5, 17]  # example numbers (mirrored conceptually from app.js)
-    })
-    fig_b = px.bar(benchmark_df, x="category", y="value")
-    fig_b.update_layout(height=380, template="plotly_dark")
+    }
+    fig_b = figure_cache.get("benchmarks", benchmarks, benchmarks_figure)
     st.plotly_chart(fig_b, use_container_width=True)
 
 # ---- Community Insights tab ----
-with tabs[4]:
+if active_tab == "Community Insights":
     st.header("Community Insights & Discussions")
-    st.markdown("This tab shows community & article summaries included in the original dashboard.")
-    st.markdown("- Reddit discussions, blog articles and news items were rendered from the `communityData` JS object in the original. See `app.js` for details. :contentReference[oaicite:1]{index=1}")
-    st.markdown("Sample news items (see original for full list).")
-    # Instead of live embedding, just render the titles from the JS object in-app.js (communityData)
-    st.info("Community table is static in this port — but you can add a sheet with community tabs and map it to the app.")
+    st.markdown("Reddit discussions, blog articles and news on online learning (the `communityData` of the original `app.js`, plus any posts loaded with `python -m edtech_analytics community`).")
+    community = get_community_store()
+    facets = community.facets()
+    c1, c2, c3 = st.columns([3, 2, 2])
+    with c1:
+        community_query = st.text_input("Search posts", key="community_search", help="All words must match, as word prefixes; best matches first.")
+    with c2:
+        community_kinds = st.multiselect("Type", options=list(facets["kinds"]), format_func=lambda k: COMMUNITY_KINDS.get(k, k), key="community_kinds")
+    with c3:
+        community_tags = st.multiselect("Tags (any of)", options=[tag for tag, _ in facets["tags"]], key="community_tags")
+    community_years = None
+    if facets["years"] and facets["years"][0] < facets["years"][1]:
+        picked = st.slider("Year", min_value=facets["years"][0], max_value=facets["years"][1], value=facets["years"], key="community_years")
+        community_years = picked if picked != facets["years"] else None  # the full range also keeps undated posts
+
+    # Only the requested page is queried and rendered; a new query starts at page 1
+    query_key = (community_query, tuple(community_kinds), tuple(community_tags), community_years)
+    if st.session_state.get("community_query_key") != query_key:
+        st.session_state["community_query_key"] = query_key
+        st.session_state["community_page"] = 1
+    page = st.session_state.get("community_page", 1)
+    with span("community.search"):
+        total, posts = community.search(community_query, community_kinds, community_tags, community_years, page=page - 1)
+    pages = max(-(-total // COMMUNITY_PAGE_SIZE), 1)
+    if not total:
+        st.info("No posts match the current search and filters.")
+    else:
+        first = (page - 1) * COMMUNITY_PAGE_SIZE
+        st.caption(f"Showing {first + 1:,}–{first + len(posts):,} of {total:,} posts")
+    for post in posts:
+        with st.container(border=True):
+            st.markdown(f"**[{post['title']}]({post['url']})**" if post["url"] else f"**{post['title']}**")
+            meta = [COMMUNITY_KINDS.get(post["kind"], post["kind"]), post["source"], post["engagement"] or post["reading_time"], post["category"], post["date"]]
+            st.caption(" · ".join(m for m in meta if m))
+            st.write(post["summary"])
+            if post["tags"]:
+                st.caption(" ".join(f"`{tag}`" for tag in post["tags"]))
+    if pages > 1:
+        st.number_input(f"Page (of {pages:,})", min_value=1, max_value=pages, step=1, key="community_page")
 
 # Footer / notes
 st.markdown("---")
 st.caption("This Streamlit app reproduces the UI/UX and functionalities of the original HTML/CSS/JS dashboard (charts, filters, exports). Parts of the source files used: app.js and index.html. :contentReference[oaicite:2]{index=2} :contentReference[oaicite:3]{index=3}")
+
+# ---- Profiling ----
+record = profile.finish()
+if st.sidebar.checkbox("Profiling panel", value=False, key="profiling_panel", help="Timings of this rerun and rolling percentiles across every session of this server process."):
+    with st.sidebar.expander("Profiling", expanded=True):
+        st.write(f"This rerun: {record['total_ms']:.1f} ms")
+        cold = {k: STATS.first[k] for k in ("imports", "rerun") if k in STATS.first}
+        if cold:
+            st.write("Cold start (first rerun of this process): " + ", ".join(f"{k} {v:.0f} ms" for k, v in cold.items()))
+        st.dataframe(pd.DataFrame(record["spans"]), hide_index=True)
+        if record["counters"]:
+            st.write("Cache / I/O counters: " + ", ".join(f"{k} {v}" for k, v in sorted(record["counters"].items())))
+        if record["payload_bytes"]:
+            st.write("Chart payloads: " + ", ".join(f"{k} {v / 1024:.1f} KiB" for k, v in sorted(record["payload_bytes"].items())))
+        st.write(f"Rolling percentiles over {STATS.profiles:,} reruns (last {STATS.window} samples per span):")
+        st.dataframe(pd.DataFrame.from_dict(STATS.percentiles(), orient="index").round(2))
+        with STATS.lock:
+            totals = dict(STATS.counters)
+        if totals:
+            st.write("Counters since start: " + ", ".join(f"{k} {v:,}" for k, v in sorted(totals.items())))
@@ -0,0 +1,94 @@
+"""Static dashboard data bundle: encoding and the per-filter rows."""
+
+import gzip
+
+import numpy as np
+import pytest
+
+from edtech_analytics.bundle import BUNDLE_ALIGN, BUNDLE_MAGIC, build_bundle, compact, decode_bundle, encode_bundle, write_bundle
+from edtech_analytics.engine import FILTER_DIMENSIONS, Engine, get_filtered_data
+
+
+RESPONDENTS = [
+    {"age": age, "occupation": occupation, "platform": platform, "drop_point": drop_point, "reasons": [], "features": [], "dropoff_day": day}
+    for age, occupation, platform, drop_point, day in [
+        ("18-24", "Student", "YouTube", "Within the first week", 3.0),
+        ("18-24", "Student", "Udemy", "Never dropped", None),
+        ("25-34", "Working professional", "YouTube", "After 2-3 weeks", 17.5),
+        ("25-34", "Student", "YouTube", "Never dropped", None),
+        ("35-44", "Working professional", "Coursera", "After 1 month", 40.0),
+    ]
+]
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return Engine({"respondents": RESPONDENTS})
+
+
+def row_index(header, filters):
+    """Bundle row of a filter combination (row-major over the dimensions, "All" last on each axis)."""
+    index = 0
+    for dim in FILTER_DIMENSIONS:
+        labels = header["labels"][dim]
+        value = filters.get(dim)
+        index = index * (len(labels) + 1) + (labels.index(value) if value else len(labels))
+    return index
+
+
+def test_compact_picks_the_smallest_dtype():
+    assert compact([0, 255]).dtype == np.dtype("<u1")
+    assert compact([256]).dtype == np.dtype("<u2")
+    assert compact([70_000]).dtype == np.dtype("<u4")
+    assert compact([0.5]).dtype == np.dtype("<f8")
+    with pytest.raises(ValueError):
+        compact([2**32])
+
+
+def test_encode_decode_round_trip(engine):
+    header, arrays = build_bundle(engine)
+    payload = encode_bundle(header, arrays)
+    assert payload[:4] == BUNDLE_MAGIC
+    decoded_header, decoded = decode_bundle(gzip.compress(payload))
+    assert decoded_header["labels"] == header["labels"]
+    assert set(decoded) == set(arrays)
+    for name, values in arrays.items():
+        assert decoded_header["arrays"][name]["offset"] % BUNDLE_ALIGN == 0
+        np.testing.assert_array_equal(decoded[name], values)
+        assert not decoded[name].flags.writeable
+
+
+def test_rows_match_the_engine(engine):
+    header, arrays = build_bundle(engine)
+    assert not header["synthetic"]
+    for filters in ({}, {"age": "18-24"}, {"age": "25-34", "occupation": "Student"}):
+        row = row_index(header, filters)
+        filtered = get_filtered_data(engine.data, filters, store=engine.store, cube=engine.cube)
+        assert int(arrays["total"][row, 0]) == filtered["demographics"]["total_respondents"]
+        ages = dict(zip(header["labels"]["age"], arrays["age"][row].tolist()))
+        assert {k: v for k, v in ages.items() if v} == filtered["demographics"]["age_distribution"]
+        done = dict(zip(header["labels"]["age"], arrays["completed_age"][row].tolist()))
+        assert {k: v for k, v in done.items() if ages[k]} == filtered["completion"]["by_age"]
+
+
+def test_synthetic_bundle_has_only_the_unfiltered_row():
+    engine = Engine()
+    header, arrays = build_bundle(engine)
+    assert header["synthetic"]
+    assert {len(values) for values in arrays.values()} == {1}
+    assert "completed_age" not in arrays and "median_dropoff_day" not in arrays
+    assert int(arrays["total"][0, 0]) == engine.filtered({})["demographics"]["total_respondents"]
+
+
+def test_decode_rejects_other_files():
+    with pytest.raises(ValueError):
+        decode_bundle(b"PK\x03\x04 not a bundle")
+
+
+def test_write_bundle(tmp_path):
+    path, size = write_bundle(str(tmp_path))
+    with open(path, "rb") as fh:
+        payload = fh.read()
+    assert len(payload) == size
+    header, _ = decode_bundle(payload)
+    assert header["dimensions"] == list(FILTER_DIMENSIONS)
@@ -0,0 +1,70 @@
+"""CohortEngine: event folding, backfill and the incrementally kept funnel / retention."""
+
+import numpy as np
+import pandas as pd
+
+from edtech_analytics.cohorts import NO_WEEK, CohortEngine, build_cohorts, event_weeks, week_start
+
+MONDAY = pd.Timestamp("2025-01-06", tz="UTC")
+
+
+def at(week, day=0):
+    """Timestamp `day` days into the `week`-th week after MONDAY."""
+    return MONDAY + pd.Timedelta(days=7 * week + day)
+
+
+def test_event_weeks_are_monday_aligned():
+    weeks = event_weeks([MONDAY, MONDAY + pd.Timedelta(days=6), MONDAY + pd.Timedelta(days=7)])
+    assert weeks[0] == weeks[1] == weeks[2] - 1
+    assert week_start(weeks[0]) == "2025-01-06"
+    assert event_weeks([MONDAY.timestamp()])[0] == weeks[0]
+
+
+def test_missing_timestamps_and_unknown_stages_are_skipped():
+    assert event_weeks([None, "not a date"]).tolist() == [NO_WEEK, NO_WEEK]
+    engine = CohortEngine()
+    added = engine.add(["a", "b", "c", "a"], [at(0), None, at(0), at(1)], ["Started course", "Started course", "Graduated", "Completed 2-3 weeks"])
+    assert added == 2
+    assert engine.skipped == 2
+    assert engine.n_learners == 1
+    assert engine.cohort_weeks() == [event_weeks([MONDAY])[0]]
+
+
+def test_backfill_moves_enrollment_and_shifts_activity():
+    engine = CohortEngine()
+    engine.add(["a", "a"], [at(2), at(4)], [0, 1])
+    first = event_weeks([at(2)])[0]
+    assert engine.retention_matrix(3, percent=False)[0] == [first]
+    engine.add(["a"], [at(0)], [0])
+    assert int(engine.enroll[0]) == first - 2
+    assert int(engine.active[0]) == 0b10101
+    cohorts, matrix = engine.retention_matrix(5, percent=False)
+    assert cohorts == [first - 2]  # the old cohort's row was subtracted
+    assert matrix[0].tolist() == [1, 0, 1, 0, 1]
+
+
+def test_readding_a_learner_replaces_its_contribution():
+    engine = CohortEngine()
+    engine.add(["a", "b"], [at(0), at(0)], [1, 3])
+    engine.add(["a"], [at(1)], [5])
+    assert engine.stage_counts.tolist() == [0, 0, 0, 1, 0, 1]
+    assert [stage["learners"] for stage in engine.funnel()] == [2, 2, 2, 2, 1, 1]
+    assert engine.retention_matrix(2, percent=False)[1].tolist() == [[2, 1]]
+
+
+def test_batches_match_a_single_fold():
+    rng = np.random.default_rng(0)
+    n = 2_000
+    events = pd.DataFrame({
+        "user": rng.integers(0, 150, n).astype(str),
+        "time": MONDAY + pd.to_timedelta(rng.integers(0, 120, n), unit="D"),
+        "stage": rng.integers(0, 6, n),
+    })
+    whole = build_cohorts([events])
+    shuffled = events.sample(frac=1, random_state=1)
+    batched = build_cohorts(shuffled.iloc[start:start + 400] for start in range(0, n, 400))
+    assert whole.funnel() == batched.funnel()
+    (whole_cohorts, whole_matrix), (batched_cohorts, batched_matrix) = (e.retention_matrix(64, percent=False) for e in (whole, batched))
+    assert whole_cohorts == batched_cohorts  # batches may leave emptied cohort rows behind; those aren't reported
+    np.testing.assert_array_equal(whole_matrix, batched_matrix)
+    assert whole.events == batched.events == n
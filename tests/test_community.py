@@ -0,0 +1,96 @@
+"""CommunityStore: loading, full-text search, filters and facets."""
+
+import json
+
+import pytest
+
+from edtech_analytics.cli import main
+from edtech_analytics.community import CommunityStore, build_community_store, fts_query, read_posts
+from edtech_analytics.data import COMMUNITY_DATA
+
+POSTS = [
+    {"kind": "blog_articles", "url": "https://a", "title": "Why learners quit MOOCs", "summary": "Time constraints", "date": "2021", "tags": ["Completion Rates"]},
+    {"kind": "news_articles", "url": "https://b", "title": "Gamification raises retention", "summary": "Badges and streaks help learners", "date": "March 2023", "tags": ["Gamification", "Retention"]},
+    {"kind": "reddit_discussions", "url": "https://c", "title": "Anyone finish a course?", "subreddit": "r/learnprogramming", "date": "2019-05-01", "tags": ["Completion Rates"]},
+]
+
+
+@pytest.fixture
+def store():
+    store = CommunityStore()
+    store.add(POSTS)
+    yield store
+    store.close()
+
+
+def test_fts_query():
+    assert fts_query("Learner quit!") == '"learner"* AND "quit"*'
+    assert fts_query("  ?! ") is None
+
+
+def test_search_matches_word_prefixes(store):
+    total, posts = store.search("learners")
+    assert total == 2
+    assert [p["url"] for p in posts] == ["https://a", "https://b"]  # title hits rank first
+    assert store.search("learners gamification")[0] == 1
+    assert store.search("gamif")[0] == 1
+
+
+def test_browse_is_newest_first_with_filters(store):
+    total, posts = store.search()
+    assert total == 3 and [p["year"] for p in posts] == [2023, 2021, 2019]
+    assert posts[0]["tags"] == ["Gamification", "Retention"]
+    assert store.search(kinds=["reddit_discussions"])[1][0]["source"] == "r/learnprogramming"
+    assert store.search(tags=["Completion Rates"])[0] == 2
+    assert store.search(years=(2020, 2022))[0] == 1
+    total, page = store.search(page=1, page_size=2)
+    assert total == 3 and [p["url"] for p in page] == ["https://c"]
+
+
+def test_readding_a_url_updates_the_post(store):
+    store.add([{**POSTS[0], "title": "Why learners stay", "tags": ["Retention"]}])
+    assert len(store) == 3
+    assert store.search("quit")[0] == 0
+    assert store.search(tags=["Retention"])[0] == 2
+
+
+def test_posts_need_a_kind(store):
+    with pytest.raises(ValueError):
+        store.add([{"title": "No kind"}])
+
+
+def test_facets(store):
+    facets = store.facets()
+    assert facets["kinds"] == {"blog_articles": 1, "news_articles": 1, "reddit_discussions": 1}
+    assert facets["tags"][0] == ("Completion Rates", 2)
+    assert facets["years"] == (2019, 2023)
+
+
+def test_build_seeds_only_an_empty_store(tmp_path):
+    path = str(tmp_path / "community.db")
+    seeded = build_community_store(path)
+    assert len(seeded) == sum(len(posts) for posts in COMMUNITY_DATA.values())
+    seeded.close()
+    empty = build_community_store(str(tmp_path / "other.db"), None)
+    assert len(empty) == 0
+    empty.close()
+
+
+def test_read_posts(tmp_path):
+    listed = tmp_path / "posts.jsonl"
+    listed.write_text("\n".join(json.dumps({k: v for k, v in p.items() if k != "kind"}) for p in POSTS[:2]) + "\n")
+    assert {p["kind"] for p in read_posts(str(listed), kind="blog_articles")} == {"blog_articles"}
+    shaped = tmp_path / "posts.json"
+    shaped.write_text(json.dumps({"news_articles": [POSTS[1]]}))
+    assert read_posts(str(shaped))[0]["kind"] == "news_articles"
+
+
+def test_cli_seed_adds_to_a_database_with_posts(tmp_path):
+    path = str(tmp_path / "community.db")
+    store = CommunityStore(path)
+    store.add(POSTS)
+    store.close()
+    assert main(["community", "--db", path, "--seed"]) == 0
+    store = CommunityStore(path)
+    assert len(store) == len(POSTS) + sum(len(posts) for posts in COMMUNITY_DATA.values())
+    store.close()
@@ -0,0 +1,80 @@
+"""AggregationCube: lookups against recounting the store, and incremental adds."""
+
+import itertools
+
+import numpy as np
+import pytest
+
+from edtech_analytics.cube import AggregationCube, build_aggregation_cube
+from edtech_analytics.store import RespondentStore
+
+RECORDS = [
+    {"age": "18-24", "occupation": "Student", "platform": "YouTube", "drop_point": "Within the first week", "reasons": ["Lack of time"], "features": ["Mentors"], "dropoff_day": 2.5},
+    {"age": "18-24", "occupation": "Student", "platform": "Udemy", "drop_point": "Never dropped", "reasons": [], "features": ["Mentors", "Badges"]},
+    {"age": "25-34", "occupation": "Working professional", "platform": "YouTube", "drop_point": "After 2-3 weeks", "reasons": ["Lack of time", "Too hard"], "features": [], "dropoff_day": 15.0},
+    {"age": "25-34", "occupation": None, "platform": "YouTube", "drop_point": "Never dropped", "reasons": ["Too hard"], "features": []},
+]
+
+
+def combinations(store):
+    options = [[""] + store.labels[dim] + ["unknown"] for dim in AggregationCube.DIMENSIONS]
+    for values in itertools.product(*options):
+        yield dict(zip(AggregationCube.DIMENSIONS, values))
+
+
+def assert_counts_equal(got, expected):
+    assert got["total"] == expected["total"]
+    for col in ("age", "occupation", "platform", "drop_point", "reasons", "features", "dropoff_day"):
+        np.testing.assert_array_equal(got[col], expected[col], err_msg=col)
+    for dim in ("age", "occupation"):
+        np.testing.assert_array_equal(got["completed"][dim], expected["completed"][dim], err_msg=dim)
+
+
+def test_lookup_matches_recounting_the_store():
+    store = RespondentStore.from_records(RECORDS)
+    cube = build_aggregation_cube(store)
+    for filters in combinations(store):
+        counts = cube.lookup(filters)
+        if "unknown" in filters.values():
+            assert counts is None
+        else:
+            assert_counts_equal(counts, store.aggregate(store.mask(filters)))
+
+
+def test_tensors_are_read_only():
+    cube = build_aggregation_cube(RespondentStore.from_records(RECORDS))
+    with pytest.raises(ValueError):
+        cube.lookup({})["reasons"][0] = 99
+    assert cube.n_cells == 4 * 4 * 4  # 2 labels + unanswered + All on each axis
+    assert cube.nbytes > 0
+
+
+def test_add_matches_a_rebuild():
+    labels = RespondentStore.from_records(RECORDS).labels
+    first = RespondentStore.from_records(RECORDS[:2], labels=labels)
+    cube = build_aggregation_cube(first)
+    before = cube.lookup({})["reasons"]
+    new = RespondentStore.from_records(RECORDS[2:], labels=labels)
+    assert cube.compatible(new)
+    cube.add(new)
+    rebuilt = build_aggregation_cube(first.concat(new))
+    for filters in combinations(rebuilt):
+        if "unknown" not in filters.values():
+            assert_counts_equal(cube.lookup(filters), rebuilt.lookup(filters))
+    assert before.tolist() == [1, 0]  # an earlier lookup's view is untouched
+    assert cube.lookup({})["reasons"].tolist() == [2, 2]
+
+
+def test_add_rejects_new_labels():
+    cube = build_aggregation_cube(RespondentStore.from_records(RECORDS[:1]))
+    with pytest.raises(ValueError):
+        cube.add(RespondentStore.from_records(RECORDS[2:]))
+
+
+def test_synthetic_flag_follows_the_store():
+    store = RespondentStore.from_records(RECORDS)
+    cube = build_aggregation_cube(store)
+    assert not cube.synthetic
+    synthetic = RespondentStore(store.labels, store.codes, store.bits, numbers=store.numbers, synthetic=True)
+    cube.add(synthetic)
+    assert cube.synthetic
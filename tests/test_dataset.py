@@ -0,0 +1,60 @@
+"""Read-only datasets: freeze, FrozenDict and DataView."""
+
+import copy
+import json
+import pickle
+
+import numpy as np
+import pytest
+
+from edtech_analytics.dataset import DataView, FrozenDict, freeze, read_only
+
+
+def test_freeze_is_deep():
+    data = freeze({"a": {"b": [1, {"c": 2}]}, "x": np.arange(3)})
+    assert isinstance(data["a"], FrozenDict)
+    assert data["a"]["b"] == (1, {"c": 2})
+    assert isinstance(data["a"]["b"][1], FrozenDict)
+    assert not data["x"].flags.writeable
+    assert freeze(data) is data
+
+
+@pytest.mark.parametrize("mutate", [
+    lambda d: d.__setitem__("k", 1),
+    lambda d: d.__delitem__("a"),
+    lambda d: d.update(k=1),
+    lambda d: d.pop("a"),
+    lambda d: d.setdefault("k", 1),
+    lambda d: d.clear(),
+])
+def test_frozen_dict_rejects_mutation(mutate):
+    data = freeze({"a": 1})
+    with pytest.raises(TypeError):
+        mutate(data)
+    assert data == {"a": 1}
+
+
+def test_frozen_dict_is_still_a_dict():
+    data = freeze({"a": [1, 2]})
+    assert json.loads(json.dumps(data)) == {"a": [1, 2]}
+    assert copy.deepcopy(data) is data
+    assert pickle.loads(pickle.dumps(data)) == data
+    assert {**data, "b": 3} == {"a": (1, 2), "b": 3}
+
+
+def test_read_only_views():
+    array = read_only(np.zeros(4))
+    with pytest.raises(ValueError):
+        array[1:][0] = 1
+
+
+def test_data_view_overlays_without_copying():
+    base = freeze({"a": 1, "b": {"c": 2}})
+    view = DataView(base, freeze({"a": 10, "d": 4}))
+    assert view["a"] == 10 and view["d"] == 4
+    assert view["b"] is base["b"]
+    assert list(view) == ["a", "b", "d"]
+    assert len(view) == 3
+    assert view.to_dict() == {"a": 10, "b": {"c": 2}, "d": 4}
+    assert view.get("missing") is None
+    assert not hasattr(view, "__setitem__")
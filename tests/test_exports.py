@@ -0,0 +1,55 @@
+"""Summary and respondent exports."""
+
+import gzip
+import io
+import json
+
+import pandas as pd
+import pytest
+
+from edtech_analytics.engine import Engine
+from edtech_analytics.exports import export_respondents, generate_json_bytes
+
+RECORDS = [
+    {"age": "18-24", "occupation": "Student", "platform": "YouTube", "drop_point": "Never dropped", "reasons": ["Lack of time"], "features": [], "comment": "loved it", "dropoff_day": None},
+    {"age": "25-34", "occupation": "Student", "platform": "Udemy", "drop_point": "After 2-3 weeks", "reasons": ["Lack of time", "Cost"], "features": ["Mentors"], "comment": "", "dropoff_day": 12.5},
+]
+
+
+@pytest.fixture(scope="module")
+def engine():
+    return Engine({"respondents": RECORDS, "engagement_factors": {"Videos": 3}})
+
+
+def test_json_summary_leaves_out_the_respondents(engine):
+    export = json.loads(generate_json_bytes(engine.filtered({"age": "18-24"})))
+    assert "respondents" not in export["filtered"]
+    assert export["filtered"]["engagement_factors"] == {"Videos": 3}
+    assert export["filtered"]["demographics"]["age_distribution"] == {"18-24": 1}
+    assert export["metadata"]["total_respondents"] == 1
+
+
+def test_csv_export(engine):
+    with engine.export_respondents({"occupation": "Student"}, "csv", compress=True) as src:
+        frame = pd.read_csv(io.BytesIO(gzip.decompress(src.read())))
+    assert frame["age"].tolist() == ["18-24", "25-34"]
+    assert frame["reasons"].tolist() == ["Lack of time", "Lack of time; Cost"]
+
+
+def test_empty_exports_keep_the_header_and_schema(engine):
+    mask = engine.store.mask({"age": "65+"})
+    with export_respondents(engine.store, mask, "csv") as src:
+        assert src.read().decode().splitlines() == ["age,occupation,platform,drop_point,reasons,features,comment,dropoff_day"]
+    with export_respondents(engine.store, mask, "jsonl") as src:
+        assert src.read() == b""
+    pytest.importorskip("pyarrow")
+    with export_respondents(engine.store, mask, "parquet") as src:
+        frame = pd.read_parquet(io.BytesIO(src.read()))
+    assert frame.empty
+    assert list(frame.columns) == ["age", "occupation", "platform", "drop_point", "reasons", "features", "comment", "dropoff_day"]
+    assert frame["dropoff_day"].dtype == "float64"
+
+
+def test_aggregate_only_data_has_no_respondents_to_export():
+    with pytest.raises(ValueError):
+        Engine().export_respondents({})
@@ -0,0 +1,88 @@
+"""KPIs, the drop-off day sketch and incremental appends."""
+
+import numpy as np
+import pytest
+
+from edtech_analytics.engine import Engine
+from edtech_analytics.metrics import (
+    HistogramSketch,
+    bucket_labels,
+    bucket_rows,
+    completion_rate,
+    day_bins,
+    day_hour_matrix,
+    kpis,
+    week_day_matrix,
+)
+
+RECORDS = [
+    {"age": "18-24", "occupation": "Student", "platform": "YouTube", "drop_point": "Within the first week", "dropoff_day": 2.0},
+    {"age": "18-24", "occupation": "Student", "platform": "YouTube", "drop_point": "After 2-3 weeks", "dropoff_day": 10.0},
+    {"age": "25-34", "occupation": "Working professional", "platform": "Udemy", "drop_point": "Never dropped", "dropoff_day": None},
+    {"age": "25-34", "occupation": "Student", "platform": "Udemy", "drop_point": "Midway through the course", "dropoff_day": 30.0},
+]
+
+
+def test_day_bins_clip_and_skip_unknown():
+    idx, known = day_bins([0.5, np.nan, 3.2, 1e6], width=1.0, bins=10)
+    assert idx.tolist() == [0, 3, 9]
+    assert known.tolist() == [True, False, True, True]
+
+
+def test_sketch_quantiles_and_merge():
+    sketch = HistogramSketch().add([1.5, 2.5, 3.5, np.nan])
+    assert sketch.count == 3
+    assert sketch.quantile(0.5) == pytest.approx(2.5)
+    assert HistogramSketch().quantile(0.5) is None
+    merged = HistogramSketch().add([1.5]).merge(HistogramSketch().add([2.5, 3.5]))
+    np.testing.assert_array_equal(merged.counts, sketch.counts)
+
+
+def test_completion_rate():
+    assert completion_rate({"Never dropped": 1, "Within the first week": 3}, ["Never dropped"]) == 25.0
+    assert completion_rate({}, ["Never dropped"]) is None
+
+
+def test_kpis_come_from_the_data():
+    kpi = kpis(Engine({"respondents": RECORDS}).filtered({}))
+    assert kpi["total_respondents"] == 4
+    assert kpi["completion_rate"] == 25.0
+    assert kpi["median_dropoff_day"] == pytest.approx(10.5)
+    assert kpi["first_week_dropoff"] == 25.0
+
+
+def test_append_updates_kpis_like_a_rebuild():
+    engine = Engine({"respondents": RECORDS[:2]})
+    for record in RECORDS[2:]:
+        engine.append([record])
+    rebuilt = Engine({"respondents": RECORDS})
+    for filters in ({}, {"age": "25-34"}, {"occupation": "Student", "platform": "Udemy"}):
+        assert kpis(engine.filtered(filters)) == kpis(rebuilt.filtered(filters))
+    assert engine.store.n == 4
+
+
+def test_appends_share_the_earlier_rows():
+    engine = Engine({"respondents": RECORDS[:1]})
+    engine.append(RECORDS[1:2])
+    before = engine.store
+    engine.append(RECORDS[2:])
+    assert np.shares_memory(before.codes["age"], engine.store.codes["age"])
+    assert before.n == 2 and before.codes["age"].tolist() == [0, 0]
+    assert engine.store.codes["age"].tolist() == [0, 0, 1, 1]
+    assert not engine.store.codes["age"].flags.writeable
+    branch = before.concat(engine.store)  # `before` is no longer the latest store over its buffers: copied
+    assert branch.n == 6 and before.codes["age"].tolist() == [0, 0]
+    assert engine.store.codes["age"].tolist() == [0, 0, 1, 1]
+
+
+def test_heatmap_matrices():
+    counts = np.arange(21)
+    matrix = week_day_matrix(counts, weeks=3)
+    assert matrix.shape == (3, 7) and matrix[1, 0] == 7
+    with pytest.raises(ValueError):
+        week_day_matrix(counts, weeks=0)
+    hours = day_hour_matrix([0.5, 1.25, np.nan, 99.0], weeks=1)
+    assert hours.shape == (7, 24) and hours[0, 12] == 1 and hours[1, 6] == 1 and hours.sum() == 2
+    buckets, step = bucket_rows(np.ones((5, 2)), max_rows=2)
+    assert step == 3 and buckets[:, 0].tolist() == [3, 2]
+    assert bucket_labels("Week", 5, 3) == ["Weeks 1-3", "Weeks 4-5"]
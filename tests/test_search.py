@@ -0,0 +1,70 @@
+"""Search index queries and the engine's search filter."""
+
+import pytest
+
+from edtech_analytics.engine import Engine
+from edtech_analytics.search import SearchIndex, edit_distance, tokenize
+
+DOCS = ["Lack of time", "Lack of motivation", "Course too difficult", "Timing conflicts", "Mentor or study groups"]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return SearchIndex({"reasons": DOCS, "comment": ["too long", "", "great mentor", None]})
+
+
+def ids(result):
+    return result.tolist()
+
+
+def test_tokenize_lowercases_words():
+    assert tokenize("Lack-of TIME!") == ["lack", "of", "time"]
+
+
+def test_substring_match(index):
+    assert ids(index.search("tim", "reasons")) == [0, 3]
+
+
+def test_prefix_star_restricts_to_word_starts(index):
+    assert ids(index.search("ime", "reasons")) == [0]
+    assert ids(index.search("ime*", "reasons")) == []
+    assert ids(index.search("tim*", "reasons")) == [0, 3]
+
+
+def test_all_words_must_match(index):
+    assert ids(index.search("lack time", "reasons")) == [0]
+    assert ids(index.search("lack nothing", "reasons")) == []
+
+
+def test_fuzzy_matches_near_words(index):
+    assert ids(index.search("motivaton", "reasons")) == []
+    assert ids(index.search("motivaton", "reasons", fuzzy=True)) == [1]
+    assert ids(index.search("mnetor", "reasons", fuzzy=True)) == [4]  # adjacent swap is one edit
+
+
+def test_edit_distance():
+    assert edit_distance("kitten", "sitting", 3) == 3
+    assert edit_distance("ab", "ba", 1) == 1
+    assert edit_distance("abcdef", "uvwxyz", 2) == 3  # gives up past the limit
+
+
+@pytest.mark.parametrize("query", ["", "?", "*", "-", "  ?! "])
+def test_queries_without_words_are_empty(index, query):
+    assert index.search(query, "reasons") is None
+
+
+def test_other_fields_and_missing_docs(index):
+    assert ids(index.search("mentor", "comment")) == [2]
+    assert ids(index.search("mentor", "features")) == []
+
+
+@pytest.mark.parametrize("query", ["?", "*", "-"])
+def test_engine_ignores_queries_without_words(query):
+    engine = Engine()
+    assert engine.filtered({"search": query}) == engine.filtered({})
+
+
+def test_engine_search_filters_reasons_and_features():
+    filtered = Engine().filtered({"search": "lack"})
+    assert filtered["dropoff_reasons"] and all("lack" in r["reason"].lower() for r in filtered["dropoff_reasons"])
+    assert filtered["desired_features"] == ()
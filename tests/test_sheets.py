@@ -0,0 +1,272 @@
+"""SheetDataSource and normalize_tab against the in-memory sheet backend."""
+
+import pytest
+
+from edtech_analytics.data import DASHBOARD_DATA
+from edtech_analytics.engine import get_filtered_data
+from edtech_analytics.metrics import kpis
+from edtech_analytics.sheets import (
+    TAB_COLUMNS,
+    InMemorySheetBackend,
+    SheetDataSource,
+    fetch_data_from_gsheet,
+    normalize_tab,
+    rows_to_frame,
+    with_retry,
+)
+
+TABS = {
+    "funnel": [["stage", "learners", "percentage"], ["Started", 100, ""], ["Finished", 25, ""]],
+    "DropoffReasons": [["Reason", "Count"], ["Lack of time", 12], ["Too hard", 7]],
+}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Flaky(InMemorySheetBackend):
+    """Backend whose next `failures` reads raise."""
+
+    def __init__(self, tabs):
+        super().__init__(tabs)
+        self.failures = 0
+
+    def read_tabs(self, titles):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("connection reset")
+        return super().read_tabs(titles)
+
+
+class HTTPError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.response = type("Response", (), {"status_code": status})()
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+def raising(exc):
+    def call():
+        raise exc
+    return call
+
+
+def normalize(tab, rows):
+    return normalize_tab(rows_to_frame(rows), TAB_COLUMNS[tab], tab)
+
+
+def test_normalize_resolves_aliases_and_coerces():
+    clean, rejected = normalize("dropoff_reasons", [["Reason", "value"], [" Lack of time ", "12"], ["Too hard", 7.0]])
+    assert clean.to_dict(orient="records") == [{"reason": "Lack of time", "count": 12}, {"reason": "Too hard", "count": 7}]
+    assert rejected == []
+
+
+def test_normalize_first_alias_wins_per_row():
+    clean, _ = normalize("dropoff_reasons", [["reason", "count", "value"], ["a", "", 3], ["b", 4, 5]])
+    assert clean["count"].tolist() == [3, 4]
+
+
+def test_normalize_skips_blank_rows_and_reports_bad_ones():
+    rows = [["reason", "count"], ["", ""], ["", 5], ["a", "many"], ["b", "1.5"], ["c", 1e30], ["d", 2]]
+    clean, rejected = normalize("dropoff_reasons", rows)
+    assert clean.to_dict(orient="records") == [{"reason": "d", "count": 2}]
+    assert [(r["row"], r["reason"]) for r in rejected] == [
+        (3, "missing reason"),
+        (4, "non-numeric count"),
+        (5, "non-integer count"),
+        (6, "non-integer count"),
+    ]
+    assert all(r["tab"] == "dropoff_reasons" for r in rejected)
+
+
+def test_normalize_keeps_float_columns_fractional():
+    clean, rejected = normalize("funnel", [["stage", "learners", "percentage"], ["Started", 10, "33.3"], ["Done", 3, ""]])
+    assert clean["percentage"].tolist()[0] == 33.3
+    assert clean["percentage"].isna().tolist() == [False, True]
+    assert rejected == []
+
+
+def test_ragged_rows_are_padded():
+    clean, _ = normalize("dropoff_reasons", [["reason", "count"], ["a"], ["b", 2, "extra"]])
+    assert clean.to_dict(orient="records") == [{"reason": "a", "count": 0}, {"reason": "b", "count": 2}]
+
+
+def test_source_serves_cache_within_ttl(clock):
+    backend = InMemorySheetBackend(TABS)
+    source = SheetDataSource(backend, ttl=60, clock=clock)
+    tabs = source.get()
+    assert set(tabs) == {"funnel", "dropoff_reasons"}
+    assert source.version == 1
+    clock.now = 59
+    source.get()
+    assert backend.calls == {"list_tabs": 1, "read_tabs": 1}
+    source.close()
+
+
+def test_source_rereads_only_changed_tabs_after_ttl(clock):
+    backend = InMemorySheetBackend(TABS)
+    source = SheetDataSource(backend, ttl=60, clock=clock)
+    source.get()
+    clock.now = 60
+    assert source.refresh() == []  # nothing changed: listed, not re-read
+    assert backend.calls == {"list_tabs": 2, "read_tabs": 1}
+    assert source.version == 1
+
+    backend.set_tab("DropoffReasons", [["reason", "count"], ["Lack of time", 20]])
+    assert source.refresh() == ["dropoff_reasons"]
+    assert source.version == 2
+    assert source.get()["dropoff_reasons"]["count"].tolist() == [20]
+    source.close()
+
+
+def test_expired_get_refreshes_in_background(clock):
+    backend = InMemorySheetBackend(TABS)
+    source = SheetDataSource(backend, ttl=60, clock=clock)
+    before = source.get()
+    backend.set_tab("funnel", [["stage", "learners"], ["Started", 50]])
+    clock.now = 61
+    stale = source.get()  # served from cache while the refresh runs
+    assert stale["funnel"].equals(before["funnel"])
+    source.pending.result(timeout=5)
+    assert source.get()["funnel"]["learners"].tolist() == [50]
+    source.close()
+
+
+def test_removed_tab_is_dropped(clock):
+    backend = InMemorySheetBackend(TABS)
+    source = SheetDataSource(backend, clock=clock)
+    source.get()
+    del backend.tabs["funnel"], backend.revisions["funnel"]
+    source.refresh()
+    assert set(source.get()) == {"dropoff_reasons"}
+    assert source.version == 2
+    source.close()
+
+
+def test_failed_refresh_keeps_last_good_tabs(clock):
+    backend = Flaky(TABS)
+    source = SheetDataSource(backend, clock=clock)
+    good = source.get()
+    backend.set_tab("funnel", [["stage", "learners"], ["Started", 1]])
+    backend.failures = 1
+    with pytest.raises(OSError):
+        source.refresh()
+    assert isinstance(source.error, OSError)
+    assert source.get()["funnel"].equals(good["funnel"])
+    source.refresh()
+    assert source.error is None
+    assert source.get()["funnel"]["learners"].tolist() == [1]
+    source.close()
+
+
+def test_clear_discards_a_refresh_started_before_it(clock):
+    backend = InMemorySheetBackend(TABS)
+    source = SheetDataSource(backend, clock=clock)
+    source.get()
+    version = source.version
+
+    class ClearingBackend(InMemorySheetBackend):
+        cleared = False
+
+        def read_tabs(self, titles):
+            if not self.cleared:
+                self.cleared = True
+                source.clear()  # lands while this refresh is reading
+            return super().read_tabs(titles)
+
+    source.backend = ClearingBackend(TABS)
+    source.backend.set_tab("funnel", [["stage", "learners"], ["Started", 9]])
+    assert source.refresh() == []  # its tabs predate the clear
+    assert not source.ready
+    assert source.get()["funnel"]["learners"].tolist() == [9]  # the next get() reloads
+    assert source.version > version
+    source.close()
+
+
+def test_rejections_are_reported(clock):
+    backend = InMemorySheetBackend({"dropoff": [["reason", "count"], ["a", "x"], ["b", 2]]})
+    source = SheetDataSource(backend, clock=clock)
+    source.get()
+    assert [(r["tab"], r["row"]) for r in source.rejection_report()] == [("dropoff", 2)]
+    source.close()
+
+
+def test_with_retry_backs_off_on_transient_errors():
+    calls, waits = [], []
+
+    def call():
+        calls.append(1)
+        if len(calls) < 3:
+            raise HTTPError(503)
+        return "ok"
+
+    assert with_retry(call, retries=3, backoff=1.0, sleep=waits.append) == "ok"
+    assert waits == [1.0, 2.0]
+
+
+def test_with_retry_gives_up():
+    waits = []
+    with pytest.raises(OSError):
+        with_retry(raising(OSError("down")), retries=2, backoff=0.5, sleep=waits.append)
+    assert waits == [0.5, 1.0]
+    with pytest.raises(HTTPError):
+        with_retry(raising(HTTPError(403)), sleep=waits.append)
+    assert waits == [0.5, 1.0]  # client errors aren't retried
+
+
+def test_fetch_maps_tabs_once_per_version(clock):
+    backend = InMemorySheetBackend({
+        **TABS,
+        "age_distribution": [["age", "count"], ["18-24", 600], ["25-34", 400]],
+    })
+    source = SheetDataSource(backend, clock=clock)
+    data = fetch_data_from_gsheet("sheet", source=source)
+    assert data["dropoff_patterns"]["funnel_data"][1] == {"stage": "Finished", "learners": 25, "percentage": 25.0}
+    assert data["dropoff_reasons"] == ({"reason": "Lack of time", "count": 12}, {"reason": "Too hard", "count": 7})
+    assert data["demographics"]["age_distribution"] == {"18-24": 600, "25-34": 400}
+    assert data["demographics"]["total_respondents"] == 1000
+    assert fetch_data_from_gsheet("sheet", source=source) is data
+    with pytest.raises(TypeError):
+        data["demographics"]["total_respondents"] = 0
+    source.close()
+
+
+def test_sources_have_distinct_ids():
+    first, second = SheetDataSource(InMemorySheetBackend(TABS)), SheetDataSource(InMemorySheetBackend(TABS))
+    assert first.id != second.id
+    first.close()
+    second.close()
+
+
+def test_fetch_leaves_the_embedded_data_alone(clock):
+    before = {key: dict(value) if isinstance(value, dict) else value for key, value in DASHBOARD_DATA.items()}
+    backend = InMemorySheetBackend({"demographics_age": [["age", "count"], ["under 18", 3]], "platforms": [["platform", "users"], ["X", 3]]})
+    source = SheetDataSource(backend, clock=clock)
+    data = fetch_data_from_gsheet("sheet", source=source)
+    assert data["demographics"]["age_distribution"] == {"under 18": 3}
+    assert {key: dict(value) if isinstance(value, dict) else value for key, value in DASHBOARD_DATA.items()} == before
+    source.close()
+
+
+def test_sheet_funnel_drives_drop_points_and_completion(clock):
+    backend = InMemorySheetBackend({"funnel": [["stage", "learners"], ["Started", 1000], ["Halfway", 700], ["Completed", 400]]})
+    source = SheetDataSource(backend, clock=clock)
+    data = fetch_data_from_gsheet("sheet", source=source)
+    drop_points = data["dropoff_patterns"]["drop_points"]
+    assert drop_points["Within the first week"] == 300
+    assert drop_points["After 2-3 weeks"] == 300
+    assert drop_points["Never dropped"] == 400
+    assert data["demographics"]["total_respondents"] == 1000
+    kpi = kpis(get_filtered_data(data, {}))
+    assert kpi["completion_rate"] == 40.0
+    assert kpi["total_respondents"] == 1000
+    source.close()
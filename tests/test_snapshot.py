@@ -0,0 +1,92 @@
+"""Snapshot save / load round trip."""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+from edtech_analytics.data import DASHBOARD_DATA
+from edtech_analytics.snapshot import SnapshotStore
+from edtech_analytics.store import RespondentStore, build_respondent_store
+
+RESPONDENTS = [
+    {"age": "18-24", "occupation": "Student", "platform": "YouTube", "drop_point": "After 2-3 weeks",
+     "reasons": ["Lack of time"], "features": ["Mentor or study groups"], "comment": "too long", "dropoff_day": 9.5},
+    {"age": "25-34", "occupation": "Employed full-time", "platform": "Udemy", "drop_point": "Never dropped",
+     "reasons": [], "features": [], "comment": "", "dropoff_day": None},
+]
+
+
+def assert_same_store(loaded, store):
+    assert loaded.n == store.n
+    assert loaded.labels == store.labels
+    assert loaded.synthetic == store.synthetic
+    for kind in ("codes", "bits", "numbers"):
+        for col, values in getattr(store, kind).items():
+            np.testing.assert_array_equal(getattr(loaded, kind)[col], values)
+    assert {col: list(v) for col, v in loaded.text.items()} == {col: list(v) for col, v in store.text.items()}
+
+
+def test_round_trip_of_aggregates(tmp_path):
+    snapshots = SnapshotStore(str(tmp_path))
+    store = build_respondent_store(DASHBOARD_DATA)
+    snapshots.save(DASHBOARD_DATA, store, source="sheet", version=3)
+    snapshot = snapshots.latest("sheet")
+    assert snapshot.source == "sheet"
+    data, loaded = snapshot.load()
+    assert data == DASHBOARD_DATA
+    assert_same_store(loaded, store)
+    assert loaded.synthetic
+    with pytest.raises(ValueError):
+        loaded.codes["age"][0] = 1  # memory-mapped read-only
+
+
+def test_round_trip_of_respondents(tmp_path):
+    snapshots = SnapshotStore(str(tmp_path))
+    data = {**DASHBOARD_DATA, "respondents": RESPONDENTS}
+    snapshots.save(data, source="survey")
+    _, loaded = snapshots.latest("survey").load()
+    assert_same_store(loaded, RespondentStore.from_records(RESPONDENTS))
+    assert not loaded.synthetic
+
+
+def test_latest_filters_by_source_and_prunes(tmp_path):
+    snapshots = SnapshotStore(str(tmp_path), keep=2)
+    for source in ("a", "b", "a"):
+        snapshots.save(DASHBOARD_DATA, source=source)
+    assert snapshots.latest().source == "a"
+    assert snapshots.latest("b").source == "b"
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_appended_store_round_trips_only_its_rows(tmp_path):
+    snapshots = SnapshotStore(str(tmp_path))
+    store = RespondentStore.from_records(RESPONDENTS[:1]).concat(RespondentStore.from_records(RESPONDENTS[1:]))
+    snapshots.save({"respondents": RESPONDENTS}, store, source="survey")
+    _, loaded = snapshots.latest().load()
+    assert_same_store(loaded, store)
+    grown = loaded.concat(RespondentStore.from_records(RESPONDENTS[:1]))  # memory maps are copied, not written
+    assert grown.n == 3
+    assert_same_store(snapshots.latest().load()[1], store)
+
+
+def test_unreadable_directories_are_skipped(tmp_path):
+    snapshots = SnapshotStore(str(tmp_path))
+    saved = snapshots.save(DASHBOARD_DATA, source="sheet")
+    (tmp_path / "zz-partial").mkdir()
+    older = tmp_path / "zz-older"
+    older.mkdir()
+    (older / "manifest.json").write_text(json.dumps({"format": 0}))
+    assert [snap.path for snap in snapshots.list()] == [saved.path]
+    assert 0 <= saved.age_seconds() < 60
+
+
+def test_manifest_without_synthetic_flag(tmp_path):
+    snapshots = SnapshotStore(str(tmp_path))
+    snapshot = snapshots.save(DASHBOARD_DATA, source="sheet")
+    manifest_path = tmp_path / os.path.basename(snapshot.path) / "manifest.json"
+    manifest = json.loads(manifest_path.read_text())
+    del manifest["synthetic"]
+    manifest_path.write_text(json.dumps(manifest))
+    assert snapshots.latest().load()[1].synthetic  # no respondents in the dataset: expanded aggregates
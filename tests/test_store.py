@@ -0,0 +1,106 @@
+"""RespondentStore: records, aggregates, masks and the engine's filtered series over it."""
+
+import numpy as np
+import pytest
+
+from edtech_analytics.data import DASHBOARD_DATA
+from edtech_analytics.engine import get_filtered_data
+from edtech_analytics.store import RespondentStore, drop_points_from_funnel, funnel_from_drop_points
+
+RECORDS = [
+    {"age": "18-24", "occupation": "Student", "platform": "YouTube", "drop_point": "Within the first week", "reasons": ["Lack of time"], "features": ["Mentors"], "comment": "too busy", "dropoff_day": 2.5},
+    {"age": "18-24", "occupation": "Student", "platform": "Udemy", "drop_point": "Never dropped", "reasons": [], "features": ["Mentors", "Badges"]},
+    {"age": "25-34", "occupation": "Working professional", "platform": "YouTube", "drop_point": "After 2-3 weeks", "reasons": ["Lack of time", "Too hard"], "features": [], "dropoff_day": 15.0},
+    {"age": None, "occupation": "Student", "platform": "YouTube", "drop_point": "", "reasons": None, "features": []},
+]
+
+
+@pytest.fixture
+def store():
+    return RespondentStore.from_records(RECORDS)
+
+
+def test_from_records_encodes_columns(store):
+    assert store.n == 4
+    assert store.labels["age"] == ["18-24", "25-34"]
+    assert store.codes["age"].tolist() == [0, 0, 1, -1]
+    assert store.labels["features"] == ["Mentors", "Badges"]
+    assert store.bits["features"].tolist() == [1, 3, 0, 0]
+    assert store.text["comment"].tolist() == ["too busy", "", "", ""]
+    assert np.isnan(store.numbers["dropoff_day"]).tolist() == [False, True, False, True]
+    assert not store.synthetic
+    with pytest.raises(ValueError):
+        store.codes["age"][0] = 1
+
+
+def test_mask_and_aggregate(store):
+    counts = store.aggregate(store.mask({"occupation": "Student", "platform": "YouTube"}))
+    assert counts["total"] == 2
+    assert counts["age"].tolist() == [1, 0]
+    assert counts["reasons"].tolist() == [1, 0]
+    assert counts["completed"]["age"].tolist() == [0, 0]
+    assert store.mask({"age": "65+"}).sum() == 0
+
+
+def test_concat_remaps_labels(store):
+    other = RespondentStore.from_records([{"age": "35-44", "platform": "YouTube", "reasons": ["Too hard", "Cost"]}])
+    both = store.concat(other)
+    assert both.n == 5
+    assert both.labels["age"] == ["18-24", "25-34", "35-44"]
+    assert both.codes["platform"].tolist() == [0, 1, 0, 0, 0]
+    assert both.labels["reasons"] == ["Lack of time", "Too hard", "Cost"]
+    assert int(both.bits["reasons"][-1]) == 0b110
+    assert not both.synthetic
+    assert store.concat(RespondentStore.from_aggregates(DASHBOARD_DATA)).synthetic
+
+
+def test_from_aggregates_reproduces_every_marginal():
+    store = RespondentStore.from_aggregates(DASHBOARD_DATA)
+    assert store.synthetic
+    counts = store.aggregate(store.mask({}))
+    assert dict(zip(store.labels["age"], counts["age"].tolist())) == DASHBOARD_DATA["demographics"]["age_distribution"]
+    assert dict(zip(store.labels["platform"], counts["platform"].tolist())) == DASHBOARD_DATA["platform_data"]["primary_platforms"]
+    reasons = {r["reason"]: r["count"] for r in DASHBOARD_DATA["dropoff_reasons"]}
+    assert dict(zip(store.labels["reasons"], counts["reasons"].tolist())) == reasons
+
+
+def test_from_aggregates_sizes_for_the_largest_marginal():
+    data = {
+        "demographics": {"total_respondents": 2, "age_distribution": {"18-24": 5}, "occupation_distribution": {}},
+        "platform_data": {"primary_platforms": {}},
+        "dropoff_patterns": {"drop_points": {}},
+        "dropoff_reasons": [{"reason": "Cost", "count": 7}],
+        "desired_features": [],
+    }
+    assert RespondentStore.from_aggregates(data).n == 7
+
+
+def test_drop_points_invert_the_funnel():
+    drops = DASHBOARD_DATA["dropoff_patterns"]["drop_points"]
+    funnel = funnel_from_drop_points(drops)
+    assert drop_points_from_funnel(funnel) == dict(drops)
+
+
+def test_synthetic_filters_narrow_only_their_own_marginal():
+    store = RespondentStore.from_aggregates(DASHBOARD_DATA)
+    everyone = get_filtered_data(DASHBOARD_DATA, {}, store=store)
+    age = next(iter(DASHBOARD_DATA["demographics"]["age_distribution"]))
+    one = get_filtered_data(DASHBOARD_DATA, {"age": age}, store=store)
+    assert everyone["cross_filtered"] and not one["cross_filtered"]
+    assert one["demographics"]["age_distribution"] == {age: DASHBOARD_DATA["demographics"]["age_distribution"][age]}
+    assert one["demographics"]["total_respondents"] == DASHBOARD_DATA["demographics"]["age_distribution"][age]
+    assert one["platform_data"] == everyone["platform_data"]
+    assert one["dropoff_patterns"]["drop_points"] == everyone["dropoff_patterns"]["drop_points"]
+    assert not one["dropoff_patterns"]["funnel_filtered"]
+    assert one["completion"]["by_age"] is None
+    platform = next(iter(DASHBOARD_DATA["platform_data"]["primary_platforms"]))
+    two = get_filtered_data(DASHBOARD_DATA, {"age": age, "platform": platform}, store=store)
+    assert two["demographics"]["total_respondents"] is None
+
+
+def test_respondent_filters_cross_filter(store):
+    filtered = get_filtered_data({"respondents": RECORDS}, {"age": "18-24"}, store=store)
+    assert filtered["cross_filtered"]
+    assert filtered["demographics"]["total_respondents"] == 2
+    assert filtered["platform_data"]["primary_platforms"] == {"YouTube": 1, "Udemy": 1}
+    assert filtered["completion"]["by_age"] == {"18-24": 1}